@@ -0,0 +1,125 @@
+// Incremental decoder for AG-UI server-sent event streams.
+//
+// Network reads cut the stream anywhere: inside an event, inside a line, in
+// the middle of a multi-byte UTF-8 character. Chunks are copied into a ring
+// buffer that is allocated once (and only grows when a single line is larger
+// than it); complete lines are found with indexOf from where the previous scan
+// stopped and decoded only when complete. A line that wraps around the end of
+// the ring is decoded in two parts with `{ stream: true }`, so a character
+// split across the wrap is still decoded correctly.
+//
+// Mirrors shared/sse_decoder.py on the server side.
+
+export interface AGUIEvent {
+  type: string;
+  [key: string]: any;
+}
+
+const NEWLINE = 10;
+const CARRIAGE_RETURN = 13;
+
+export class AGUIEventDecoder {
+  private ring: Uint8Array;
+  private head = 0; // index of the first unconsumed byte
+  private size = 0; // unconsumed bytes
+  private scanned = 0; // unconsumed bytes already known to hold no newline
+  private data: string[] = [];
+  private readonly text = new TextDecoder();
+
+  constructor(capacity = 64 * 1024) {
+    this.ring = new Uint8Array(capacity);
+  }
+
+  // Add one network chunk; onEvent is called for every event it completes, in order
+  push(chunk: Uint8Array, onEvent: (event: AGUIEvent) => void): void {
+    this.append(chunk);
+    for (let length = this.nextLine(); length !== -1; length = this.nextLine()) {
+      this.handleLine(this.takeLine(length), onEvent);
+    }
+  }
+
+  // Drop any partial line or event
+  reset(): void {
+    this.head = this.size = this.scanned = 0;
+    this.data.length = 0;
+  }
+
+  private append(chunk: Uint8Array): void {
+    if (this.size + chunk.length > this.ring.length) {
+      let capacity = this.ring.length * 2;
+      while (capacity < this.size + chunk.length) capacity *= 2;
+      const ring = new Uint8Array(capacity);
+      this.copyOut(ring);
+      this.ring = ring;
+      this.head = 0;
+    }
+    const capacity = this.ring.length;
+    const tail = (this.head + this.size) % capacity;
+    const first = Math.min(chunk.length, capacity - tail);
+    this.ring.set(chunk.subarray(0, first), tail);
+    if (first < chunk.length) this.ring.set(chunk.subarray(first), 0);
+    this.size += chunk.length;
+  }
+
+  // Copy the unconsumed bytes, in order, to the start of `target`
+  private copyOut(target: Uint8Array): void {
+    const end = this.head + this.size;
+    if (end <= this.ring.length) {
+      target.set(this.ring.subarray(this.head, end));
+    } else {
+      target.set(this.ring.subarray(this.head));
+      target.set(this.ring.subarray(0, end - this.ring.length), this.ring.length - this.head);
+    }
+  }
+
+  // Length of the next complete line (without its newline), or -1
+  private nextLine(): number {
+    const capacity = this.ring.length;
+    while (this.scanned < this.size) {
+      const from = (this.head + this.scanned) % capacity;
+      const end = Math.min(capacity, from + this.size - this.scanned);
+      const at = this.ring.indexOf(NEWLINE, from);
+      if (at !== -1 && at < end) return this.scanned + at - from;
+      this.scanned += end - from;
+    }
+    return -1;
+  }
+
+  private takeLine(length: number): string {
+    const capacity = this.ring.length;
+    let end = length;
+    if (end > 0 && this.ring[(this.head + end - 1) % capacity] === CARRIAGE_RETURN) end -= 1;
+    let line: string;
+    if (this.head + end <= capacity) {
+      line = this.text.decode(this.ring.subarray(this.head, this.head + end));
+    } else {
+      line = this.text.decode(this.ring.subarray(this.head), { stream: true });
+      line += this.text.decode(this.ring.subarray(0, this.head + end - capacity));
+    }
+    this.head = (this.head + length + 1) % capacity;
+    this.size -= length + 1;
+    this.scanned = 0;
+    return line;
+  }
+
+  private handleLine(line: string, onEvent: (event: AGUIEvent) => void): void {
+    if (line === "") {
+      if (this.data.length === 0) return;
+      const payload = this.data.length === 1 ? this.data[0] : this.data.join("\n");
+      this.data.length = 0;
+      let event: AGUIEvent;
+      try {
+        event = JSON.parse(payload);
+      } catch {
+        // Not JSON (e.g. "[DONE]")
+        return;
+      }
+      if (event && typeof event === "object") onEvent(event);
+      return;
+    }
+    // Comment, event:, id: and retry: lines are not used by AG-UI
+    if (line.startsWith("data:")) {
+      this.data.push(line.charCodeAt(5) === 32 ? line.slice(6) : line.slice(5));
+    }
+  }
+}
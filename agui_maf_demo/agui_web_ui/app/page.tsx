@@ -2,140 +2,144 @@
 
 import { useState, useRef, useEffect } from "react";
 
+import { type AGUIEvent, AGUIEventDecoder } from "./agui-sse";
+
+// Structured tool results sent by the server as CUSTOM "tool_result" events
+// (shared/rich_results.py); the model only sees a summary of them
+type ToolResult =
+  | { kind: "weather"; location: string; temperature: number; feels_like: number; description: string; humidity: number; wind_speed: number; icon_url: string }
+  | { kind: "links"; query: string; results: { title: string; url: string }[] }
+  | { kind: "calculation"; expression: string; result: string }
+  | { kind: "code"; image_ids: string[] };
+
 interface Message {
   role: "user" | "assistant";
   content: string;
   agentName?: string;
+  // Live code-interpreter output and figures streamed while a tool runs
+  codeOutput?: string;
+  figureIds?: string[];
+  results?: ToolResult[];
 }
 
-// Function to parse and render rich content
+// Keep only the tail of streamed code output in the browser
+const MAX_CODE_OUTPUT_CHARS = 20000;
+
+// Render the assistant's markdown-style text (bold and inline code)
 function RichContent({ content }: { content: string }) {
-  // Parse weather icons
-  const weatherIconMatch = content.match(/\[WEATHER_ICON\](.*?)\[\/WEATHER_ICON\]/);
-  const weatherIcon = weatherIconMatch ? weatherIconMatch[1] : null;
-  let displayContent = content.replace(/\[WEATHER_ICON\].*?\[\/WEATHER_ICON\]/g, "");
-  
-  // Parse links
-  const linkRegex = /\[LINK\](.*?)\[\/LINK\]/g;
-  const links: string[] = [];
-  let match;
-  while ((match = linkRegex.exec(content)) !== null) {
-    links.push(match[1]);
+  let displayContent = content.replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>");
+  displayContent = displayContent.replace(/`(.*?)`/g, "<code style='background:#f3f4f6;padding:2px 6px;border-radius:4px;'>$1</code>");
+
+  return <div dangerouslySetInnerHTML={{ __html: displayContent.replace(/\n/g, "<br/>") }} />;
+}
+
+// Cards for structured tool results
+function ToolResultCard({ result, backendUrl, skipImageIds = [] }: { result: ToolResult; backendUrl: string; skipImageIds?: string[] }) {
+  if (result.kind === "weather") {
+    return (
+      <div style={{
+        background: "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+        color: "white",
+        padding: "1rem",
+        borderRadius: "0.5rem",
+        display: "flex",
+        alignItems: "center",
+        gap: "1rem"
+      }}>
+        <img src={result.icon_url} alt="Weather" style={{ width: "64px", height: "64px" }} />
+        <div style={{ display: "flex", flexDirection: "column", gap: "0.25rem", fontSize: "0.875rem" }}>
+          <strong style={{ fontSize: "1rem" }}>🌤️ {result.location}</strong>
+          <span>{result.temperature}°C (feels like {result.feels_like}°C), {result.description}</span>
+          <span>Humidity {result.humidity}% · Wind {result.wind_speed} m/s</span>
+        </div>
+      </div>
+    );
   }
-  displayContent = displayContent.replace(linkRegex, "");
-  
-  // Parse calculation results
-  const calcMatch = content.match(/\[CALC_RESULT\](.*?)\[\/CALC_RESULT\]/);
-  const calcResult = calcMatch ? calcMatch[1] : null;
-  displayContent = displayContent.replace(/\[CALC_RESULT\].*?\[\/CALC_RESULT\]/g, "");
-  
-  // Parse image IDs (not base64 - images stored on server)
-  const imageIdRegex = /\[IMAGE_ID\](.*?)\[\/IMAGE_ID\]/g;
-  const imageIds: string[] = [];
-  while ((match = imageIdRegex.exec(content)) !== null) {
-    imageIds.push(match[1]);
+
+  if (result.kind === "calculation") {
+    return (
+      <div style={{
+        background: "#10b981",
+        color: "white",
+        padding: "1rem",
+        borderRadius: "0.5rem",
+        fontSize: "1.5rem",
+        fontWeight: "bold",
+        textAlign: "center"
+      }}>
+        <div style={{ fontSize: "0.875rem", fontWeight: "normal", opacity: 0.9 }}>{result.expression}</div>
+        = {result.result}
+      </div>
+    );
   }
-  displayContent = displayContent.replace(imageIdRegex, "");
-  
-  // Convert markdown-style bold and code to HTML
-  displayContent = displayContent.replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>");
-  displayContent = displayContent.replace(/`(.*?)`/g, "<code style='background:#f3f4f6;padding:2px 6px;border-radius:4px;'>$1</code>");
-  
+
+  if (result.kind === "links") {
+    return (
+      <div style={{ display: "flex", flexDirection: "column", gap: "0.5rem" }}>
+        {result.results.map((link, idx) => (
+          <a
+            key={idx}
+            href={link.url}
+            target="_blank"
+            rel="noopener noreferrer"
+            title={link.url}
+            style={{
+              color: "#2563eb",
+              textDecoration: "none",
+              fontSize: "0.875rem",
+              padding: "0.5rem",
+              background: "#eff6ff",
+              borderRadius: "0.375rem",
+              border: "1px solid #bfdbfe",
+              display: "block",
+              overflow: "hidden",
+              textOverflow: "ellipsis",
+              whiteSpace: "nowrap",
+              cursor: "pointer",
+              transition: "all 0.2s"
+            }}
+            onMouseEnter={(e) => {
+              e.currentTarget.style.background = "#dbeafe";
+              e.currentTarget.style.borderColor = "#60a5fa";
+            }}
+            onMouseLeave={(e) => {
+              e.currentTarget.style.background = "#eff6ff";
+              e.currentTarget.style.borderColor = "#bfdbfe";
+            }}
+          >
+            🔗 {idx + 1}. {link.title || link.url}
+          </a>
+        ))}
+      </div>
+    );
+  }
+
+  // Figures already shown while the code was running are not repeated
+  const imageIds = result.image_ids.filter((imageId) => !skipImageIds.includes(imageId));
   return (
     <div style={{ display: "flex", flexDirection: "column", gap: "0.75rem" }}>
-      <div dangerouslySetInnerHTML={{ __html: displayContent.replace(/\n/g, "<br/>") }} />
-      
-      {weatherIcon && (
-        <div style={{ 
-          background: "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-          padding: "1rem",
-          borderRadius: "0.5rem",
-          display: "flex",
-          alignItems: "center",
-          justifyContent: "center"
-        }}>
-          <img src={weatherIcon} alt="Weather" style={{ width: "64px", height: "64px" }} />
-        </div>
-      )}
-      
-      {calcResult && (
-        <div style={{
-          background: "#10b981",
-          color: "white",
-          padding: "1rem",
-          borderRadius: "0.5rem",
-          fontSize: "1.5rem",
-          fontWeight: "bold",
-          textAlign: "center"
-        }}>
-          = {calcResult}
-        </div>
-      )}
-      
-      {imageIds.length > 0 && (
-        <div style={{ display: "flex", flexDirection: "column", gap: "0.75rem", marginTop: "0.5rem" }}>
-          {imageIds.map((imageId, idx) => (
-            <div 
-              key={idx} 
-              style={{ 
-                background: "white",
-                padding: "1rem",
-                borderRadius: "0.5rem",
-                border: "1px solid #e5e7eb",
-                boxShadow: "0 1px 3px rgba(0,0,0,0.1)"
-              }}
-            >
-              <img 
-                src={`${backendUrl}/images/${imageId}`} 
-                alt={`Visualization ${idx + 1}`} 
-                style={{ 
-                  width: "100%", 
-                  height: "auto",
-                  borderRadius: "0.25rem"
-                }} 
-              />
-            </div>
-          ))}
-        </div>
-      )}
-      
-      {links.length > 0 && (
-        <div style={{ display: "flex", flexDirection: "column", gap: "0.5rem", marginTop: "0.5rem" }}>
-          {links.map((link, idx) => (
-            <a
-              key={idx}
-              href={link}
-              target="_blank"
-              rel="noopener noreferrer"
-              style={{
-                color: "#2563eb",
-                textDecoration: "none",
-                fontSize: "0.875rem",
-                padding: "0.5rem",
-                background: "#eff6ff",
-                borderRadius: "0.375rem",
-                border: "1px solid #bfdbfe",
-                display: "block",
-                overflow: "hidden",
-                textOverflow: "ellipsis",
-                whiteSpace: "nowrap",
-                cursor: "pointer",
-                transition: "all 0.2s"
-              }}
-              onMouseEnter={(e) => {
-                e.currentTarget.style.background = "#dbeafe";
-                e.currentTarget.style.borderColor = "#60a5fa";
-              }}
-              onMouseLeave={(e) => {
-                e.currentTarget.style.background = "#eff6ff";
-                e.currentTarget.style.borderColor = "#bfdbfe";
-              }}
-            >
-              🔗 {link}
-            </a>
-          ))}
+      {imageIds.map((imageId, idx) => (
+        <div
+          key={imageId}
+          style={{
+            background: "white",
+            padding: "1rem",
+            borderRadius: "0.5rem",
+            border: "1px solid #e5e7eb",
+            boxShadow: "0 1px 3px rgba(0,0,0,0.1)"
+          }}
+        >
+          <img
+            src={`${backendUrl}/images/${imageId}`}
+            alt={`Visualization ${idx + 1}`}
+            style={{
+              width: "100%",
+              height: "auto",
+              borderRadius: "0.25rem"
+            }}
+          />
         </div>
-      )}
+      ))}
     </div>
   );
 }
@@ -151,6 +155,14 @@ export default function Home() {
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // The server keeps the thread history; after a saved run only new messages are posted
+  const threadIdRef = useRef<string>(
+    typeof crypto !== "undefined" && "randomUUID" in crypto ? crypto.randomUUID() : `thread-${Date.now()}-${Math.random().toString(36).slice(2)}`
+  );
+  // stored: messages the server holds (tool calls and results included);
+  // local: how many of ours they cover; token: proves the stored history is ours
+  type Synced = { stored: number; local: number; token: string };
+  const syncedRef = useRef<Synced | null>(null);
 
   // Load backend URL from runtime config
   useEffect(() => {
@@ -201,59 +213,99 @@ export default function Home() {
     setMessages(updatedMessages);
     setIsLoading(true);
 
-    try {
-      // Send full conversation history to maintain context
-      const response = await fetch(`${backendUrl}/`, {
+    // Post only the messages the server has not stored yet (base = stored count),
+    // or the full conversation when the server has no history for this thread
+    const postRun = (synced: Synced | null) =>
+      fetch(`${backendUrl}/`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          ...(synced !== null
+            ? { "X-AGUI-History-Base": String(synced.stored), "X-AGUI-Thread-Token": synced.token }
+            : {}),
+        },
         body: JSON.stringify({
-          messages: updatedMessages.map(m => ({ role: m.role, content: m.content })),
+          threadId: threadIdRef.current,
+          messages: updatedMessages.slice(synced?.local ?? 0).map(m => ({ role: m.role, content: m.content })),
         }),
       });
 
+    try {
+      const synced = syncedRef.current;
+      syncedRef.current = null;
+      let response = await postRun(synced);
+      if (response.status === 409) {
+        // Thread evicted or out of sync on the server: resend everything
+        response = await postRun(null);
+      }
+
       const reader = response.body?.getReader();
-      const decoder = new TextDecoder();
-      let assistantMessage = "";
-      let currentAgentName = "OrchestratorAgent";
 
       if (reader) {
-        setMessages((prev) => [...prev, { role: "assistant", content: "", agentName: currentAgentName }]);
-
-        while (true) {
-          const { done, value } = await reader.read();
-          if (done) break;
-
-          const chunk = decoder.decode(value);
-          const lines = chunk.split("\n");
-
-          for (const line of lines) {
-            if (line.startsWith("data: ")) {
-              const data = line.slice(6);
-              if (data === "[DONE]") continue;
-
-              try {
-                const json = JSON.parse(data);
-                
-                // Detect agent changes from TEXT_MESSAGE_START
-                if (json.type === "TEXT_MESSAGE_START" && json.role === "assistant") {
-                  // Agent name might be in future events, for now use default
-                  currentAgentName = "Assistant";
-                }
-                
-                if (json.type === "TEXT_MESSAGE_CONTENT" && json.delta) {
-                  assistantMessage += json.delta;
-                  setMessages((prev) => {
-                    const newMessages = [...prev];
-                    newMessages[newMessages.length - 1].content = assistantMessage;
-                    newMessages[newMessages.length - 1].agentName = currentAgentName;
-                    return newMessages;
-                  });
-                }
-              } catch (e) {
-                // Skip invalid JSON
-              }
-            }
+        // The reply being streamed; applied to the last message at most once per frame
+        const reply: Message = { role: "assistant", content: "", agentName: "OrchestratorAgent" };
+        let frame = 0;
+        const flush = () => {
+          frame = 0;
+          const snapshot: Message = {
+            ...reply,
+            figureIds: reply.figureIds && [...reply.figureIds],
+            results: reply.results && [...reply.results],
+          };
+          setMessages((prev) => [...prev.slice(0, -1), snapshot]);
+        };
+        const scheduleFlush = () => {
+          if (!frame) frame = requestAnimationFrame(flush);
+        };
+
+        setMessages((prev) => [...prev, { ...reply }]);
+
+        const handleEvent = (json: AGUIEvent) => {
+          // Detect agent changes from TEXT_MESSAGE_START
+          if (json.type === "TEXT_MESSAGE_START" && json.role === "assistant") {
+            // Agent name might be in future events, for now use default
+            reply.agentName = "Assistant";
+          }
+
+          // Server stored the thread: the next turn can send only the new message
+          if (json.type === "CUSTOM" && json.name === "thread_store.saved" && json.value?.threadId === threadIdRef.current) {
+            syncedRef.current = { stored: json.value.messages, local: updatedMessages.length + 1, token: json.value.token };
+          }
+
+          // Live output and figures from execute_python_code
+          if (json.type === "CUSTOM" && json.name === "code_interpreter.output" && json.value?.text) {
+            reply.codeOutput = ((reply.codeOutput || "") + json.value.text).slice(-MAX_CODE_OUTPUT_CHARS);
+            scheduleFlush();
+          }
+
+          if (json.type === "CUSTOM" && json.name === "code_interpreter.figure" && json.value?.image_id) {
+            reply.figureIds = [...(reply.figureIds || []), json.value.image_id];
+            scheduleFlush();
+          }
+
+          // Structured tool results (weather cards, links, calculations, charts)
+          if (json.type === "CUSTOM" && json.name === "tool_result" && json.value?.kind) {
+            reply.results = [...(reply.results || []), json.value as ToolResult];
+            scheduleFlush();
+          }
+
+          if (json.type === "TEXT_MESSAGE_CONTENT" && json.delta) {
+            reply.content += json.delta;
+            scheduleFlush();
+          }
+        };
+
+        // Events may span network chunks; the decoder reassembles them
+        const decoder = new AGUIEventDecoder();
+        try {
+          while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            decoder.push(value, handleEvent);
           }
+        } finally {
+          cancelAnimationFrame(frame);
+          flush();
         }
       }
     } catch (error) {
@@ -297,7 +349,37 @@ export default function Home() {
                     wordBreak: "break-word",
                   }}
                 >
-                  {msg.role === "user" ? msg.content : <RichContent content={msg.content} />}
+                  {msg.role === "user" ? msg.content : (
+                    <div style={{ display: "flex", flexDirection: "column", gap: "0.75rem" }}>
+                      {msg.codeOutput && (
+                        <pre style={{
+                          margin: 0,
+                          padding: "0.75rem",
+                          background: "#111827",
+                          color: "#e5e7eb",
+                          borderRadius: "0.5rem",
+                          fontSize: "0.75rem",
+                          maxHeight: "16rem",
+                          overflowY: "auto",
+                          whiteSpace: "pre-wrap",
+                        }}>
+                          {msg.codeOutput}
+                        </pre>
+                      )}
+                      {msg.figureIds?.map((imageId) => (
+                        <img
+                          key={imageId}
+                          src={`${backendUrl}/images/${imageId}`}
+                          alt="Visualization"
+                          style={{ width: "100%", height: "auto", borderRadius: "0.25rem", background: "white" }}
+                        />
+                      ))}
+                      {msg.results?.map((result, resultIdx) => (
+                        <ToolResultCard key={resultIdx} result={result} backendUrl={backendUrl} skipImageIds={msg.figureIds} />
+                      ))}
+                      <RichContent content={msg.content} />
+                    </div>
+                  )}
                 </div>
               </div>
             </div>
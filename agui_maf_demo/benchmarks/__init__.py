@@ -0,0 +1,6 @@
+"""Offline benchmarks and load tests for the AG-UI demo servers.
+
+Run from the ``agui_maf_demo`` directory, e.g.::
+
+    python -m benchmarks.weather_load
+"""
@@ -0,0 +1,311 @@
+"""Load test: throughput and latency of an AG-UI server, fully offline.
+
+Boots a ``server_*.py`` app in a subprocess with the chat client replaced by
+``benchmarks.mock_chat_client.MockChatClient`` (scripted tokens and tool
+calls, fixed model latency) and the weather/search tools pointed at
+``benchmarks.fake_backends``. Everything else (agents, tools, middleware,
+SSE encoding) is the real server, so no Azure or API keys are needed.
+
+``--clients`` concurrent AG-UI clients each post ``--requests`` runs (a new
+thread per run) and read the SSE stream to the end. Reported per app:
+
+- requests/sec and failed runs
+- TTFT: time to the first ``TEXT_MESSAGE_CONTENT`` event, p50/p95/p99
+- run latency: time to the end of the stream, p50/p95/p99
+- server RSS sampled every ``--rss-interval`` seconds (start, peak, end)
+
+Save results with ``--json`` and diff a later run against them with
+``--compare`` to track a change commit over commit.
+
+Usage::
+
+    python -m benchmarks.agui_load
+    python -m benchmarks.agui_load --app server_with_tools --app server --clients 50 --requests 10
+    python -m benchmarks.agui_load --json load.json
+    python -m benchmarks.agui_load --compare load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PACKAGE_ROOT))
+
+from benchmarks.fake_backends import fake_backend_env, start_fake_backends
+
+DEFAULT_PROMPT = "What's the weather in Paris? Also calculate 17 * 23 for me."
+
+SERVE_SCRIPT = """
+import importlib
+import uvicorn
+import shared.providers
+from benchmarks.mock_chat_client import MockChatClient
+
+client = MockChatClient(ttft={ttft!r}, token_delay={token_delay!r}, tokens={tokens!r})
+shared.providers.build_chat_client = lambda config: (client, "Mock chat client (scripted)")
+app = importlib.import_module({app!r}).create_app()
+uvicorn.run(app, host="127.0.0.1", port={port!r}, log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of ``pid`` in MiB (Linux ``/proc``, or psutil if installed)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return psutil.Process(pid).memory_info().rss / 2**20
+    except psutil.Error:
+        return None
+
+
+def percentile(values: list[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (``None`` when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(values: list[float]) -> dict:
+    return {f"p{p}_ms": round(percentile(values, p) * 1000, 1) if values else None for p in (50, 95, 99)}
+
+
+async def wait_ready(client: httpx.AsyncClient, proc: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+async def run_once(client: httpx.AsyncClient, prompt: str) -> dict:
+    """Post one AG-UI run and read its SSE stream to the end."""
+    body = {
+        "threadId": str(uuid.uuid4()),
+        "runId": str(uuid.uuid4()),
+        "messages": [{"id": str(uuid.uuid4()), "role": "user", "content": prompt}],
+    }
+    start = time.perf_counter()
+    ttft = None
+    events = 0
+    finished = False
+    try:
+        async with client.stream("POST", "/", json=body, headers={"Accept": "text/event-stream"}) as response:
+            if response.status_code != 200:
+                return {"ok": False, "error": f"HTTP {response.status_code}"}
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                events += 1
+                event_type = json.loads(line[5:]).get("type")
+                if event_type == "TEXT_MESSAGE_CONTENT" and ttft is None:
+                    ttft = time.perf_counter() - start
+                elif event_type == "RUN_ERROR":
+                    return {"ok": False, "error": "RUN_ERROR"}
+                elif event_type == "RUN_FINISHED":
+                    finished = True
+    except httpx.HTTPError as e:
+        return {"ok": False, "error": type(e).__name__}
+    if not finished:
+        return {"ok": False, "error": "stream ended without RUN_FINISHED"}
+    return {"ok": True, "ttft": ttft, "latency": time.perf_counter() - start, "events": events}
+
+
+async def sample_rss(pid: int, interval: float, samples: list, stop: asyncio.Event) -> None:
+    start = time.perf_counter()
+    while True:
+        value = rss_mb(pid)
+        if value is not None:
+            samples.append([round(time.perf_counter() - start, 2), round(value, 1)])
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+
+async def load_app(app: str, args, backend_env: dict) -> dict:
+    port = free_port()
+    script = SERVE_SCRIPT.format(
+        app=app, port=port, ttft=args.ttft, token_delay=args.token_delay, tokens=args.tokens
+    )
+    pythonpath = os.pathsep.join(filter(None, [str(PACKAGE_ROOT), os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, **backend_env, "PYTHONPATH": pythonpath}
+    proc = subprocess.Popen([sys.executable, "-c", script], cwd=PACKAGE_ROOT, env=env)
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=args.timeout
+        ) as client:
+            await wait_ready(client, proc, args.startup_timeout)
+            for _ in range(args.warmup):
+                await run_once(client, args.prompt)
+
+            samples: list = []
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(sample_rss(proc.pid, args.rss_interval, samples, stop))
+
+            async def client_loop() -> list[dict]:
+                return [await run_once(client, args.prompt) for _ in range(args.requests)]
+
+            start = time.perf_counter()
+            per_client = await asyncio.gather(*(client_loop() for _ in range(args.clients)))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await sampler
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    runs = [run for runs in per_client for run in runs]
+    ok = [run for run in runs if run["ok"]]
+    errors: dict[str, int] = {}
+    for run in runs:
+        if not run["ok"]:
+            errors[run["error"]] = errors.get(run["error"], 0) + 1
+    rss = [value for _, value in samples]
+    return {
+        "requests": len(runs),
+        "failed": len(runs) - len(ok),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "ttft": summarize([run["ttft"] for run in ok if run["ttft"] is not None]),
+        "latency": summarize([run["latency"] for run in ok]),
+        "events_per_run": round(sum(run["events"] for run in ok) / len(ok), 1) if ok else 0,
+        "rss_mb": {
+            "start": rss[0] if rss else None,
+            "peak": max(rss) if rss else None,
+            "end": rss[-1] if rss else None,
+            "samples": samples,
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PACKAGE_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _delta(current: Optional[float], previous: Optional[float], unit: str) -> str:
+    if current is None or previous is None:
+        return ""
+    return f" ({current - previous:+.1f}{unit})"
+
+
+def report(app: str, result: dict, previous: Optional[dict]) -> None:
+    previous = previous or {}
+    prev_ttft = previous.get("ttft", {})
+    prev_latency = previous.get("latency", {})
+    prev_rss = previous.get("rss_mb", {})
+    print(
+        f"{app}: {result['requests']} runs in {result['seconds']:.2f}s, "
+        f"{result['rps']:.1f} req/s{_delta(result['rps'], previous.get('rps'), ' req/s')}, "
+        f"{result['failed']} failed {result['errors'] or ''}"
+    )
+    for label, values, prev in (("TTFT", result["ttft"], prev_ttft), ("latency", result["latency"], prev_latency)):
+        print(
+            f"    {label:<8}"
+            + "  ".join(
+                f"{key[:-3]} {values[key] if values[key] is not None else '-':>7} ms{_delta(values[key], prev.get(key), ' ms')}"
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            )
+        )
+    rss = result["rss_mb"]
+    if rss["peak"] is not None:
+        print(
+            f"    RSS     start {rss['start']:.1f} MiB  peak {rss['peak']:.1f} MiB"
+            f"{_delta(rss['peak'], prev_rss.get('peak'), ' MiB')}  end {rss['end']:.1f} MiB"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", action="append", help="Server module to load, repeatable (default server_with_tools)")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent SSE clients")
+    parser.add_argument("--requests", type=int, default=5, help="Runs per client")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs before the load starts")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT, help="User message (its keywords select the scripted tool calls)")
+    parser.add_argument("--ttft", type=float, default=0.05, help="Mock model latency before each response in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Mock delay between streamed tokens in seconds")
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens in the mock model's final answer")
+    parser.add_argument("--backend-delay", type=float, default=0.05, help="Fake weather/search API latency in seconds")
+    parser.add_argument("--rss-interval", type=float, default=0.5, help="Server RSS sampling interval in seconds")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-run timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Seconds to wait for /ready")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier --json run")
+    args = parser.parse_args()
+    apps = args.app or ["server_with_tools"]
+
+    baseline = json.loads(Path(args.compare).read_text()).get("apps", {}) if args.compare else {}
+    backends = start_fake_backends(args.backend_delay)
+    settings = {
+        key: getattr(args, key)
+        for key in ("clients", "requests", "prompt", "ttft", "token_delay", "tokens", "backend_delay")
+    }
+    results = {"commit": git_commit(), "settings": settings, "apps": {}}
+
+    print(f"🧪 Mock model: TTFT {args.ttft}s, {args.tokens} tokens every {args.token_delay}s")
+    print(f"🌐 Fake weather/search APIs on port {backends.server_address[1]} (delay {args.backend_delay}s)")
+    print(f"👥 {args.clients} clients x {args.requests} runs\n")
+    try:
+        for app in apps:
+            try:
+                result = await load_app(app, args, fake_backend_env(backends))
+            except RuntimeError as e:
+                results["apps"][app] = {"error": str(e)}
+                print(f"{app}: failed: {e}")
+                continue
+            results["apps"][app] = result
+            report(app, result, baseline.get(app))
+    finally:
+        backends.shutdown()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
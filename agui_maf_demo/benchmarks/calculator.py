@@ -0,0 +1,112 @@
+"""Benchmark: ``calculate`` expression evaluation, ``eval`` vs. ``shared.expressions``.
+
+Modes compared per call, over a mix of expressions the model typically sends:
+
+- ``eval``:            the old path, ``eval(expression, {"__builtins__": {}}, {})``,
+  which compiles the string on every call.
+- ``engine, cold``:    ``shared.expressions.evaluate`` with the compile cache
+  cleared first (parse, whitelist check, rewrite and compile every time).
+- ``engine, memoized``: ``evaluate`` with the compiled expression cached, the
+  steady state for repeated expressions.
+
+Then one expression is applied over ``--size`` values, once per element with
+``eval`` and once vectorized (variables bound to a numpy array), and the time
+to reject ``9**9**9`` is shown (``eval`` would compute it for minutes).
+
+Usage::
+
+    python -m benchmarks.calculator
+    python -m benchmarks.calculator --number 20000 --size 1000000
+"""
+
+import argparse
+import math
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.expressions import ExpressionError, compile_expression, evaluate
+
+EXPRESSIONS = [
+    "2 + 2",
+    "(17 * 23) + 42",
+    "1500 * 0.15 + 1500",
+    "(98.6 - 32) * 5 / 9",
+    "2 ** 64 - 1",
+    "100000 * (1 + 0.05) ** 10",
+    "((3 + 4) * (5 - 2)) / 7 % 4",
+    "12.5 * 3 + 7.25 * 4 - 18 / 6",
+]
+
+VECTOR_EXPRESSION = "x * 1.8 + 32 - (x / 10) ** 2"
+
+
+def per_call_us(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=5000, help="Evaluations per expression and mode")
+    parser.add_argument("--size", type=int, default=100_000, help="Values for the vectorized comparison")
+    args = parser.parse_args()
+
+    for expression in EXPRESSIONS:
+        assert evaluate(expression) == eval(expression, {"__builtins__": {}}, {}), expression
+
+    def old(expression):
+        return lambda: eval(expression, {"__builtins__": {}}, {})
+
+    def cold(expression):
+        def run():
+            compile_expression.cache_clear()
+            return evaluate(expression)
+
+        return run
+
+    def memoized(expression):
+        return lambda: evaluate(expression)
+
+    print(f"Per call, mean over {len(EXPRESSIONS)} expressions x {args.number} runs")
+    baseline = None
+    for label, factory in (("eval", old), ("engine, cold", cold), ("engine, memoized", memoized)):
+        us = sum(per_call_us(factory(expression), args.number) for expression in EXPRESSIONS) / len(EXPRESSIONS)
+        baseline = baseline or us
+        print(f"{label:>18}: {us:8.2f} us/call  ({baseline / us:5.1f}x vs eval)")
+
+    values = [i * 0.01 for i in range(args.size)]
+    print(f"\n{VECTOR_EXPRESSION!r} over {args.size:,} values")
+    start = time.perf_counter()
+    looped = [eval(VECTOR_EXPRESSION, {"__builtins__": {}}, {"x": x}) for x in values]
+    loop_seconds = time.perf_counter() - start
+    try:
+        import numpy as np
+    except ImportError:
+        print("    numpy not installed; skipping the vectorized comparison")
+    else:
+        array = np.asarray(values)
+        start = time.perf_counter()
+        vectorized = evaluate(VECTOR_EXPRESSION, {"x": array})
+        vector_seconds = time.perf_counter() - start
+        assert np.allclose(vectorized, looped)
+        print(f"{'eval per element':>18}: {loop_seconds * 1000:8.1f} ms")
+        print(f"{'engine vectorized':>18}: {vector_seconds * 1000:8.1f} ms  ({loop_seconds / vector_seconds:5.1f}x)")
+
+    print("\nGuard rails")
+    for expression in ("9**9**9", "2 ** 10 ** 6", "10 ** 4000 * 10 ** 4000", "().__class__"):
+        start = time.perf_counter()
+        try:
+            evaluate(expression)
+            outcome = "evaluated"
+        except ExpressionError as e:
+            outcome = f"rejected: {e}"
+        print(f"{expression:>24}: {(time.perf_counter() - start) * 1e6:7.1f} us  {outcome}")
+
+    assert math.isclose(evaluate("sqrt(2) ** 2"), 2.0)
+
+
+if __name__ == "__main__":
+    main()
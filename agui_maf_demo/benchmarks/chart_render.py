@@ -0,0 +1,162 @@
+"""Benchmark: chart bytes and render time per rendering setting.
+
+Draws one representative figure for each chart-producing sample prompt in
+``agui_web_ui/app/page.tsx`` and renders it through
+``shared.chart_render.render_figure`` with several settings, reporting bytes
+per image and render time.
+
+Requires matplotlib (and Pillow for WebP / optimized PNG).
+
+Usage::
+
+    python -m benchmarks.chart_render
+    python -m benchmarks.chart_render --json chart_render.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from shared.chart_render import RenderSettings, render_figure
+
+SETTINGS = {
+    "png@100 (baseline)": RenderSettings(format="png", dpi=100, max_pixels=0, max_bytes=0),
+    "png@100 optimized": RenderSettings(format="png", dpi=100, max_pixels=0, max_bytes=0, optimize_png=True),
+    "webp@100 lossless": RenderSettings(format="webp", dpi=100, max_pixels=0, max_bytes=0),
+    "svg": RenderSettings(format="svg", dpi=100, max_pixels=0, max_bytes=0),
+    "png@200 budget 500KB": RenderSettings(format="png", dpi=200, max_pixels=4_000_000, max_bytes=500_000),
+}
+
+
+def weather_comparison():
+    fig, ax = plt.subplots(figsize=(8, 5))
+    metrics = ["Temp °C", "Feels like °C", "Humidity %", "Wind m/s"]
+    x = np.arange(len(metrics))
+    ax.bar(x - 0.2, [18.5, 17.9, 61, 4.1], 0.4, label="Paris")
+    ax.bar(x + 0.2, [14.2, 13.0, 78, 6.3], 0.4, label="London")
+    ax.set_xticks(x, metrics)
+    ax.set_title("Paris vs London")
+    ax.legend()
+
+
+def ai_trends():
+    fig, ax = plt.subplots(figsize=(8, 5))
+    years = np.arange(2019, 2026)
+    for name, rate in [("GenAI", 0.55), ("MLOps", 0.3), ("Edge AI", 0.2)]:
+        ax.plot(years, 100 * (1 - np.exp(-rate * (years - 2018))), marker="o", label=name)
+    ax.set_ylabel("Adoption %")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+
+def surface_3d():
+    fig = plt.figure(figsize=(10, 8))
+    ax = fig.add_subplot(projection="3d")
+    x = y = np.linspace(-8, 8, 200)
+    xx, yy = np.meshgrid(x, y)
+    zz = np.sin(np.sqrt(xx ** 2 + yy ** 2))
+    ax.plot_surface(xx, yy, zz, cmap="viridis")
+    ax.set_title("z = sin(√(x² + y²))")
+
+
+def tokyo_temperature():
+    fig, ax = plt.subplots(figsize=(8, 4))
+    hours = np.arange(24)
+    ax.fill_between(hours, 16 + 6 * np.sin((hours - 9) / 24 * 2 * np.pi), alpha=0.4)
+    ax.set_title("Tokyo temperature (°C)")
+
+
+def mandelbrot():
+    fig, ax = plt.subplots(figsize=(10, 8))
+    x = np.linspace(-2.5, 1.0, 800)
+    y = np.linspace(-1.25, 1.25, 600)
+    c = x[np.newaxis, :] + 1j * y[:, np.newaxis]
+    z = np.zeros_like(c)
+    counts = np.zeros(c.shape, dtype=int)
+    for _ in range(60):
+        mask = np.abs(z) <= 2
+        z[mask] = z[mask] ** 2 + c[mask]
+        counts[mask] += 1
+    ax.imshow(counts, cmap="twilight_shifted", extent=(-2.5, 1.0, -1.25, 1.25))
+    ax.set_title("Mandelbrot set")
+
+
+def quantum_timeline():
+    fig, ax = plt.subplots(figsize=(10, 3))
+    events = [(2019, "Supremacy claim"), (2021, "127 qubits"), (2023, "Error-corrected logical qubits"), (2025, "1000+ qubits")]
+    ax.hlines(0, 2018, 2026)
+    for year, label in events:
+        ax.plot(year, 0, "o")
+        ax.annotate(label, (year, 0), xytext=(0, 10), textcoords="offset points", rotation=30)
+    ax.set_yticks([])
+
+
+def sales_insights():
+    fig, axes = plt.subplots(1, 2, figsize=(10, 4))
+    quarters, sales = ["Q1", "Q2", "Q3", "Q4"], [120, 150, 95, 200]
+    axes[0].bar(quarters, sales)
+    axes[1].pie(sales, labels=quarters, autopct="%1.0f%%")
+
+
+PROMPTS = {
+    "weather comparison": weather_comparison,
+    "AI trends adoption": ai_trends,
+    "3D surface": surface_3d,
+    "Tokyo temperature": tokyo_temperature,
+    "Mandelbrot": mandelbrot,
+    "quantum timeline": quantum_timeline,
+    "sales insights": sales_insights,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = []
+    for prompt, draw in PROMPTS.items():
+        for label, settings in SETTINGS.items():
+            draw()
+            fig = plt.gcf()
+            try:
+                image = render_figure(fig, settings)
+            except Exception as e:  # e.g. WebP without Pillow
+                print(f"{prompt:<20} {label:<22} skipped: {e}")
+                continue
+            finally:
+                plt.close("all")
+            rows.append({
+                "prompt": prompt,
+                "setting": label,
+                "format": image.format,
+                "dpi": image.dpi,
+                "bytes": len(image.data),
+                "render_ms": round(image.render_seconds * 1000, 1),
+            })
+            print(f"{prompt:<20} {label:<22} {len(image.data) / 1024:>9.1f} KiB {image.render_seconds * 1000:>8.1f} ms  (dpi {image.dpi})")
+
+    print("\nTotals per setting:")
+    for label in SETTINGS:
+        selected = [r for r in rows if r["setting"] == label]
+        if selected:
+            total_kib = sum(r["bytes"] for r in selected) / 1024
+            total_ms = sum(r["render_ms"] for r in selected)
+            print(f"  {label:<22} {total_kib:>9.1f} KiB {total_ms:>8.1f} ms")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Local fake OpenWeatherMap and Tavily servers for offline benchmarks.
+
+One threaded HTTP server answers both APIs after a fixed delay:
+
+- ``GET /data/2.5/weather`` returns ``FAKE_WEATHER``
+- ``POST /search`` returns ``max_results`` fake Tavily results for the query
+
+:func:`fake_backend_env` gives the environment variables (base URLs and
+placeholder API keys) that point ``shared.weather`` and ``shared.search`` at
+it, so the tools run unchanged.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_WEATHER = {
+    "main": {"temp": 18.5, "feels_like": 17.9, "humidity": 61},
+    "weather": [{"description": "scattered clouds", "icon": "03d"}],
+    "wind": {"speed": 4.1},
+}
+
+
+def fake_search_results(query: str, max_results: int) -> dict:
+    return {
+        "query": query,
+        "results": [
+            {
+                "title": f"{query} - result {i + 1}",
+                "url": f"https://example.com/{i + 1}",
+                "content": f"Fake search result {i + 1} for '{query}'. " * 4,
+                "score": round(1.0 - i * 0.1, 2),
+            }
+            for i in range(max_results)
+        ],
+    }
+
+
+def start_fake_backends(delay: float = 0.0) -> ThreadingHTTPServer:
+    """Serve the fake weather and search APIs on a random local port after ``delay`` seconds."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, payload: dict) -> None:
+            time.sleep(delay)
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._reply(FAKE_WEATHER)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            self._reply(fake_search_results(request.get("query", ""), int(request.get("max_results", 5))))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fake_backend_env(server: ThreadingHTTPServer) -> dict[str, str]:
+    """Environment variables that point the weather and search tools at ``server``."""
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return {
+        "OPENWEATHER_BASE_URL": f"{base}/data/2.5/weather",
+        "OPENWEATHER_API_KEY": "fake",
+        "TAVILY_BASE_URL": base,
+        "TAVILY_API_KEY": "fake",
+    }
@@ -0,0 +1,130 @@
+"""Benchmark: import cost of building each server app (cold start).
+
+Runs ``python -X importtime`` in a fresh interpreter per scenario, building the
+app with ``shared.app_factory.create_app`` for one profile/provider, and
+reports wall time, total import time, module count and the most expensive
+top-level packages. Save results with ``--json`` and diff a later run against
+them with ``--compare`` to track import cost release over release.
+
+Building an app needs the server dependencies installed (no network calls are
+made; placeholder endpoints are used).
+
+Usage::
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 5 --json import_time.json
+    python -m benchmarks.import_time --compare import_time.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "factory module only": None,
+    "basic / azure-openai": {"profile": "basic", "provider": "azure-openai"},
+    "basic / azure-ai": {"profile": "basic", "provider": "azure-ai"},
+    "tools / azure-openai": {"profile": "tools", "provider": "azure-openai"},
+    "tools, calculate only": {"profile": "tools", "provider": "azure-openai", "tools": ("calculate",)},
+    "multi_agent / azure-openai": {"profile": "multi_agent", "provider": "azure-openai"},
+    "magentic / azure-openai": {"profile": "magentic", "provider": "azure-openai"},
+}
+
+PLACEHOLDER_ENV = {
+    "AZURE_OPENAI_ENDPOINT": "https://example.openai.azure.com/",
+    "AZURE_OPENAI_DEPLOYMENT_NAME": "gpt-4o-mini",
+    "AZURE_AI_ENDPOINT": "https://example.services.ai.azure.com/models",
+    "AZURE_AI_API_KEY": "placeholder",
+}
+
+SCRIPT = """
+import json, time
+start = time.perf_counter()
+from shared.app_factory import create_app
+from shared.config import ServerConfig
+kwargs = {kwargs!r}
+if kwargs is not None:
+    create_app(ServerConfig(**kwargs))
+print(json.dumps({{"wall_seconds": time.perf_counter() - start}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` per line, nesting kept as leading spaces."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        # The module column is "| name", with two extra spaces per nesting level
+        rows.append((parts[2].rstrip()[1:], int(parts[0]), int(parts[1])))
+    return rows
+
+
+def run_scenario(kwargs) -> dict:
+    env = {**os.environ, **PLACEHOLDER_ENV, "PYTHONPATH": str(PACKAGE_ROOT)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT.format(kwargs=kwargs)],
+        cwd=PACKAGE_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+        return {"error": error}
+
+    rows = parse_importtime(proc.stderr)
+    top_level = [(name, cumulative) for name, _, cumulative in rows if not name.startswith(" ")]
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "wall_seconds": json.loads(proc.stdout.strip().splitlines()[-1])["wall_seconds"],
+        "import_seconds": sum(self_us for _, self_us, _ in rows) / 1e6,
+        "modules": len(rows),
+        "top": [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in top_level[:10]],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest is kept")
+    parser.add_argument("--top", type=int, default=5, help="Top-level packages to list per scenario")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier --json run")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else {}
+    results = {}
+    for label, kwargs in SCENARIOS.items():
+        runs = [run_scenario(kwargs) for _ in range(args.repeat)]
+        ok = [r for r in runs if "error" not in r]
+        if not ok:
+            results[label] = runs[0]
+            print(f"{label:<28} failed: {runs[0]['error']}")
+            continue
+        best = min(ok, key=lambda r: r["wall_seconds"])
+        results[label] = best
+
+        line = f"{label:<28} {best['wall_seconds'] * 1000:>8.1f} ms wall {best['import_seconds'] * 1000:>8.1f} ms imports {best['modules']:>5} modules"
+        previous = baseline.get(label)
+        if previous and "wall_seconds" in previous:
+            delta = (best["wall_seconds"] - previous["wall_seconds"]) * 1000
+            line += f"  ({delta:+.1f} ms vs baseline)"
+        print(line)
+        for entry in best["top"][: args.top]:
+            print(f"    {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Deterministic chat client that streams scripted tokens and tool calls.
+
+:class:`MockChatClient` stands in for the Azure chat clients in offline
+benchmarks. It goes through the agent framework's function invocation and
+chat middleware like the real clients, so tools, telemetry, prompt-cache
+tracking and history compaction all run; only the model is scripted:
+
+- on a turn without tool results yet, it first calls every tool in
+  ``SCRIPTED_CALLS`` the agent exposes whose keywords appear in the latest
+  user message (after ``ttft`` seconds), all in one response;
+- otherwise it waits ``ttft`` seconds, streams ``tokens`` words of
+  ``REPLY_WORDS`` one every ``token_delay`` seconds, and reports usage.
+
+Every run with the same prompt produces the same events.
+"""
+
+import asyncio
+import itertools
+import json
+from typing import Any
+
+from agent_framework import (
+    BaseChatClient,
+    ChatMessage,
+    ChatResponse,
+    ChatResponseUpdate,
+    FunctionCallContent,
+    Role,
+    UsageContent,
+    UsageDetails,
+    use_chat_middleware,
+    use_function_invocation,
+)
+
+# tool name -> (keywords in the user message, arguments)
+SCRIPTED_CALLS: dict[str, tuple[tuple[str, ...], dict[str, Any]]] = {
+    "get_weather": (("weather", "temperature", "forecast"), {"location": "Paris"}),
+    "web_search": (("search", "news", "latest"), {"query": "Paris travel tips", "max_results": 3}),
+    "calculate": (("calculate", "compute", "math"), {"expression": "(17 * 23) + 42"}),
+    "search_restaurants": (("restaurant", "food", "eat"), {"location": "Paris"}),
+    "get_current_time": (("time", "clock"), {"timezone": "Europe/Paris"}),
+    "execute_python_code": (("chart", "plot", "python"), {"code": "print(sum(range(100)))"}),
+}
+
+REPLY_WORDS = (
+    "Here is a summary of what I found for you based on the latest "
+    "information available from the tools I used in this conversation."
+).split()
+
+
+def _last_user_text(messages: list[ChatMessage]) -> tuple[str, bool]:
+    """Return the latest user message and whether tool results follow it."""
+    has_tool_results = False
+    for message in reversed(messages):
+        if message.role == Role.TOOL:
+            has_tool_results = True
+        elif message.role == Role.USER:
+            return message.text or "", has_tool_results
+    return "", has_tool_results
+
+
+@use_function_invocation
+@use_chat_middleware
+class MockChatClient(BaseChatClient):
+    """Chat client with scripted output; see the module docstring."""
+
+    def __init__(self, ttft: float = 0.05, token_delay: float = 0.01, tokens: int = 40, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self._call_ids = itertools.count(1)
+
+    def _tool_calls(self, messages: list[ChatMessage], chat_options: Any) -> list[FunctionCallContent]:
+        text, has_tool_results = _last_user_text(messages)
+        if has_tool_results:
+            return []
+        text = text.lower()
+        available = {getattr(tool, "name", None) for tool in (chat_options.tools or [])}
+        return [
+            FunctionCallContent(call_id=f"call_{next(self._call_ids)}", name=name, arguments=json.dumps(arguments))
+            for name, (keywords, arguments) in SCRIPTED_CALLS.items()
+            if name in available and any(keyword in text for keyword in keywords)
+        ]
+
+    def _usage(self, messages: list[ChatMessage], output_tokens: int) -> UsageContent:
+        # Rough token count (4 characters per token) so usage-based metrics have data
+        input_tokens = sum(len(message.text or "") for message in messages) // 4
+        return UsageContent(details=UsageDetails(input_token_count=input_tokens, output_token_count=output_tokens))
+
+    async def _inner_get_response(self, *, messages: Any, chat_options: Any, **kwargs: Any) -> ChatResponse:
+        await asyncio.sleep(self.ttft)
+        calls = self._tool_calls(messages, chat_options)
+        if calls:
+            return ChatResponse(messages=ChatMessage(role=Role.ASSISTANT, contents=calls))
+        words = list(itertools.islice(itertools.cycle(REPLY_WORDS), self.tokens))
+        await asyncio.sleep(self.token_delay * len(words))
+        return ChatResponse(
+            messages=ChatMessage(role=Role.ASSISTANT, text=" ".join(words)),
+            usage_details=self._usage(messages, len(words)).details,
+        )
+
+    async def _inner_get_streaming_response(self, *, messages: Any, chat_options: Any, **kwargs: Any):
+        await asyncio.sleep(self.ttft)
+        calls = self._tool_calls(messages, chat_options)
+        if calls:
+            yield ChatResponseUpdate(role=Role.ASSISTANT, contents=calls)
+            return
+        for i, word in enumerate(itertools.islice(itertools.cycle(REPLY_WORDS), self.tokens)):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield ChatResponseUpdate(role=Role.ASSISTANT, text=word + " ")
+        yield ChatResponseUpdate(role=Role.ASSISTANT, contents=[self._usage(messages, self.tokens)])
@@ -0,0 +1,140 @@
+"""Benchmark: ``search_restaurants`` over the indexed catalog vs. a list scan.
+
+For each catalog size a synthetic catalog (cities, cuisines, ratings and
+prices drawn with a fixed seed) is written with
+``shared.restaurants.save_catalog`` and loaded with
+``RestaurantCatalog.load`` (memory-mapped columns plus the
+``(city, cuisine)`` index). Reported per size:
+
+- load time (map the files and build the index) and index memory
+- mean query latency for a city + cuisine, a city + ``"any"`` (heap merge
+  over every cuisine) and a city + cuisine substring (``"an"``: Italian,
+  Indian, ...), against
+- the old approach: filter a list of dicts with a linear scan, then sort by
+  rating (the list is built once here; the old tool rebuilt it per call).
+
+Results of both approaches are checked to return the same ratings.
+
+Usage::
+
+    python -m benchmarks.restaurant_catalog
+    python -m benchmarks.restaurant_catalog --sizes 10000 100000 --queries 500
+    python -m benchmarks.restaurant_catalog --keep /tmp/restaurants   # then RESTAURANT_CATALOG=/tmp/restaurants-1000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from shared.restaurants import RestaurantCatalog, normalize_city, save_catalog
+
+CUISINES = [
+    "Italian", "Japanese", "Mexican", "Indian", "Vegetarian", "French", "Chinese", "Thai", "Greek", "Spanish",
+    "Korean", "Vietnamese", "Lebanese", "Turkish", "American", "Brazilian", "Ethiopian", "Moroccan", "Peruvian",
+    "German", "Caribbean", "Seafood", "Steakhouse", "Vegan", "Bakery",
+]
+ADJECTIVES = ["Golden", "Little", "Blue", "Old", "Royal", "Green", "Happy", "Silver", "Red", "Hidden"]
+NOUNS = ["Fork", "Spoon", "Garden", "Kitchen", "Table", "House", "Corner", "Lantern", "Olive", "Oven"]
+
+
+def synthetic_venues(size: int, cities: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    city = rng.integers(0, cities, size)
+    cuisine = rng.integers(0, len(CUISINES), size)
+    rating = np.round(rng.uniform(2.0, 5.0, size), 1)
+    price = rng.integers(1, 5, size)
+    for i in range(size):
+        name = f"{ADJECTIVES[i % 10]} {NOUNS[i // 10 % 10]} {i}"
+        yield name, f"City {city[i]}", CUISINES[cuisine[i]], float(rating[i]), int(price[i])
+
+
+def scan(venues: list[dict], location: str, cuisine: str, k: int) -> list[dict]:
+    city = normalize_city(location)
+    wanted = cuisine.lower()
+    matches = [
+        venue for venue in venues
+        if venue["city"] == city and (wanted == "any" or wanted in venue["cuisine"].lower())
+    ]
+    return sorted(matches, key=lambda venue: -venue["rating"])[:k]
+
+
+def mean_us(func, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(*query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def run_size(size: int, args, directory: Path) -> dict:
+    cities = max(10, size // 500)
+    path = directory / f"restaurants-{size}"
+    start = time.perf_counter()
+    save_catalog(path, synthetic_venues(size, cities))
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    catalog = RestaurantCatalog.load(path)
+    load_seconds = time.perf_counter() - start
+    index_bytes = sum(posting.nbytes for posting in catalog._index.values())
+
+    venues = [
+        {"city": normalize_city(city), "rating": round(rating, 1), **{"name": name, "cuisine": cuisine, "price": "$" * price}}
+        for name, city, cuisine, rating, price in synthetic_venues(size, cities)
+    ]
+
+    rng = random.Random(11)
+    result = {"size": size, "cities": cities, "write_s": round(write_seconds, 3), "load_s": round(load_seconds, 3),
+              "index_mb": round(index_bytes / 2**20, 2), "queries": {}}
+    for label, cuisine in (("city + cuisine", None), ("city + any", "any"), ("city + substring", "an")):
+        queries = [
+            (f"City {rng.randrange(cities)}", cuisine or rng.choice(CUISINES), args.k)
+            for _ in range(args.queries)
+        ]
+        for location, wanted, k in queries[:5]:
+            indexed = [venue["rating"] for venue in catalog.search(location, wanted, k)]
+            assert indexed == [venue["rating"] for venue in scan(venues, location, wanted, k)], (location, wanted)
+        indexed_us = mean_us(catalog.search, queries)
+        scan_us = mean_us(lambda *query: scan(venues, *query), queries[: args.scan_queries])
+        result["queries"][label] = {"indexed_us": round(indexed_us, 1), "scan_us": round(scan_us, 1)}
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=2000, help="Indexed queries per query type")
+    parser.add_argument("--scan-queries", type=int, default=20, help="List-scan queries per query type")
+    parser.add_argument("-k", type=int, default=5, help="max_results per query")
+    parser.add_argument("--keep", help="Write catalogs under this directory instead of a temporary one")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(args.keep or tmp)
+        for size in args.sizes:
+            result = run_size(size, args, directory)
+            results.append(result)
+            print(
+                f"{size:>9,} rows, {result['cities']:,} cities: load {result['load_s'] * 1000:.1f} ms, "
+                f"index {result['index_mb']:.2f} MiB (write {result['write_s']:.1f}s)"
+            )
+            for label, timing in result["queries"].items():
+                speedup = timing["scan_us"] / timing["indexed_us"]
+                print(f"    {label:<17} indexed {timing['indexed_us']:>8.1f} us  scan {timing['scan_us']:>11.1f} us  ({speedup:,.0f}x)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
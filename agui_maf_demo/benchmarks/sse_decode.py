@@ -0,0 +1,193 @@
+"""Benchmark: decoding an AG-UI SSE stream replayed in network-sized chunks.
+
+A recorded event stream (``--stream``, or a synthetic one of ``--size``
+bytes: text deltas, tool calls with streamed arguments, ``tool_result`` and
+code-output ``CUSTOM`` events, with non-ASCII text) is cut into chunks of
+random size up to ``--max-chunk`` bytes, as TCP reads deliver it, and fed to:
+
+- ``split per chunk``: the old web UI loop, ``decode(chunk)`` without
+  ``stream: true`` and ``split("\\n")`` per chunk; events and characters
+  that cross a chunk boundary are lost;
+- ``concat + split``: the old thread-store collector, ``buffer += chunk``
+  then ``split(b"\\n\\n")`` on the whole buffer each time;
+- ``SSEDecoder``: ``shared.sse_decoder``.
+
+The same is repeated for a stream holding one large event (``--large``
+bytes of code output, e.g. a big dataframe print), where re-splitting the
+whole buffer on every chunk turns quadratic. Reported per decoder:
+throughput, events decoded and events lost or corrupted against the
+recording (JSON parsing alone bounds the throughput of all three).
+
+Usage::
+
+    python -m benchmarks.sse_decode
+    python -m benchmarks.sse_decode --size 4000000 --max-chunk 256
+    python -m benchmarks.sse_decode --record http://127.0.0.1:8888/ --prompt "weather in Paris" --stream /tmp/run.sse
+    python -m benchmarks.sse_decode --stream /tmp/run.sse
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.sse_decoder import SSEDecoder
+
+WORDS = "the agent streams a reply token by token — température, Größe, 東京, ✅ and more".split()
+
+
+def encode(event: dict) -> bytes:
+    return f"data: {json.dumps(event, separators=(',', ':'), ensure_ascii=False)}\n\n".encode()
+
+
+def synthetic_stream(size: int, seed: int = 3) -> bytes:
+    """About ``size`` bytes of AG-UI events shaped like a tool-using run."""
+    rng = random.Random(seed)
+    frames = [encode({"type": "RUN_STARTED", "threadId": "t", "runId": "r"})]
+    total = 0
+    while total < size:
+        message_id = uuid.UUID(int=rng.getrandbits(128)).hex
+        if rng.random() < 0.2:
+            call_id = f"call_{rng.randrange(10**6)}"
+            batch = [encode({"type": "TOOL_CALL_START", "toolCallId": call_id, "toolCallName": "get_weather"})]
+            arguments = json.dumps({"location": " ".join(rng.choices(WORDS, k=8))})
+            batch += [
+                encode({"type": "TOOL_CALL_ARGS", "toolCallId": call_id, "delta": arguments[i:i + 7]})
+                for i in range(0, len(arguments), 7)
+            ]
+            batch.append(encode({"type": "TOOL_CALL_END", "toolCallId": call_id}))
+            batch.append(encode({"type": "CUSTOM", "name": "tool_result", "value": {
+                "kind": "links", "query": "news", "results": [
+                    {"title": " ".join(rng.choices(WORDS, k=6)), "url": f"https://example.com/{rng.randrange(10**9)}"}
+                    for _ in range(5)
+                ],
+            }}))
+            batch.append(encode({"type": "CUSTOM", "name": "code_interpreter.output", "value": {
+                "job_id": "j", "stream": "stdout", "text": "\n".join(" ".join(rng.choices(WORDS, k=10)) for _ in range(20)),
+            }}))
+        else:
+            batch = [encode({"type": "TEXT_MESSAGE_START", "messageId": message_id, "role": "assistant"})]
+            batch += [
+                encode({"type": "TEXT_MESSAGE_CONTENT", "messageId": message_id, "delta": " ".join(rng.choices(WORDS, k=rng.randint(1, 12)))})
+                for _ in range(rng.randint(20, 120))
+            ]
+            batch.append(encode({"type": "TEXT_MESSAGE_END", "messageId": message_id}))
+        frames += batch
+        total += sum(map(len, batch))
+    frames.append(encode({"type": "RUN_FINISHED", "threadId": "t", "runId": "r"}))
+    return b"".join(frames)
+
+
+def large_event_stream(size: int) -> bytes:
+    text = "".join(f"{i:>8} | {'x' * 60}\n" for i in range(size // 71 + 1))
+    value = {"job_id": "j", "stream": "stdout", "text": text}
+    return encode({"type": "RUN_STARTED"}) + encode({"type": "CUSTOM", "name": "code_interpreter.output", "value": value}) + encode({"type": "RUN_FINISHED"})
+
+
+def record(url: str, prompt: str) -> bytes:
+    import httpx
+
+    body = {"threadId": uuid.uuid4().hex, "runId": uuid.uuid4().hex, "messages": [{"id": "1", "role": "user", "content": prompt}]}
+    with httpx.stream("POST", url, json=body, headers={"Accept": "text/event-stream"}, timeout=httpx.Timeout(10, read=None)) as response:
+        response.raise_for_status()
+        return b"".join(response.iter_raw())
+
+
+def split_per_chunk(chunks: list[bytes]) -> list[dict]:
+    events = []
+    for chunk in chunks:
+        for line in chunk.decode(errors="replace").split("\n"):
+            if line.startswith("data: "):
+                try:
+                    events.append(json.loads(line[6:]))
+                except ValueError:
+                    pass
+    return events
+
+
+def concat_split(chunks: list[bytes]) -> list[dict]:
+    events = []
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        *frames, buffer = buffer.split(b"\n\n")
+        for frame in frames:
+            for line in frame.split(b"\n"):
+                if line.startswith(b"data:"):
+                    try:
+                        events.append(json.loads(line[5:]))
+                    except ValueError:
+                        pass
+    return events
+
+
+def sse_decoder(chunks: list[bytes]) -> list[dict]:
+    decoder = SSEDecoder()
+    events = []
+    for chunk in chunks:
+        events += decoder.feed(chunk)
+    return events
+
+
+def cut(stream: bytes, max_chunk: int, seed: int = 5) -> list[bytes]:
+    rng = random.Random(seed)
+    chunks, position = [], 0
+    while position < len(stream):
+        size = rng.randint(1, max_chunk)
+        chunks.append(stream[position:position + size])
+        position += size
+    return chunks
+
+
+def lost(events: list[dict], expected: list[dict]) -> int:
+    """Expected events missing from ``events`` (dropped, truncated or garbled)."""
+    decoded = Counter(json.dumps(event, sort_keys=True) for event in events)
+    return sum((Counter(json.dumps(event, sort_keys=True) for event in expected) - decoded).values())
+
+
+def compare(label: str, stream: bytes, args) -> None:
+    expected = SSEDecoder().feed(stream)
+    chunks = cut(stream, args.max_chunk)
+    print(f"{label}: {len(stream) / 1e6:.2f} MB, {len(expected):,} events, {len(chunks):,} chunks of 1-{args.max_chunk} bytes")
+    for name, decode in (("split per chunk", split_per_chunk), ("concat + split", concat_split), ("SSEDecoder", sse_decoder)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            events = decode(chunks)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>18}: {len(stream) / 1e6 / best:7.1f} MB/s  {len(events):>7,} events  {lost(events, expected):>6,} lost or corrupted")
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stream", help="Recorded SSE stream to replay (written by --record)")
+    parser.add_argument("--record", metavar="URL", help="Record one run from a live AG-UI server into --stream")
+    parser.add_argument("--prompt", default="What's the weather in Paris? Also search for AI news.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Bytes of synthetic stream without --stream")
+    parser.add_argument("--large", type=int, default=1_000_000, help="Bytes of the single large event (0 skips)")
+    parser.add_argument("--max-chunk", type=int, default=1460, help="Largest network read in bytes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.stream:
+            parser.error("--record needs --stream to write to")
+        Path(args.stream).write_bytes(record(args.record, args.prompt))
+        print(f"💾 Recorded {Path(args.stream).stat().st_size:,} bytes to {args.stream}")
+    if args.stream:
+        compare(f"Recording {args.stream}", Path(args.stream).read_bytes(), args)
+    else:
+        compare("Synthetic run", synthetic_stream(args.size), args)
+    if args.large:
+        compare("One large event", large_event_stream(args.large), args)
+
+
+if __name__ == "__main__":
+    main()
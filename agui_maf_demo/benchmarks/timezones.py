@@ -0,0 +1,105 @@
+"""Benchmark: ``get_current_time`` timezone lookups, ``pytz`` vs. ``shared.timezones``.
+
+Per call, over a mix of names the model sends (IANA names, cities,
+abbreviations, offsets and typos):
+
+- ``pytz``:          the old path, ``import pytz`` + ``pytz.timezone(name)`` +
+  ``datetime.now(tz)`` inside the tool (exact IANA names only; the rest
+  raise and are counted as failures). Skipped when pytz is not installed.
+- ``index, cold``:   ``TimezoneIndex.resolve`` with the memo cleared first.
+- ``index, memoized``: the steady state for names seen before.
+- ``index, batch``:  ``TimezoneIndex.now`` over the whole mix in one call.
+
+Usage::
+
+    python -m benchmarks.timezones
+    python -m benchmarks.timezones --number 50000
+"""
+
+import argparse
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.timezones import TimezoneError, TimezoneIndex
+
+NAMES = [
+    "UTC",
+    "America/New_York",
+    "Europe/Paris",
+    "Tokyo",
+    "EST",
+    "new york",
+    "San Francisco",
+    "Paris, France",
+    "UTC+5:30",
+    "Sao Paolo",
+]
+
+
+def per_call_us(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Lookups per name and mode")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = TimezoneIndex.from_system()
+    print(f"Index: {len(index):,} keys built in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    for name in NAMES:
+        result = index.resolve(name)
+        print(f"{name!r:>20} -> {result.zone:<20} ({result.match})")
+
+    def old(name):
+        def run():
+            from datetime import datetime
+
+            import pytz
+
+            try:
+                return datetime.now(pytz.timezone(name))
+            except Exception:
+                return None
+
+        return run
+
+    def cold(name):
+        def run():
+            index._lookup.cache_clear()
+            return index.resolve(name)
+
+        return run
+
+    def memoized(name):
+        return lambda: index.resolve(name)
+
+    modes = [("index, cold", cold), ("index, memoized", memoized)]
+    try:
+        import pytz
+    except ImportError:
+        print("\npytz not installed; skipping the old path")
+    else:
+        failures = sum(old(name)() is None for name in NAMES)
+        print(f"\npytz resolves {len(NAMES) - failures}/{len(NAMES)} names")
+        modes.insert(0, ("pytz", old))
+
+    print(f"\nPer call, mean over {len(NAMES)} names x {args.number} runs")
+    for label, factory in modes:
+        # A cold lookup of a typo runs difflib (about a millisecond), so fewer runs
+        us = sum(per_call_us(factory(name), args.number // 10 if label == "index, cold" else args.number) for name in NAMES)
+        print(f"{label:>18}: {us / len(NAMES):8.2f} us/call")
+    batch_us = per_call_us(lambda: index.now(NAMES), args.number // 10)
+    print(f"{'index, batch':>18}: {batch_us:8.2f} us for all {len(NAMES)} ({batch_us / len(NAMES):.2f} us/name)")
+
+    assert all(not isinstance(result, TimezoneError) for result in index.resolve_many(NAMES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: turn latency of a multi-tool turn, sequential vs. fan-out.
+
+Simulates the turn behind "Research weather in Paris and London, then create
+a comparison chart": the model emits ``get_weather`` twice and ``web_search``
+once, plus a synchronous tool (``search_restaurants``-style). Tools are stubs
+that sleep for a fixed latency, so no network or model is involved.
+
+Modes compared:
+
+- ``sequential``:        each call awaited after the previous one (sum of latencies).
+- ``fan-out, sync inline``: calls gathered, but the synchronous tool blocks the
+  event loop while it runs, so it still adds its full latency.
+- ``fan-out``:           calls gathered with ``shared.tool_fanout.fan_out`` and the
+  synchronous tool wrapped in ``run_in_thread`` (max of latencies).
+- ``fan-out, limit N``:  same with ``--limit`` concurrent calls per turn.
+
+Every mode must return results in the order the calls were emitted.
+
+Usage::
+
+    python -m benchmarks.tool_fanout
+    python -m benchmarks.tool_fanout --latency 0.4 --search-latency 0.8 --limit 2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.tool_fanout import fan_out, run_in_thread
+
+
+def make_calls(latency: float, search_latency: float, sync_latency: float, offload: bool):
+    async def get_weather(city: str):
+        await asyncio.sleep(latency)
+        return f"weather:{city}"
+
+    async def web_search(query: str):
+        await asyncio.sleep(search_latency)
+        return f"search:{query}"
+
+    def search_restaurants(location: str):
+        time.sleep(sync_latency)
+        return f"restaurants:{location}"
+
+    async def inline(func, *args):
+        return func(*args)
+
+    restaurants = run_in_thread(search_restaurants) if offload else (lambda loc: inline(search_restaurants, loc))
+    calls = [
+        lambda: get_weather("Paris"),
+        lambda: restaurants("Paris"),
+        lambda: get_weather("London"),
+        lambda: web_search("Paris vs London climate"),
+    ]
+    expected = ["weather:Paris", "restaurants:Paris", "weather:London", "search:Paris vs London climate"]
+    return calls, expected
+
+
+async def run_mode(mode: str, args) -> dict:
+    offload = mode.startswith("fan-out") and "inline" not in mode
+    calls, expected = make_calls(args.latency, args.search_latency, args.sync_latency, offload)
+    start = time.perf_counter()
+    if mode == "sequential":
+        results = [await call() for call in calls]
+    else:
+        limit = args.limit if "limit" in mode else len(calls)
+        results = await fan_out(calls, max_concurrency=limit)
+    elapsed = time.perf_counter() - start
+    return {"mode": mode, "seconds": elapsed, "ordered": results == expected}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.4, help="Stub get_weather latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.7, help="Stub web_search latency in seconds")
+    parser.add_argument("--sync-latency", type=float, default=0.2, help="Stub synchronous tool latency in seconds")
+    parser.add_argument("--limit", type=int, default=2, help="Per-turn concurrency limit for the limited mode")
+    args = parser.parse_args()
+
+    latencies = [args.latency, args.sync_latency, args.latency, args.search_latency]
+    print(f"🔧 4 tool calls, latencies {', '.join(f'{l:.2f}s' for l in latencies)}")
+    print(f"   sum {sum(latencies):.2f}s, max {max(latencies):.2f}s\n")
+
+    for mode in ("sequential", "fan-out, sync inline", "fan-out", f"fan-out, limit {args.limit}"):
+        result = await run_mode(mode, args)
+        order = "✅ in order" if result["ordered"] else "❌ out of order"
+        print(f"{result['mode']:>22}: {result['seconds']:.3f}s  {order}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
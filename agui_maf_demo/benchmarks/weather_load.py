@@ -0,0 +1,106 @@
+"""Load test: concurrent SSE streams vs. a slow weather lookup.
+
+Starts a local fake OpenWeatherMap server that answers after a fixed delay,
+then simulates several SSE streams (each "emitting a token" every few
+milliseconds) while weather lookups run on the same event loop.
+
+Two modes are compared:
+
+- ``blocking``: the old ``httpx.get(...)`` call made from inside the loop.
+- ``async``:    ``shared.weather.fetch_weather`` over the pooled ``AsyncClient``.
+
+With the blocking call, the worst token gap on every stream grows to the
+upstream delay and concurrent lookups serialize (wall time ~ N * delay).
+With the async client, streams keep ticking and lookups overlap
+(wall time ~ delay).
+
+Usage::
+
+    python -m benchmarks.weather_load --streams 20 --lookups 5 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from benchmarks.fake_backends import start_fake_backends
+from shared.http_clients import close_http_client
+from shared.weather import fetch_weather
+
+async def simulated_stream(stop: asyncio.Event, interval: float) -> float:
+    """Tick every ``interval`` seconds until stopped; return the worst gap seen."""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+    return worst
+
+
+async def blocking_lookup(url: str, location: str) -> dict:
+    response = httpx.get(url, params={"q": location, "appid": "test", "units": "metric"}, timeout=10.0)
+    response.raise_for_status()
+    return response.json()
+
+
+async def async_lookup(url: str, location: str) -> dict:
+    return await fetch_weather(location, "test")
+
+
+async def run_mode(mode: str, url: str, streams: int, lookups: int, interval: float) -> dict:
+    lookup = blocking_lookup if mode == "blocking" else async_lookup
+    stop = asyncio.Event()
+    stream_tasks = [asyncio.create_task(simulated_stream(stop, interval)) for _ in range(streams)]
+    await asyncio.sleep(interval * 5)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup(url, f"City{i}") for i in range(lookups)))
+    lookup_wall = time.perf_counter() - start
+
+    await asyncio.sleep(interval * 5)
+    stop.set()
+    worst_gaps = await asyncio.gather(*stream_tasks)
+    return {
+        "mode": mode,
+        "lookup_wall_s": round(lookup_wall, 3),
+        "worst_stream_stall_ms": round(max(worst_gaps) * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=20, help="Concurrent simulated SSE streams")
+    parser.add_argument("--lookups", type=int, default=5, help="Concurrent weather lookups")
+    parser.add_argument("--delay", type=float, default=0.5, help="Fake upstream latency in seconds")
+    parser.add_argument("--interval", type=float, default=0.01, help="Token interval per stream in seconds")
+    args = parser.parse_args()
+
+    server = start_fake_backends(args.delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}/data/2.5/weather"
+    os.environ["OPENWEATHER_BASE_URL"] = url
+
+    print(f"🌤️  Fake weather server on {url} (delay {args.delay}s)")
+    print(f"   {args.streams} streams, {args.lookups} concurrent lookups\n")
+    try:
+        for mode in ("blocking", "async"):
+            result = await run_mode(mode, url, args.streams, args.lookups, args.interval)
+            print(
+                f"{result['mode']:>8}: lookups took {result['lookup_wall_s']:.3f}s, "
+                f"worst stream stall {result['worst_stream_stall_ms']:.1f} ms"
+            )
+    finally:
+        await close_http_client()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,10 +2,17 @@
 
 This client connects to an AG-UI server and enables interactive chat
 with streaming responses displayed in real-time.
+
+With ``--raw`` it talks AG-UI directly instead of through the agent
+framework: it posts the conversation with httpx and decodes the SSE
+response with ``shared.sse_decoder``, printing text deltas, tool calls and
+custom events as they arrive.
 """
 
+import argparse
 import asyncio
 import os
+import uuid
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -66,5 +73,66 @@ async def main():
         print(f"\n\033[91m❌ An error occurred: {e}\033[0m")
 
 
+async def raw_main():
+    """Interactive chat over raw AG-UI events (no agent framework on the client)."""
+    import httpx
+
+    from shared.sse_decoder import aiter_events
+
+    server_url = os.environ.get("AGUI_SERVER_URL", "http://127.0.0.1:8888/")
+    print(f"🔌 Connecting to AG-UI server at: {server_url} (raw events)\n")
+
+    thread_id = uuid.uuid4().hex
+    history = []
+
+    print("💬 AG-UI Client - Raw Event Stream")
+    print("=" * 50)
+    print("Type your messages and press Enter.")
+    print("Type ':q' or 'quit' to exit.\n")
+
+    try:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(10, read=None)) as http:
+            while True:
+                message = input("\n\033[1;34mUser:\033[0m ")
+                if not message.strip():
+                    print("\033[91m⚠️  Request cannot be empty.\033[0m")
+                    continue
+
+                if message.lower() in (":q", "quit"):
+                    print("\n👋 Goodbye!")
+                    break
+
+                history.append({"id": uuid.uuid4().hex, "role": "user", "content": message})
+                body = {"threadId": thread_id, "runId": uuid.uuid4().hex, "messages": history}
+                reply = []
+
+                print("\n\033[1;32mAssistant:\033[0m ", end="", flush=True)
+                async with http.stream("POST", server_url, json=body, headers={"Accept": "text/event-stream"}) as response:
+                    response.raise_for_status()
+                    # Raw chunks: the decoder reassembles events split across reads
+                    async for event in aiter_events(response.aiter_raw()):
+                        kind = event.get("type")
+                        if kind == "TEXT_MESSAGE_CONTENT":
+                            reply.append(event.get("delta", ""))
+                            print(f"\033[96m{event.get('delta', '')}\033[0m", end="", flush=True)
+                        elif kind == "TOOL_CALL_START":
+                            print(f"\n  \033[95m🔧 Calling tool: {event.get('toolCallName')}\033[0m")
+                        elif kind == "CUSTOM":
+                            print(f"\n  \033[93m📨 {event.get('name')}: {str(event.get('value'))[:200]}\033[0m")
+                        elif kind == "RUN_ERROR":
+                            print(f"\n\033[91m❌ Run failed: {event.get('message')}\033[0m")
+
+                history.append({"id": uuid.uuid4().hex, "role": "assistant", "content": "".join(reply)})
+                print("\n")
+
+    except KeyboardInterrupt:
+        print("\n\n👋 Goodbye!")
+    except Exception as e:
+        print(f"\n\033[91m❌ An error occurred: {e}\033[0m")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Interactive AG-UI chat client")
+    parser.add_argument("--raw", action="store_true", help="Decode AG-UI events directly instead of using AGUIChatClient")
+    args = parser.parse_args()
+    asyncio.run(raw_main() if args.raw else main())
@@ -60,7 +60,8 @@ async def main():
             print("\n\033[1;32mAssistant:\033[0m ", end="", flush=True)
             
             current_tool_name = None
-            accumulated_args = ""
+            # Argument chunks, joined once when the result arrives
+            arg_chunks: list[str] = []
             
             async for update in agent.run_stream(message, thread=thread):
                 # Display text content
@@ -74,17 +75,17 @@ async def main():
                         if current_tool_name != content.name:
                             # New tool call
                             current_tool_name = content.name
-                            accumulated_args = ""
+                            arg_chunks.clear()
                             print(f"\n\n  \033[95m🔧 Calling tool: {content.name}\033[0m")
                         
                         # Accumulate arguments (they stream in chunks)
                         if content.arguments:
-                            accumulated_args += str(content.arguments)
+                            arg_chunks.append(str(content.arguments))
                         
                     elif isinstance(content, FunctionResultContent):
                         # Display accumulated arguments before result
-                        if accumulated_args:
-                            print(f"  \033[95m📋 Arguments: {accumulated_args}\033[0m")
+                        if arg_chunks:
+                            print(f"  \033[95m📋 Arguments: {''.join(arg_chunks)}\033[0m")
                         
                         print(f"  \033[93m⏳ Executed\033[0m")
                         
@@ -99,7 +100,7 @@ async def main():
                         
                         # Reset for next tool call
                         current_tool_name = None
-                        accumulated_args = ""
+                        arg_chunks.clear()
                         
                         print("\033[1;32mAssistant:\033[0m ", end="", flush=True)
 
@@ -0,0 +1,76 @@
+"""Production entry point: serve an AG-UI server with several worker processes.
+
+The ``server_*.py`` scripts run one uvicorn process on one core. This runs N
+workers through the server's ``create_app`` factory, each with its own event
+loop, HTTP client and sandbox pool. State that must be visible to every worker
+lives under ``SHARED_STATE_DIR`` (a tmpfs directory by default):
+
+- generated charts (``shared.image_store.SharedImageStore``),
+- weather/search results (``shared.ttl_cache.SharedCacheTier``),
+- conversation threads (``shared.thread_store.SQLiteThreadStore``).
+
+Counters at the ``/…/stats`` endpoints and readiness are per worker.
+
+Usage::
+
+    python serve.py
+    python serve.py --app server_multi_agent:create_app --workers 4 --port 8888
+    AGUI_PROFILE=tools python serve.py --app shared.app_factory:create_app
+
+Configuration (flags override environment variables):
+
+- ``SERVER_APP`` app factory (default ``server_magentic:create_app``)
+- ``SERVER_HOST`` (default ``127.0.0.1``), ``SERVER_PORT`` (default 8888)
+- ``SERVER_WORKERS`` worker processes (default 1)
+- ``SERVER_KEEP_ALIVE`` idle keep-alive timeout in seconds (default 5)
+- ``SHARED_STATE_DIR`` shared state directory (default
+  ``/dev/shm/agui-<port>`` when running more than one worker)
+"""
+
+import argparse
+import os
+import tempfile
+
+from dotenv import load_dotenv
+
+
+def default_shared_state_dir(port: int) -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, f"agui-{port}")
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.environ.get("SERVER_APP", "server_magentic:create_app"))
+    parser.add_argument("--host", default=os.environ.get("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SERVER_PORT", "8888")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("SERVER_WORKERS", "1")))
+    parser.add_argument("--keep-alive", type=int, default=int(os.environ.get("SERVER_KEEP_ALIVE", "5")))
+    args = parser.parse_args()
+
+    if args.workers > 1 and not os.environ.get("SHARED_STATE_DIR"):
+        # Inherited by the worker processes before they import the app
+        os.environ["SHARED_STATE_DIR"] = default_shared_state_dir(args.port)
+    if os.environ.get("SHARED_STATE_DIR"):
+        os.makedirs(os.environ["SHARED_STATE_DIR"], exist_ok=True)
+
+    import uvicorn
+
+    print(f"\n🚀 Serving {args.app} on http://{args.host}:{args.port}")
+    print(f"👷 Workers: {args.workers} | keep-alive: {args.keep_alive}s")
+    if os.environ.get("SHARED_STATE_DIR"):
+        print(f"🗂️  Shared state: {os.environ['SHARED_STATE_DIR']}")
+
+    uvicorn.run(
+        args.app,
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=args.keep_alive,
+    )
+
+
+if __name__ == "__main__":
+    main()
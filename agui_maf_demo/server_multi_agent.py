@@ -1,413 +1,28 @@
 """AG-UI Multi-Agent Server with Specialized Agents.
 
 This server demonstrates a multi-agent system where:
-- OrchestratorAgent: Routes requests to specialized agents
+- A router (``shared.routing``) sends each request to one specialist
 - ResearchAgent: Handles web search and current information
 - WeatherAgent: Handles weather and location queries
 - DataAgent: Handles calculations and data processing
+- OrchestratorAgent: Has all tools, for requests spanning several domains
 
-Agents can hand off tasks to each other for specialized handling.
+The app itself is built by ``shared.app_factory.create_app`` from the
+``multi_agent`` profile (``shared.profiles``).
 """
 
-import os
-import sys
-import io
-import base64
-from typing import Annotated, Any
-from dotenv import load_dotenv
+from shared.app_factory import create_app as build_app, run
+from shared.config import ServerConfig
 
-# Load environment variables from .env file
-load_dotenv()
 
-from agent_framework import ChatAgent, ai_function
-from agent_framework.azure import AzureOpenAIChatClient
-from agent_framework_ag_ui import add_agent_framework_fastapi_endpoint
-from azure.identity import AzureCliCredential
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import Field
-import httpx
-from tavily import TavilyClient
-import uuid
+def config() -> ServerConfig:
+    return ServerConfig.from_env(profile="multi_agent")
 
-# Global storage for images (in production, use Redis or S3)
-image_storage = {}
 
-# ========================================
-# Tool Definitions
-# ========================================
-
-@ai_function
-def get_weather(
-    location: Annotated[str, Field(description="The city name, e.g., 'Paris' or 'Toronto'")],
-) -> str:
-    """Get the current weather for a location."""
-    api_key = os.environ.get("OPENWEATHER_API_KEY")
-    if not api_key:
-        return "Weather API key not configured."
-    
-    try:
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&units=metric"
-        response = httpx.get(url, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        
-        temp = data["main"]["temp"]
-        feels_like = data["main"]["feels_like"]
-        description = data["weather"][0]["description"]
-        humidity = data["main"]["humidity"]
-        wind_speed = data["wind"]["speed"]
-        icon = data["weather"][0]["icon"]
-        
-        # Return rich formatted response with special markers for UI parsing
-        return f"""🌤️ **Weather in {location}**
-
-**Temperature:** {temp}°C (feels like {feels_like}°C)
-**Conditions:** {description.title()}
-**Humidity:** {humidity}%
-**Wind Speed:** {wind_speed} m/s
-
-[WEATHER_ICON]https://openweathermap.org/img/wn/{icon}@2x.png[/WEATHER_ICON]"""
-    except Exception as e:
-        return f"Error getting weather: {str(e)}"
-
-
-@ai_function
-def web_search(
-    query: Annotated[str, Field(description="The search query")],
-    max_results: Annotated[int, Field(description="Maximum number of results")] = 5,
-) -> str:
-    """Search the web for current information."""
-    api_key = os.environ.get("TAVILY_API_KEY")
-    if not api_key:
-        return "Tavily API key not configured."
-    
-    try:
-        tavily_client = TavilyClient(api_key=api_key)
-        response = tavily_client.search(query=query, max_results=max_results)
-        
-        # Format results with rich markup for UI rendering
-        result_text = f"🔍 **Web Search Results for:** {query}\n\n"
-        
-        for idx, result in enumerate(response.get("results", []), 1):
-            title = result.get("title", "")
-            url = result.get("url", "")
-            content = result.get("content", "")
-            
-            result_text += f"**{idx}. {title}**\n"
-            result_text += f"{content}\n"
-            result_text += f"[LINK]{url}[/LINK]\n\n"
-        
-        return result_text
-    except Exception as e:
-        return f"Error performing web search: {str(e)}"
-
-
-@ai_function
-def calculate(
-    expression: Annotated[str, Field(description="Mathematical expression to evaluate")],
-) -> str:
-    """Perform mathematical calculations."""
-    try:
-        result = eval(expression, {"__builtins__": {}}, {})
-        # Return rich formatted calculation result
-        return f"""🔢 **Calculation**
-
-**Expression:** `{expression}`
-**Result:** `{result}`
-
-[CALC_RESULT]{result}[/CALC_RESULT]"""
-    except Exception as e:
-        return f"Error calculating '{expression}': {str(e)}"
-
-
-@ai_function
-def execute_python_code(
-    code: Annotated[str, Field(description="Python code to execute for data analysis or visualization")],
-    description: Annotated[str, Field(description="Brief description of what the code does")] = "",
-) -> str:
-    """Execute Python code for data analytics and visualization.
-    
-    Supports:
-    - Data analysis with pandas, numpy
-    - Visualizations with matplotlib, seaborn, plotly
-    - Statistical computations
-    - Machine learning with scikit-learn
-    
-    The code can create charts which will be displayed as images in the UI.
-    Use print() to show text output.
-    """
-    try:
-        # Capture stdout and stderr
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        sys.stdout = io.StringIO()
-        sys.stderr = io.StringIO()
-        
-        # Create a safe execution environment with common data science libraries
-        exec_globals = {
-            "__builtins__": __builtins__,
-        }
-        
-        # Try to import common libraries
-        try:
-            import numpy as np
-            import pandas as pd
-            import matplotlib
-            matplotlib.use('Agg')  # Non-interactive backend
-            import matplotlib.pyplot as plt
-            import seaborn as sns
-            
-            exec_globals.update({
-                "np": np,
-                "numpy": np,
-                "pd": pd,
-                "pandas": pd,
-                "plt": plt,
-                "matplotlib": matplotlib,
-                "sns": sns,
-                "seaborn": sns,
-            })
-        except ImportError:
-            pass
-        
-        # Execute the code
-        exec(code, exec_globals)
-        
-        # Capture output
-        output = sys.stdout.getvalue()
-        errors = sys.stderr.getvalue()
-        
-        # Restore stdout/stderr
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        
-        # Check if matplotlib figures were created
-        images = []
-        if 'plt' in exec_globals:
-            try:
-                fig_nums = plt.get_fignums()
-                for fig_num in fig_nums:
-                    fig = plt.figure(fig_num)
-                    buf = io.BytesIO()
-                    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-                    buf.seek(0)
-                    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-                    images.append(img_base64)
-                    buf.close()
-                plt.close('all')
-            except Exception as e:
-                errors += f"\nError capturing plot: {str(e)}"
-        
-        # Build result with rich formatting
-        result = f"📊 **Code Execution Result**\n\n"
-        
-        if description:
-            result += f"**Task:** {description}\n\n"
-        
-        if output:
-            result += f"**Output:**\n```\n{output}\n```\n\n"
-        
-        if errors:
-            result += f"**Warnings:**\n```\n{errors}\n```\n\n"
-        
-        # Store images and return references
-        for idx, img_data in enumerate(images, 1):
-            img_id = str(uuid.uuid4())
-            image_storage[img_id] = img_data
-            result += f"[IMAGE_ID]{img_id}[/IMAGE_ID]\n\n"
-        
-        if not output and not images and not errors:
-            result += "Code executed successfully (no output).\n"
-        
-        return result
-        
-    except Exception as e:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        return f"❌ **Execution Error**\n\n```\n{str(e)}\n```"
-
-
-# ========================================
-# Specialized Agents
-# ========================================
-
-# Read required configuration
-endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
-deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME")
-
-if not endpoint or not deployment_name:
-    raise ValueError("AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT_NAME required")
-
-# Create chat client
-chat_client = AzureOpenAIChatClient(
-    credential=AzureCliCredential(),
-    endpoint=endpoint,
-    deployment_name=deployment_name,
-)
-
-# ResearchAgent - Specialized in web search and current information
-research_agent = ChatAgent(
-    name="ResearchAgent",
-    instructions="""You are a research specialist with expertise in finding and analyzing current information.
-
-Your capabilities:
-- Search the web for latest news, trends, and information
-- Provide well-sourced, up-to-date answers
-- Cite your sources and explain findings clearly
-
-When you receive a query:
-1. Use web_search to find current information
-2. Analyze and synthesize the results
-3. Provide a comprehensive answer with sources
-
-Be thorough, accurate, and always cite where information comes from.""",
-    chat_client=chat_client,
-    tools=[web_search],
-)
-
-# WeatherAgent - Specialized in weather and location information
-weather_agent = ChatAgent(
-    name="WeatherAgent",
-    instructions="""You are a weather and location specialist.
-
-Your capabilities:
-- Provide current weather conditions for any location
-- Explain weather patterns and forecasts
-- Give location-specific advice based on weather
-
-When you receive a weather query:
-1. Use get_weather to fetch current conditions
-2. Provide a clear, conversational explanation
-3. Add helpful context (e.g., "Great weather for outdoor activities!")
-
-Be friendly and helpful with weather information.""",
-    chat_client=chat_client,
-    tools=[get_weather],
-)
-
-# DataAgent - Specialized in calculations, data analysis, and visualization
-data_agent = ChatAgent(
-    name="DataAgent",
-    instructions="""You are a data science specialist with expertise in analytics and visualization.
-
-Your capabilities:
-- Perform mathematical calculations
-- Execute Python code for data analysis
-- Create visualizations with matplotlib, seaborn, plotly
-- Statistical analysis with pandas and numpy
-- Generate insights from data
-
-When you receive a data query:
-1. Use calculate for simple math operations
-2. Use execute_python_code for:
-   - Complex data analysis
-   - Creating charts and visualizations
-   - Statistical computations
-   - Data transformations
-3. Write clean, well-commented Python code
-4. Explain findings clearly with visualizations
-
-IMPORTANT: When tools return [IMAGE] or [CALC_RESULT] markers, include them in your response!
-
-Be thorough, create helpful visualizations, and explain insights clearly.""",
-    chat_client=chat_client,
-    tools=[calculate, execute_python_code],
-)
-
-# OrchestratorAgent - Routes requests to specialists
-orchestrator_agent = ChatAgent(
-    name="OrchestratorAgent",
-    instructions="""You are an intelligent orchestrator that routes user requests to specialized agents.
-
-You have access to all tools and should handle requests intelligently:
-
-🚨 CRITICAL FORMATTING RULE 🚨
-When tools return content with special markers [WEATHER_ICON], [LINK], [CALC_RESULT], or [IMAGE_ID]:
-- You MUST copy the ENTIRE marker with ALL its content character-by-character
-- NEVER write just "[IMAGE_ID]" - you must include the full [IMAGE_ID]uuid[/IMAGE_ID] 
-- NEVER summarize or paraphrase markers
-- The [IMAGE_ID] marker contains a UUID that must be preserved exactly
-- Example: [IMAGE_ID]550e8400-e29b-41d4-a716-446655440000[/IMAGE_ID]
-
-For RESEARCH queries (news, current events, "search for", "what's happening"):
-- Use web_search tool directly
-- Include all [LINK]url[/LINK] markers from results exactly as returned
-- Cite sources clearly
-
-For WEATHER queries:
-- Use get_weather tool directly
-- Include the full [WEATHER_ICON]url[/WEATHER_ICON] marker exactly as returned
-- Preserve all temperature and conditions formatting
-
-For CALCULATIONS:
-- Use calculate tool for simple math
-- Include the [CALC_RESULT]number[/CALC_RESULT] marker exactly as returned
-
-For DATA ANALYSIS and VISUALIZATION:
-- Use execute_python_code for:
-  * Data analytics with pandas/numpy
-  * Creating charts with matplotlib/seaborn
-  * Statistical analysis
-  * Machine learning tasks
-- Write clean Python code that generates visualizations
-- When the tool returns [IMAGE_ID]uuid[/IMAGE_ID], copy it EXACTLY
-- Include all [IMAGE_ID] markers in your response
-- Explain what the code does and interpret the results
-
-For COMPLEX queries spanning multiple domains:
-- Use multiple tools as needed
-- Preserve all formatting markers from all tool results
-- Coordinate information from different sources
-
-Always preserve rich formatting markers in your responses!""",
-    chat_client=chat_client,
-    tools=[get_weather, web_search, calculate, execute_python_code],
-)
-
-
-# ========================================
-# Server Configuration
-# ========================================
-
-app = FastAPI(title="AG-UI Multi-Agent Server")
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Register the orchestrator agent as the main endpoint
-# In a more advanced setup, you could have separate endpoints for each agent
-add_agent_framework_fastapi_endpoint(app, orchestrator_agent, "/")
-
-# Image retrieval endpoint
-@app.get("/images/{image_id}")
-async def get_image(image_id: str):
-    """Retrieve a generated image by ID."""
-    from fastapi.responses import Response
-    if image_id in image_storage:
-        import base64
-        img_bytes = base64.b64decode(image_storage[image_id])
-        return Response(content=img_bytes, media_type="image/png")
-    return {"error": "Image not found"}, 404
+def create_app():
+    """App factory for ``serve.py --app server_multi_agent:create_app``."""
+    return build_app(config())
 
 
 if __name__ == "__main__":
-    import uvicorn
-
-    print("\n🚀 Starting AG-UI Multi-Agent Server...")
-    print(f"📡 Endpoint: {endpoint}")
-    print(f"🤖 Model: {deployment_name}")
-    print("\n👥 Intelligent Orchestrator:")
-    print("   - OrchestratorAgent: Smart coordinator with all tools")
-    print("   - Uses web_search for research & news")
-    print("   - Uses get_weather for weather queries")
-    print("   - Uses calculate & analyze_data for math/data")
-    print(f"\n🌐 Server URL: http://127.0.0.1:8888/\n")
-    
-    uvicorn.run(app, host="127.0.0.1", port=8888)
+    run(config())
@@ -0,0 +1,6 @@
+"""Shared building blocks for the AG-UI demo servers.
+
+The ``server_*.py`` scripts stay self-contained demos; anything that needs to
+live for the whole process (HTTP connection pools, caches, worker pools) is
+kept here so every server can reuse it.
+"""
@@ -0,0 +1,128 @@
+"""Side channel for pushing extra AG-UI events into a running SSE stream.
+
+``add_agent_framework_fastapi_endpoint`` only emits events derived from agent
+updates, so a tool that is still running (e.g. a long ``execute_python_code``
+job) has no way to show progress. :class:`AGUIEventsMiddleware` wraps the
+AG-UI endpoint: for each run it installs an :class:`EventSink` in a context
+variable, and a pump task writes whatever tools emit into the same SSE
+response, between the framework's own events.
+
+Tools call :func:`emit_custom_event`, which produces an AG-UI ``CUSTOM``
+event (``{"type": "CUSTOM", "name": ..., "value": ...}``) and is a no-op when
+no stream is attached (scripts, benchmarks, non-SSE callers).
+"""
+
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, Optional
+
+_current_sink: ContextVar[Optional["EventSink"]] = ContextVar("agui_event_sink", default=None)
+
+
+class EventSink:
+    """Bounded queue of pending side-channel events for one run."""
+
+    def __init__(self, max_pending: int = 1000):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def emit(self, event: dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def get(self) -> dict[str, Any]:
+        return await self._queue.get()
+
+    def drain(self) -> list[dict[str, Any]]:
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+
+def has_event_stream() -> bool:
+    """True when the current run has an SSE stream attached."""
+    return _current_sink.get() is not None
+
+
+def emit_event(event: dict[str, Any]) -> bool:
+    sink = _current_sink.get()
+    if sink is None:
+        return False
+    return sink.emit(event)
+
+
+def emit_custom_event(name: str, value: Any) -> bool:
+    """Queue an AG-UI ``CUSTOM`` event for the current run's SSE stream."""
+    return emit_event({"type": "CUSTOM", "name": name, "value": value})
+
+
+def encode_sse(event: dict[str, Any]) -> bytes:
+    return f"data: {json.dumps(event, separators=(',', ':'))}\n\n".encode()
+
+
+class AGUIEventsMiddleware:
+    """ASGI middleware merging side-channel events into AG-UI SSE responses."""
+
+    def __init__(self, app, path: str = "/"):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        sink = EventSink()
+        token = _current_sink.set(sink)
+        lock = asyncio.Lock()
+        # held: the event the pump has dequeued and is waiting to send
+        state = {"streaming": False, "closed": False, "held": None}
+        pump: Optional[asyncio.Task] = None
+
+        async def pump_events():
+            while True:
+                state["held"] = await sink.get()
+                async with lock:
+                    if state["closed"]:
+                        return
+                    event, state["held"] = state["held"], None
+                    await send({"type": "http.response.body", "body": encode_sse(event), "more_body": True})
+
+        async def guarded_send(message):
+            nonlocal pump
+            async with lock:
+                if message["type"] == "http.response.start":
+                    headers = dict(message.get("headers", []))
+                    state["streaming"] = headers.get(b"content-type", b"").startswith(b"text/event-stream")
+                    await send(message)
+                    if state["streaming"]:
+                        pump = asyncio.get_running_loop().create_task(pump_events())
+                    return
+                if message["type"] == "http.response.body" and state["streaming"] and not message.get("more_body", False):
+                    # Flush anything tools emitted before the stream closes, starting
+                    # with the event the pump took but could not send yet; the pump
+                    # may take another one while these sends are in progress
+                    while True:
+                        pending = ([state["held"]] if state["held"] is not None else []) + sink.drain()
+                        state["held"] = None
+                        if not pending:
+                            break
+                        for event in pending:
+                            await send({"type": "http.response.body", "body": encode_sse(event), "more_body": True})
+                    state["closed"] = True
+                await send(message)
+
+        try:
+            await self.app(scope, receive, guarded_send)
+        finally:
+            state["closed"] = True
+            if pump is not None:
+                pump.cancel()
+                await asyncio.gather(pump, return_exceptions=True)
+            _current_sink.reset(token)
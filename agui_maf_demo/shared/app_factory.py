@@ -0,0 +1,293 @@
+"""Single app factory behind every demo server.
+
+``create_app(config)`` builds the FastAPI app for a profile (see
+``shared.profiles``): chat client, agents, tools, middleware and the
+operational endpoints. It replaces six near-identical ``server_*.py`` module
+bodies, which are now thin wrappers choosing a profile.
+
+Importing this module is cheap. FastAPI, the agent framework, the selected
+provider's SDK and each enabled tool's dependencies are imported inside
+:func:`create_app`, and only for what the configuration enables (see
+``benchmarks/import_time.py``).
+
+Usage::
+
+    AGUI_PROFILE=magentic python -m shared.app_factory
+    python serve.py --app shared.app_factory:create_app   # profile from AGUI_PROFILE
+"""
+
+from typing import Any, Optional
+
+from shared.config import ServerConfig
+from shared.profiles import UI_TOOLS, AgentSpec, get_profile
+
+_HTTP_TOOLS = {"get_weather", "web_search"}
+
+
+def enabled_tools(config: ServerConfig) -> set[str]:
+    """Tool names of the profile that ``config`` enables."""
+    names = get_profile(config.profile).tool_names
+    return names if config.tools is None else names & set(config.tools)
+
+
+def create_app(config: Optional[ServerConfig] = None) -> Any:
+    """Build the FastAPI app for ``config`` (default: from the environment)."""
+    config = config or ServerConfig.from_env()
+    profile = get_profile(config.profile)
+    tools = enabled_tools(config)
+    code_interpreter = "execute_python_code" in tools
+    http_tools = bool(tools & _HTTP_TOOLS)
+    # Tools that send structured results to the UI (shared.rich_results)
+    rich_results = any(
+        name in tools and path in UI_TOOLS.values()
+        for spec in (profile.agent, *profile.specialists)
+        for name, path in spec.tools
+    )
+
+    from agent_framework import ChatAgent, chat_middleware, function_middleware
+    from agent_framework_ag_ui import add_agent_framework_fastapi_endpoint
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse
+
+    from shared.credentials import credential_stats
+    from shared.history import HistoryCompactionMiddleware, history_stats
+    from shared.lifespan import create_lifespan
+    from shared.prompt_cache import prompt_cache_stats, track_prompt_cache
+    from shared.providers import build_chat_client
+    from shared.sse_stream import SSEStreamMiddleware, sse_stats
+    from shared.telemetry import (
+        TelemetryMiddleware,
+        configure_tracing,
+        instrument_model_calls,
+        instrument_tool_call,
+        recent_spans,
+        render_metrics,
+    )
+    from shared.thread_store import ThreadStoreMiddleware, get_thread_store
+    from shared.tool_fanout import ToolFanOutMiddleware, limit_tool_concurrency, tool_stats
+    from shared.tools import load_tool
+    from shared.warmup import readiness
+
+    exporters = configure_tracing()
+    chat_client, model_info = build_chat_client(config)
+
+    def build_agent(spec: AgentSpec):
+        options = dict(spec.options)
+        middleware = [
+            # Model TTFT, call duration and tokens/sec per agent
+            chat_middleware(instrument_model_calls(spec.name)),
+            # Checks the instructions/tool-schema prefix stays stable and records cached tokens
+            chat_middleware(track_prompt_cache(spec.name)),
+        ]
+        if spec.tools:
+            # Built once, in profile order, so the schemas are byte-identical on every call
+            options["tools"] = [load_tool(path) for name, path in spec.tools if name in tools]
+            # Let the model emit independent calls together; they run concurrently
+            options.setdefault("allow_multiple_tool_calls", True)
+            # Timing sits inside the concurrency limit so it measures execution, not queueing
+            middleware.append(function_middleware(limit_tool_concurrency))
+            middleware.append(function_middleware(instrument_tool_call))
+        options["middleware"] = middleware
+        return ChatAgent(name=spec.name, instructions=spec.instructions, chat_client=chat_client, **options)
+
+    agent = build_agent(profile.agent)
+
+    lifespan = create_lifespan(
+        sandbox=code_interpreter,
+        http=http_tools,
+        restaurants="search_restaurants" in tools,
+        timezones="get_current_time" in tools,
+    )
+    app = FastAPI(title=profile.title, lifespan=lifespan)
+    app.state.config = config
+    app.state.model_info = model_info
+    app.state.agent = agent
+    app.state.specialists = {spec.name: build_agent(spec) for spec in profile.specialists}
+
+    if profile.routes:
+        from shared.routing import AgentRouter, RoutingAgent
+
+        # Dispatch each run to one specialist so model calls carry only its prompt and tools
+        router = AgentRouter(profile.routes, default=agent.name, chat_client=chat_client)
+        agent = RoutingAgent(router, {agent.name: agent, **app.state.specialists}, name="RouterAgent")
+        app.state.agent = agent
+
+    if rich_results:
+        from shared.agui_events import AGUIEventsMiddleware
+
+        # Lets tools push structured results and progress events (code output,
+        # figures) into the AG-UI stream
+        app.add_middleware(AGUIEventsMiddleware, path="/")
+
+    if tools:
+        # Per-run cap on concurrently executing tool calls (TOOL_MAX_CONCURRENCY)
+        app.add_middleware(ToolFanOutMiddleware, path="/")
+
+    # Trim the posted conversation to a token budget before it reaches the agent
+    app.add_middleware(HistoryCompactionMiddleware, path="/")
+
+    # Keep conversation history server-side so clients only post new messages
+    app.add_middleware(ThreadStoreMiddleware, path="/")
+
+    # Merge text deltas into fewer writes, bound the send queue, cancel the run on disconnect
+    app.add_middleware(SSEStreamMiddleware, path="/")
+
+    # Run timings (receive, first token, SSE flushes) and the agui.run span
+    app.add_middleware(TelemetryMiddleware, path="/")
+
+    # CORS is added last so it is the outermost layer and also covers responses
+    # produced by the middleware above (e.g. the thread store's 409)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(config.cors_origins),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Prometheus scrape endpoint (per worker process)
+    @app.get("/metrics")
+    async def metrics():
+        """Latency metrics in the Prometheus text format."""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+    if "memory" in exporters:
+        # Recent spans kept in-process (TELEMETRY_EXPORTERS=memory)
+        @app.get("/traces/recent")
+        async def get_recent_spans():
+            """Return the most recent finished spans."""
+            return recent_spans()
+
+    # Readiness probe: only route traffic to replicas that finished warmup
+    @app.get("/ready")
+    async def ready():
+        """Return 200 once startup warmup has finished, 503 while warming."""
+        is_ready, status = readiness()
+        return JSONResponse(status, status_code=200 if is_ready else 503)
+
+    if http_tools:
+        from shared.ttl_cache import cache_stats
+
+        # Tool cache counters (hits, misses, evictions) for sizing the caches
+        @app.get("/cache/stats")
+        async def get_cache_stats():
+            """Report hit/miss/eviction counters for the tool result caches."""
+            return cache_stats()
+
+    if tools:
+        # Tool execution counters (calls, queued on the concurrency cap, peak in flight)
+        @app.get("/tools/stats")
+        async def get_tool_stats():
+            """Report tool call counts and concurrency."""
+            return tool_stats()
+
+    if rich_results:
+        from shared.rich_results import rich_result_stats
+
+        # Structured results sent to the UI instead of through the model
+        @app.get("/rich-results/stats")
+        async def get_rich_result_stats():
+            """Report structured tool results delivered to the UI, by kind."""
+            return rich_result_stats()
+
+    if profile.routes:
+        from shared.routing import routing_stats
+
+        # Routing decisions per method (rules/similarity/sticky/llm/default) and agent
+        @app.get("/routing/stats")
+        async def get_routing_stats():
+            """Report routing decisions, latency and prompt overhead avoided."""
+            return routing_stats()
+
+    # Provider prompt caching: cached vs. input tokens, static prefix size per agent
+    @app.get("/prompt-cache/stats")
+    async def get_prompt_cache_stats():
+        """Report the cached-prefix ratio from provider usage fields."""
+        return prompt_cache_stats()
+
+    # SSE writes (events merged per write, backpressure waits, disconnects)
+    @app.get("/sse/stats")
+    async def get_sse_stats():
+        """Report SSE coalescing, send queue and disconnect counters."""
+        return sse_stats()
+
+    # History compaction totals (prompt tokens before/after, turns dropped)
+    @app.get("/history/stats")
+    async def get_history_stats():
+        """Report how many prompt tokens history compaction has saved."""
+        return history_stats()
+
+    # Token cache status (hits, acquisitions, acquire latency, time to expiry)
+    @app.get("/credentials/stats")
+    async def get_credential_stats():
+        """Report Azure token cache hits and acquisition latency."""
+        return credential_stats()
+
+    # Server-side thread history (threads, bytes, evictions)
+    @app.get("/threads/stats")
+    async def get_thread_stats():
+        """Report thread store size and eviction counters."""
+        store = get_thread_store()
+        return store.stats() if store is not None else {"backend": "none"}
+
+    if code_interpreter:
+        _add_code_interpreter_routes(app)
+
+    # Register the main agent (or the router in front of the specialists) as the AG-UI endpoint
+    add_agent_framework_fastapi_endpoint(app, agent, "/")
+
+    return app
+
+
+def _add_code_interpreter_routes(app: Any) -> None:
+    from fastapi import Request
+
+    from shared.image_serving import image_response
+    from shared.image_store import get_image_store
+    from shared.sandbox import get_sandbox_pool
+
+    # Bounded store for generated charts (shared across workers via SHARED_STATE_DIR)
+    image_store = get_image_store()
+
+    # Code-interpreter pool status (workers, queue depth, restarts)
+    @app.get("/sandbox/stats")
+    async def get_sandbox_stats():
+        """Report sandbox worker pool usage and queue depth."""
+        return get_sandbox_pool().stats()
+
+    # Image store size and eviction counters (declared before /images/{image_id})
+    @app.get("/images/stats")
+    async def get_image_stats():
+        """Report image store bytes, item count and evictions."""
+        return image_store.stats()
+
+    # Image retrieval endpoint
+    @app.get("/images/{image_id}")
+    async def get_image(image_id: str, request: Request):
+        """Retrieve a generated image by ID (ETag/304, immutable caching, byte ranges)."""
+        return image_response(image_store.get(image_id), request)
+
+
+def run(config: Optional[ServerConfig] = None) -> None:
+    """Build the app and serve it with a single uvicorn process."""
+    import uvicorn
+
+    config = config or ServerConfig.from_env()
+    app = create_app(config)
+    profile = get_profile(config.profile)
+
+    print(f"\n🚀 Starting {profile.title}...")
+    print(f"🤖 Model: {app.state.model_info}")
+    tools = sorted(enabled_tools(config))
+    if tools:
+        print(f"🔧 Tools: {', '.join(tools)}")
+    for line in profile.banner:
+        print(line)
+    print(f"🌐 Server URL: http://{config.host}:{config.port}/\n")
+
+    uvicorn.run(app, host=config.host, port=config.port)
+
+
+if __name__ == "__main__":
+    run()
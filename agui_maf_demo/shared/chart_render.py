@@ -0,0 +1,121 @@
+"""Chart rendering stage for ``execute_python_code``.
+
+Figures used to be saved as PNG at ``dpi=100`` no matter what; a 3D surface or
+Mandelbrot render could produce multi-megabyte images that were then held in
+memory and pushed to browsers. :func:`render_figure` applies configurable
+settings instead:
+
+- output format: PNG, WebP (lossless, needs Pillow) or SVG,
+- DPI,
+- a pixel budget (DPI is lowered up front so the raster fits),
+- a byte budget (the figure is re-rendered at a lower DPI until it fits;
+  an oversized SVG falls back to PNG),
+- optional lossless PNG optimization through Pillow.
+
+Rendering runs inside the sandbox worker processes, never on the server's
+event loop. Settings are read from environment variables by
+:meth:`RenderSettings.from_env`:
+
+- ``CHART_FORMAT`` png | webp | svg (default png)
+- ``CHART_DPI`` (default 100)
+- ``CHART_MAX_PIXELS`` (default 4000000, 0 disables)
+- ``CHART_MAX_BYTES`` (default 2000000, 0 disables)
+- ``CHART_OPTIMIZE_PNG`` true/false (default false)
+"""
+
+import io
+import math
+import os
+import time
+from dataclasses import dataclass
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+}
+
+_MIN_DPI = 40
+_MAX_DOWNSCALE_ATTEMPTS = 4
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    format: str = "png"
+    dpi: int = 100
+    max_pixels: int = 4_000_000
+    max_bytes: int = 2_000_000
+    optimize_png: bool = False
+
+    def __post_init__(self):
+        if self.format not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported chart format '{self.format}'; use one of {sorted(MEDIA_TYPES)}")
+
+    @classmethod
+    def from_env(cls) -> "RenderSettings":
+        return cls(
+            format=os.environ.get("CHART_FORMAT", "png").strip().lower(),
+            dpi=int(os.environ.get("CHART_DPI", "100")),
+            max_pixels=int(os.environ.get("CHART_MAX_PIXELS", "4000000")),
+            max_bytes=int(os.environ.get("CHART_MAX_BYTES", "2000000")),
+            optimize_png=os.environ.get("CHART_OPTIMIZE_PNG", "false").strip().lower() in ("1", "true", "yes", "on"),
+        )
+
+
+@dataclass
+class RenderedImage:
+    data: bytes
+    media_type: str
+    format: str
+    dpi: float
+    render_seconds: float
+
+
+def _save(fig, fmt: str, dpi: float, optimize_png: bool) -> bytes:
+    buf = io.BytesIO()
+    kwargs = {"format": fmt, "dpi": dpi, "bbox_inches": "tight"}
+    if fmt == "webp":
+        kwargs["pil_kwargs"] = {"lossless": True, "method": 4}
+    elif fmt == "png" and optimize_png:
+        # Passing pil_kwargs makes matplotlib encode the PNG through Pillow
+        kwargs["pil_kwargs"] = {"optimize": True}
+    fig.savefig(buf, **kwargs)
+    return buf.getvalue()
+
+
+def _budget_dpi(fig, dpi: float, max_pixels: int) -> float:
+    if not max_pixels:
+        return dpi
+    width_in, height_in = fig.get_size_inches()
+    pixels = width_in * height_in * dpi * dpi
+    if pixels <= max_pixels:
+        return dpi
+    return max(_MIN_DPI, dpi * math.sqrt(max_pixels / pixels))
+
+
+def render_figure(fig, settings: RenderSettings) -> RenderedImage:
+    """Render one matplotlib figure according to ``settings``."""
+    start = time.perf_counter()
+    fmt = settings.format
+    dpi = _budget_dpi(fig, settings.dpi, settings.max_pixels)
+    data = _save(fig, fmt, dpi, settings.optimize_png)
+
+    if settings.max_bytes and len(data) > settings.max_bytes:
+        if fmt == "svg":
+            # Vector output does not shrink with DPI; fall back to a raster
+            fmt = "png"
+            data = _save(fig, fmt, dpi, settings.optimize_png)
+        attempts = 0
+        while len(data) > settings.max_bytes and dpi > _MIN_DPI and attempts < _MAX_DOWNSCALE_ATTEMPTS:
+            # Encoded size scales roughly with pixel count, i.e. with dpi squared
+            dpi = max(_MIN_DPI, dpi * math.sqrt(settings.max_bytes / len(data)) * 0.95)
+            data = _save(fig, fmt, dpi, settings.optimize_png)
+            attempts += 1
+
+    return RenderedImage(
+        data=data,
+        media_type=MEDIA_TYPES[fmt],
+        format=fmt,
+        dpi=round(dpi, 1),
+        render_seconds=time.perf_counter() - start,
+    )
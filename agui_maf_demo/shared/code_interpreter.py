@@ -0,0 +1,79 @@
+"""Glue between ``execute_python_code`` and the sandbox pool.
+
+When the current run has an AG-UI SSE stream attached (see
+``shared.agui_events``), the job runs in streaming mode: stdout/stderr chunks
+and finished figures are published as ``CUSTOM`` events while the code is
+still running, so long analyses no longer look hung in the UI.
+
+- ``code_interpreter.output``: ``{"job_id", "stream", "text"}``
+- ``code_interpreter.figure``: ``{"job_id", "image_id", "media_type"}``
+
+Figures are stored in the image store as soon as they arrive, so the browser
+can fetch ``/images/{image_id}`` before the model has finished answering.
+Stores write files (spill, shared directory), so ``put`` runs in a worker
+thread, off the event loop.
+"""
+
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from shared.agui_events import emit_custom_event, has_event_stream
+from shared.image_store import get_image_store
+from shared.sandbox import get_sandbox_pool
+
+
+@dataclass
+class CodeRun:
+    stdout: str = ""
+    stderr: str = ""
+    error: Optional[str] = None
+    image_ids: list[str] = field(default_factory=list)
+    duration: float = 0.0
+
+
+async def run_code(code: str) -> CodeRun:
+    """Execute ``code`` in the sandbox and store its figures."""
+    store = get_image_store()
+    job_id = uuid.uuid4().hex[:12]
+    figures: list[asyncio.Future] = []
+    # Stores one figure at a time, so figure events keep the order they were drawn in
+    in_order = asyncio.Lock()
+
+    async def store_figure(image) -> str:
+        async with in_order:
+            image_id = await asyncio.to_thread(store.put, image.data, image.media_type)
+            emit_custom_event("code_interpreter.figure", {
+                "job_id": job_id,
+                "image_id": image_id,
+                "media_type": image.media_type,
+            })
+        return image_id
+
+    def on_event(frame: dict) -> None:
+        if frame["event"] == "figure":
+            figures.append(asyncio.ensure_future(store_figure(frame["image"])))
+        else:
+            emit_custom_event("code_interpreter.output", {
+                "job_id": job_id,
+                "stream": frame["event"],
+                "text": frame["text"],
+            })
+
+    streaming = has_event_stream()
+    result = await get_sandbox_pool().execute(code, on_event=on_event if streaming else None)
+    if streaming:
+        image_ids = list(await asyncio.gather(*figures))
+    else:
+        image_ids = await asyncio.to_thread(
+            lambda: [store.put(image.data, media_type=image.media_type) for image in result.images]
+        )
+
+    return CodeRun(
+        stdout=result.stdout,
+        stderr=result.stderr,
+        error=result.error,
+        image_ids=image_ids,
+        duration=result.duration,
+    )
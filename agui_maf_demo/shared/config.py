@@ -0,0 +1,48 @@
+"""Configuration for :func:`shared.app_factory.create_app`.
+
+Configuration is read from environment variables (keyword overrides win):
+
+- ``AGUI_PROFILE`` ``basic`` (default), ``tools``, ``multi_agent`` or ``magentic``
+- ``AZURE_PROVIDER`` ``azure-openai`` (default) or ``azure-ai``
+- ``AZURE_CREDENTIAL`` ``cli`` (default), ``default`` or ``auto`` (managed
+  identity in Azure, the Azure CLI locally)
+- ``AGUI_TOOLS`` comma-separated tool names to enable (default: all tools of
+  the profile); disabled tools are never imported
+- ``SERVER_HOST`` (default ``127.0.0.1``), ``SERVER_PORT`` (default 8888)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    profile: str = "basic"
+    provider: str = "azure-openai"
+    credential: str = "cli"
+    tools: Optional[tuple[str, ...]] = None
+    host: str = "127.0.0.1"
+    port: int = 8888
+    cors_origins: tuple[str, ...] = ("http://localhost:3000", "http://127.0.0.1:3000")
+
+    @classmethod
+    def from_env(cls, **overrides) -> "ServerConfig":
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            pass
+        else:
+            load_dotenv()
+
+        tools = os.environ.get("AGUI_TOOLS")
+        values = {
+            "profile": os.environ.get("AGUI_PROFILE", "basic"),
+            "provider": os.environ.get("AZURE_PROVIDER", "azure-openai"),
+            "credential": os.environ.get("AZURE_CREDENTIAL", "cli"),
+            "tools": tuple(t.strip() for t in tools.split(",") if t.strip()) if tools else None,
+            "host": os.environ.get("SERVER_HOST", "127.0.0.1"),
+            "port": int(os.environ.get("SERVER_PORT", "8888")),
+        }
+        values.update(overrides)
+        return cls(**values)
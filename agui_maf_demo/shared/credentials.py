@@ -0,0 +1,186 @@
+"""Token caching and proactive refresh for Azure credentials.
+
+``AzureCliCredential`` forks an ``az`` subprocess for every ``get_token``
+call (hundreds of milliseconds, on the request path), and the OpenAI client
+asks for a token on every model call. :class:`CachingTokenCredential` wraps
+any ``TokenCredential`` and:
+
+- keeps the access token in memory until it is close to expiry,
+- refreshes it on a background thread once it enters the refresh window
+  (``refresh_margin`` seconds before ``expires_on``), while callers keep
+  using the still-valid cached token,
+- makes concurrent callers share one acquisition when there is no usable
+  token (cold start, or the refresh did not finish in time),
+- records acquisition latency (see :meth:`CachingTokenCredential.stats`) and,
+  when OpenTelemetry is installed, wraps each acquisition in a span.
+
+The wrapped credential only needs a ``get_token(*scopes, **kwargs)`` method
+returning an object with ``token`` and ``expires_on``, so a fake credential
+and a fake ``clock`` are enough to exercise it::
+
+    credential = CachingTokenCredential(FakeCredential(lifetime=3600), clock=fake_clock)
+
+Configuration is read from environment variables:
+
+- ``CREDENTIAL_REFRESH_MARGIN`` seconds before expiry to refresh (default 300)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:
+    _otel_trace = None
+
+# A token this close to expiry is never handed out
+_MIN_VALIDITY = 30.0
+
+
+class CachingTokenCredential:
+    """``TokenCredential`` wrapper with an in-memory cache and background refresh."""
+
+    def __init__(
+        self,
+        credential: Any,
+        refresh_margin: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.credential = credential
+        self.refresh_margin = (
+            refresh_margin if refresh_margin is not None
+            else float(os.environ.get("CREDENTIAL_REFRESH_MARGIN", "300"))
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens: dict[tuple, Any] = {}
+        self._inflight: dict[tuple, Future] = {}
+        self.hits = 0
+        self.acquisitions = 0
+        self.background_refreshes = 0
+        self.failures = 0
+        self.last_acquire_seconds = 0.0
+        self.max_acquire_seconds = 0.0
+        self.total_acquire_seconds = 0.0
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None, **kwargs):
+        if claims:
+            # A claims challenge needs a fresh token; never serve it from the cache
+            return self.credential.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        key = (scopes, tenant_id)
+        now = self._clock()
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is not None and token.expires_on - now > _MIN_VALIDITY:
+                self.hits += 1
+                if token.expires_on - now <= self.refresh_margin and key not in self._inflight:
+                    self._start_acquire(key, kwargs, background=True)
+                return token
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._start_acquire(key, kwargs, background=False)
+
+        if owner:
+            self._acquire(key, kwargs, future)
+        return future.result()
+
+    def _start_acquire(self, key: tuple, kwargs: dict, background: bool) -> Future:
+        """Register an in-flight acquisition (caller holds ``_lock``)."""
+        future: Future = Future()
+        self._inflight[key] = future
+        if background:
+            self.background_refreshes += 1
+            threading.Thread(
+                target=self._acquire, args=(key, kwargs, future), name="credential-refresh", daemon=True
+            ).start()
+        return future
+
+    def _acquire(self, key: tuple, kwargs: dict, future: Future) -> None:
+        scopes, tenant_id = key
+        start = time.perf_counter()
+        span = _otel_trace.get_tracer(__name__).start_span("credential.get_token") if _otel_trace else None
+        try:
+            token = self.credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self.failures += 1
+                self._inflight.pop(key, None)
+            if span is not None:
+                span.record_exception(e)
+                span.end()
+            future.set_exception(e)
+            return
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._tokens[key] = token
+            self._inflight.pop(key, None)
+            self.acquisitions += 1
+            self.last_acquire_seconds = elapsed
+            self.max_acquire_seconds = max(self.max_acquire_seconds, elapsed)
+            self.total_acquire_seconds += elapsed
+        if span is not None:
+            span.set_attribute("credential.type", type(self.credential).__name__)
+            span.set_attribute("credential.scopes", list(scopes))
+            span.set_attribute("credential.acquire_ms", round(elapsed * 1000, 1))
+            span.end()
+        future.set_result(token)
+
+    def close(self) -> None:
+        close = getattr(self.credential, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            return {
+                "credential": type(self.credential).__name__,
+                "cached_tokens": len(self._tokens),
+                "seconds_to_expiry": min((t.expires_on - now for t in self._tokens.values()), default=None),
+                "hits": self.hits,
+                "acquisitions": self.acquisitions,
+                "background_refreshes": self.background_refreshes,
+                "failures": self.failures,
+                "last_acquire_ms": round(self.last_acquire_seconds * 1000, 1),
+                "max_acquire_ms": round(self.max_acquire_seconds * 1000, 1),
+                "avg_acquire_ms": round(self.total_acquire_seconds * 1000 / self.acquisitions, 1) if self.acquisitions else 0.0,
+            }
+
+
+_credentials: list[CachingTokenCredential] = []
+
+
+def cached_credential(credential: Any) -> CachingTokenCredential:
+    """Wrap ``credential`` and register it for :func:`credential_stats`."""
+    wrapped = CachingTokenCredential(credential)
+    _credentials.append(wrapped)
+    return wrapped
+
+
+def credential_stats() -> list[dict[str, Any]]:
+    return [c.stats() for c in _credentials]
+
+
+def get_azure_credential() -> CachingTokenCredential:
+    """Managed identity when running in Azure, the Azure CLI locally; cached either way."""
+    from azure.identity import AzureCliCredential, DefaultAzureCredential
+
+    if os.getenv("WEBSITE_INSTANCE_ID") or os.getenv("CONTAINER_APP_NAME"):
+        # Running in Azure (App Service or Container Apps)
+        print("🔐 Using DefaultAzureCredential (Managed Identity)")
+        return cached_credential(DefaultAzureCredential())
+    # Running locally
+    print("🔐 Using AzureCliCredential (Local Development)")
+    return cached_credential(AzureCliCredential())
@@ -0,0 +1,248 @@
+"""Safe arithmetic expression engine for the ``calculate`` tool.
+
+``calculate`` used to run ``eval(expression, {"__builtins__": {}}, {})``,
+which compiles the string on every call and happily runs ``9**9**9`` (an
+integer with hundreds of millions of digits) until the core is pinned.
+:func:`compile_expression` instead:
+
+- parses the expression and checks every AST node against a whitelist:
+  numbers, ``+ - * / // % **``, unary ``+``/``-``, the constants ``pi``,
+  ``e``, ``tau``, ``inf``, the math functions in ``FUNCTIONS``, and variable
+  names. No attributes, subscripts, comparisons, strings or keywords;
+- rejects expressions over ``MAX_LENGTH`` characters or ``MAX_NODES`` AST
+  nodes (there are no loops, so this also bounds the operation count);
+- rewrites ``*`` and ``**`` into checked helpers that refuse integer results
+  over ``MAX_INT_BITS`` bits and exponents over ``MAX_EXPONENT`` before
+  computing them, and ``round`` into one that refuses ``ndigits`` beyond
+  ``MAX_NDIGITS`` (``round(5, -10**7)`` builds a ten-million-digit power
+  of ten);
+- compiles the checked tree to a code object once and memoizes it per
+  expression string (``CACHE_SIZE`` entries).
+
+:func:`evaluate` runs the compiled expression. When a variable is bound to a
+list or array, it is evaluated once over whole numpy arrays (numpy math
+functions) instead of once per element. Invalid or over-limit expressions
+raise :class:`ExpressionError` (a ``ValueError``).
+"""
+
+import ast
+import math
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from typing import Any, Mapping, Optional
+
+MAX_LENGTH = 1000
+MAX_NODES = 300
+MAX_EXPONENT = 10_000
+MAX_INT_BITS = 10_000
+MAX_NDIGITS = 300
+CACHE_SIZE = 1024
+
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+
+FUNCTIONS = {
+    "abs": abs,
+    "round": round,  # rewritten to _round
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "atan2": math.atan2,
+    "sinh": math.sinh,
+    "cosh": math.cosh,
+    "tanh": math.tanh,
+    "hypot": math.hypot,
+    "degrees": math.degrees,
+    "radians": math.radians,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+_BINARY_OPS = frozenset({ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow})
+_UNARY_OPS = frozenset({ast.UAdd, ast.USub})
+_CHECKED_OPS = {ast.Mult: "_mul", ast.Pow: "_pow"}
+_CHECKED_FUNCTIONS = {"round": "_round"}
+_OP_HINTS = {ast.BitXor: "^ (use ** for powers)", ast.BitAnd: "&", ast.BitOr: "|", ast.LShift: "<<", ast.RShift: ">>"}
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions the engine refuses to compile or evaluate."""
+
+
+def _mul(left: Any, right: Any) -> Any:
+    if type(left) is int and type(right) is int and left.bit_length() + right.bit_length() > MAX_INT_BITS:
+        raise ExpressionError(f"Result exceeds {MAX_INT_BITS} bits")
+    return left * right
+
+
+def _describe(value: int) -> str:
+    """``value`` itself when short, else its size (error text goes back to the model)."""
+    return str(value) if value.bit_length() <= 64 else f"<{value.bit_length()}-bit integer>"
+
+
+def _pow(base: Any, exponent: Any) -> Any:
+    if type(base) is int and type(exponent) is int and exponent > 0 and abs(base) > 1:
+        if exponent > MAX_EXPONENT or exponent * math.log2(abs(base)) > MAX_INT_BITS:
+            raise ExpressionError(f"Result of {_describe(base)} ** {_describe(exponent)} exceeds {MAX_INT_BITS} bits")
+    return base**exponent
+
+
+def _check_ndigits(ndigits: Any) -> Any:
+    if ndigits is not None and abs(ndigits) > MAX_NDIGITS:
+        raise ExpressionError(f"round() ndigits must be between -{MAX_NDIGITS} and {MAX_NDIGITS}")
+    return ndigits
+
+
+def _round(number: Any, ndigits: Any = None) -> Any:
+    return round(number, _check_ndigits(ndigits))
+
+
+_HELPERS = {"_mul": _mul, "_pow": _pow, "_round": _round}
+
+
+def _unsupported_operator(op: ast.AST) -> ExpressionError:
+    return ExpressionError(f"Unsupported operator: {_OP_HINTS.get(type(op), type(op).__name__)}")
+
+
+def _check(node: ast.AST, names: set[str], budget: list[int]) -> ast.AST:
+    """Validate ``node`` against the whitelist and return it with ``*``/``**`` rewritten.
+
+    One recursive pass: a generic ``NodeVisitor`` plus ``NodeTransformer``
+    costs several times more than compiling the expression itself.
+    """
+    budget[0] -= 1
+    if budget[0] < 0:
+        raise ExpressionError(f"Expression has more than {MAX_NODES} elements")
+    kind = type(node)
+    if kind is ast.Constant:
+        if type(node.value) not in (int, float):
+            raise ExpressionError(f"Unsupported literal: {node.value!r}")
+        return node
+    if kind is ast.Name:
+        if node.id.startswith("_"):
+            raise ExpressionError(f"Unknown name: {node.id}")
+        if node.id not in CONSTANTS and node.id not in FUNCTIONS:
+            names.add(node.id)
+        return node
+    if kind is ast.BinOp:
+        if type(node.op) not in _BINARY_OPS:
+            raise _unsupported_operator(node.op)
+        node.left = _check(node.left, names, budget)
+        node.right = _check(node.right, names, budget)
+        helper = _CHECKED_OPS.get(type(node.op))
+        if helper is None:
+            return node
+        # Route the operation through the size-checking helper
+        func = ast.copy_location(ast.Name(id=helper, ctx=ast.Load()), node)
+        return ast.copy_location(ast.Call(func=func, args=[node.left, node.right], keywords=[]), node)
+    if kind is ast.UnaryOp:
+        if type(node.op) not in _UNARY_OPS:
+            raise _unsupported_operator(node.op)
+        node.operand = _check(node.operand, names, budget)
+        return node
+    if kind is ast.Call:
+        if type(node.func) is not ast.Name or node.func.id not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function: {ast.unparse(node.func)}")
+        if node.keywords:
+            raise ExpressionError(f"Only positional arguments are supported: {node.func.id}")
+        node.args = [_check(arg, names, budget) for arg in node.args]
+        helper = _CHECKED_FUNCTIONS.get(node.func.id)
+        if helper is not None:
+            node.func = ast.copy_location(ast.Name(id=helper, ctx=ast.Load()), node.func)
+        return node
+    raise ExpressionError(f"Unsupported syntax: {kind.__name__}")
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    source: str
+    code: Any
+    names: frozenset[str]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Validate ``expression`` and compile it to a checked code object (memoized)."""
+    if len(expression) > MAX_LENGTH:
+        raise ExpressionError(f"Expression is longer than {MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+    names: set[str] = set()
+    tree.body = _check(tree.body, names, [MAX_NODES])
+    return CompiledExpression(expression, compile(tree, "<expression>", "eval"), frozenset(names))
+
+
+_SCALAR_NAMESPACE = {"__builtins__": {}, **CONSTANTS, **FUNCTIONS, **_HELPERS}
+_vector_namespace: Optional[dict[str, Any]] = None
+
+
+def _get_vector_namespace() -> dict[str, Any]:
+    global _vector_namespace
+    if _vector_namespace is None:
+        import numpy as np
+
+        functions = {
+            "abs": np.abs,
+            "_round": lambda x, ndigits=0: np.round(x, _check_ndigits(ndigits)),
+            "min": lambda *args: reduce(np.minimum, args),
+            "max": lambda *args: reduce(np.maximum, args),
+            "sqrt": np.sqrt,
+            "exp": np.exp,
+            "log": lambda x, base=None: np.log(x) if base is None else np.log(x) / np.log(base),
+            "log10": np.log10,
+            "log2": np.log2,
+            "sin": np.sin,
+            "cos": np.cos,
+            "tan": np.tan,
+            "asin": np.arcsin,
+            "acos": np.arccos,
+            "atan": np.arctan,
+            "atan2": np.arctan2,
+            "sinh": np.sinh,
+            "cosh": np.cosh,
+            "tanh": np.tanh,
+            "hypot": np.hypot,
+            "degrees": np.degrees,
+            "radians": np.radians,
+            "floor": np.floor,
+            "ceil": np.ceil,
+        }
+        _vector_namespace = {**_SCALAR_NAMESPACE, **functions}
+    return _vector_namespace
+
+
+def _is_array(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) or hasattr(value, "__array__")
+
+
+def evaluate(expression: str, variables: Optional[Mapping[str, Any]] = None) -> Any:
+    """Evaluate ``expression``; list/array variables evaluate element-wise with numpy."""
+    compiled = compile_expression(expression)
+    variables = variables or {}
+    missing = compiled.names - variables.keys()
+    if missing:
+        raise ExpressionError(f"Unknown name: {', '.join(sorted(missing))}")
+    namespace = _SCALAR_NAMESPACE
+    if compiled.names:
+        bound = {name: variables[name] for name in compiled.names}
+        if any(_is_array(value) for value in bound.values()):
+            import numpy as np
+
+            bound = {name: np.asarray(value, dtype=float) if _is_array(value) else value for name, value in bound.items()}
+            namespace = _get_vector_namespace()
+        namespace = {**namespace, **bound}
+    try:
+        return eval(compiled.code, namespace)
+    except OverflowError as e:
+        raise ExpressionError(f"Result too large: {e}") from None
@@ -0,0 +1,282 @@
+"""Conversation history compaction in front of the agent.
+
+The web client posts the whole conversation on every turn, including
+multi-KB tool outputs (search results, code output, long answers), so prompt
+tokens grow linearly with the conversation. :func:`compact_messages` enforces
+a token budget before the messages reach ``ChatAgent``:
+
+1. System/developer messages and the most recent turns are kept verbatim.
+2. Older tool results and long older assistant messages are collapsed to
+   short digests. ``[LINK]``/``[IMAGE_ID]``-style markers, which only
+   conversations from before ``tool_result`` events still contain, are
+   reduced to placeholders.
+3. If that is not enough, the oldest whole turns are dropped and replaced by
+   one short extractive summary of what the user asked in them. Turns are
+   dropped in blocks, so the start of the conversation (and with it the
+   provider's cached prompt prefix, see ``shared.prompt_cache``) stays the
+   same for several turns instead of shifting on every turn.
+
+Turns are dropped as a unit (user message through the last tool/assistant
+message before the next user message), so tool calls never lose their results.
+
+:class:`HistoryCompactionMiddleware` applies this to AG-UI ``POST`` bodies and
+reports the saving in ``X-History-Tokens-Before``/``-After``/``-Saved``
+response headers; running totals are available from :func:`history_stats`.
+Token counts use ``tiktoken`` when installed and a
+4-characters-per-token estimate otherwise.
+
+Configuration is read from environment variables:
+
+- ``HISTORY_TOKEN_BUDGET`` (default 8000, 0 disables compaction)
+- ``HISTORY_KEEP_TURNS`` recent turns kept verbatim (default 2)
+- ``HISTORY_DIGEST_CHARS`` characters kept per digested message (default 240)
+- ``HISTORY_DROP_BLOCK`` old turns dropped at a time (default 4)
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_MARKER_RE = re.compile(r"\[(WEATHER_ICON|LINK|CALC_RESULT|IMAGE_ID|IMAGE)\](.*?)\[/\1\]", re.DOTALL)
+_KEEP_ROLES = ("system", "developer")
+
+# Defaults shared by compact_messages and the middleware (env overrides apply to the latter)
+DEFAULT_TOKEN_BUDGET = 8000
+DEFAULT_KEEP_TURNS = 2
+DEFAULT_DIGEST_CHARS = 240
+DEFAULT_DROP_BLOCK = 4
+
+
+def _load_token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda text: (len(text) + 3) // 4
+    encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+count_tokens = _load_token_counter()
+
+_totals = {"requests": 0, "compacted": 0, "tokens_before": 0, "tokens_after": 0, "digested": 0, "dropped": 0}
+
+
+def _content_text(message: dict[str, Any]) -> str:
+    content = message.get("content")
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, ensure_ascii=False)
+
+
+def message_tokens(message: dict[str, Any]) -> int:
+    tokens = 4 + count_tokens(_content_text(message))  # per-message overhead
+    if message.get("toolCalls"):
+        tokens += count_tokens(json.dumps(message["toolCalls"], ensure_ascii=False))
+    return tokens
+
+
+def total_tokens(messages: list[dict[str, Any]]) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def digest_text(text: str, max_chars: int) -> str:
+    """Replace rich-content markers with short placeholders and truncate."""
+    counts: dict[str, int] = {}
+
+    def placeholder(match: re.Match) -> str:
+        counts[match.group(1)] = counts.get(match.group(1), 0) + 1
+        return ""
+
+    plain = _MARKER_RE.sub(placeholder, text)
+    plain = re.sub(r"\s+", " ", plain).strip()
+    if len(plain) > max_chars:
+        plain = plain[:max_chars].rstrip() + "…"
+    if counts:
+        extras = ", ".join(f"{n} {kind.lower()}" for kind, n in counts.items())
+        plain += f" [{extras} omitted]"
+    return plain
+
+
+def _split_turns(messages: list[dict[str, Any]]) -> tuple[list, list[list]]:
+    """Separate pinned system messages from the conversation, grouped into turns."""
+    pinned, turns = [], []
+    for message in messages:
+        if message.get("role") in _KEEP_ROLES:
+            pinned.append(message)
+        elif message.get("role") == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return pinned, turns
+
+
+def _first_sentence(text: str, limit: int = 120) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    return sentence[:limit] + ("…" if len(sentence) > limit else "")
+
+
+@dataclass
+class CompactionReport:
+    tokens_before: int
+    tokens_after: int
+    digested: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def compact_messages(
+    messages: list[dict[str, Any]],
+    budget: int,
+    keep_turns: int = DEFAULT_KEEP_TURNS,
+    digest_chars: int = DEFAULT_DIGEST_CHARS,
+    drop_block: int = DEFAULT_DROP_BLOCK,
+) -> tuple[list[dict[str, Any]], CompactionReport]:
+    """Return a copy of ``messages`` that fits ``budget`` tokens where possible."""
+    before = total_tokens(messages)
+    report = CompactionReport(before, before)
+    if budget <= 0 or before <= budget:
+        return messages, report
+
+    pinned, turns = _split_turns(messages)
+    recent = turns[-keep_turns:] if keep_turns > 0 else []
+    older = turns[: len(turns) - len(recent)]
+
+    # Step 1: collapse tool results and marker-heavy assistant text in older turns
+    compacted_older = []
+    for turn in older:
+        new_turn = []
+        for message in turn:
+            text = _content_text(message)
+            role = message.get("role")
+            needs_digest = role == "tool" or (role == "assistant" and (_MARKER_RE.search(text) or len(text) > digest_chars * 4))
+            if needs_digest and isinstance(message.get("content"), str):
+                prefix = "[tool result digest] " if role == "tool" else ""
+                message = {**message, "content": prefix + digest_text(text, digest_chars)}
+                report.digested += 1
+            new_turn.append(message)
+        compacted_older.append(new_turn)
+
+    def assemble(older_turns, summary=None):
+        result = list(pinned)
+        if summary is not None:
+            result.append(summary)
+        for turn in older_turns + recent:
+            result.extend(turn)
+        return result
+
+    result = assemble(compacted_older)
+
+    # Step 2: drop the oldest whole turns, keeping a one-line summary of each
+    dropped_questions: list[str] = []
+    while compacted_older and total_tokens(result) > budget:
+        for turn in compacted_older[:max(1, drop_block)]:
+            report.dropped += len(turn)
+            if turn[0].get("role") == "user":
+                dropped_questions.append(_first_sentence(_content_text(turn[0])))
+        del compacted_older[:max(1, drop_block)]
+        summary = {
+            "role": "system",
+            "content": "Summary of earlier conversation (omitted to save tokens). The user asked: "
+            + " | ".join(q for q in dropped_questions if q),
+        }
+        result = assemble(compacted_older, summary)
+
+    report.tokens_after = total_tokens(result)
+    return result, report
+
+
+def history_stats() -> dict:
+    """Cumulative compaction counters for this process."""
+    saved = _totals["tokens_before"] - _totals["tokens_after"]
+    return {
+        **_totals,
+        "tokens_saved": saved,
+        "saved_ratio": round(saved / _totals["tokens_before"], 4) if _totals["tokens_before"] else 0.0,
+    }
+
+
+def _record(report: CompactionReport) -> None:
+    _totals["requests"] += 1
+    _totals["compacted"] += 1 if report.tokens_saved else 0
+    _totals["tokens_before"] += report.tokens_before
+    _totals["tokens_after"] += report.tokens_after
+    _totals["digested"] += report.digested
+    _totals["dropped"] += report.dropped
+
+
+class HistoryCompactionMiddleware:
+    """ASGI middleware compacting the ``messages`` of AG-UI run requests."""
+
+    def __init__(
+        self,
+        app,
+        path: str = "/",
+        budget: Optional[int] = None,
+        keep_turns: Optional[int] = None,
+        digest_chars: Optional[int] = None,
+        drop_block: Optional[int] = None,
+    ):
+        self.app = app
+        self.path = path
+        self.budget = budget if budget is not None else int(os.environ.get("HISTORY_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+        self.keep_turns = keep_turns if keep_turns is not None else int(os.environ.get("HISTORY_KEEP_TURNS", str(DEFAULT_KEEP_TURNS)))
+        self.digest_chars = digest_chars if digest_chars is not None else int(os.environ.get("HISTORY_DIGEST_CHARS", str(DEFAULT_DIGEST_CHARS)))
+        self.drop_block = drop_block if drop_block is not None else int(os.environ.get("HISTORY_DROP_BLOCK", str(DEFAULT_DROP_BLOCK)))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path or self.budget <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        report = None
+        try:
+            payload = json.loads(body)
+            if isinstance(payload, dict) and isinstance(payload.get("messages"), list):
+                payload["messages"], report = compact_messages(
+                    payload["messages"], self.budget, self.keep_turns, self.digest_chars, self.drop_block
+                )
+                _record(report)
+                if report.tokens_saved:
+                    body = json.dumps(payload, ensure_ascii=False).encode()
+        except (ValueError, UnicodeDecodeError):
+            pass  # Let the endpoint report malformed JSON
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_with_report(message):
+            if message["type"] == "http.response.start" and report is not None:
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-history-tokens-before", str(report.tokens_before).encode()),
+                    (b"x-history-tokens-after", str(report.tokens_after).encode()),
+                    (b"x-history-tokens-saved", str(report.tokens_saved).encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, replay_receive, send_with_report)
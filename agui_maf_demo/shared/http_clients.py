@@ -0,0 +1,73 @@
+"""Process-wide async HTTP client for tool backends.
+
+Tools used to call the blocking ``httpx.get(...)`` and open a fresh TCP+TLS
+connection per call, which stalls the uvicorn event loop (and every other SSE
+stream on the worker) for as long as the upstream takes to answer.
+
+This module owns a single ``httpx.AsyncClient`` with keep-alive and, when the
+``h2`` package is installed, HTTP/2. It is created and closed by the FastAPI
+lifespan in ``shared.lifespan``.
+
+Pool tuning is read from environment variables:
+
+- ``HTTP_MAX_CONNECTIONS`` (default 100)
+- ``HTTP_MAX_KEEPALIVE_CONNECTIONS`` (default 20)
+- ``HTTP_KEEPALIVE_EXPIRY`` seconds (default 30)
+- ``HTTP_TIMEOUT`` seconds (default 10)
+- ``HTTP2_ENABLED`` ("true"/"false", default "true")
+"""
+
+import os
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build an ``AsyncClient`` configured from the environment."""
+    limits = httpx.Limits(
+        max_connections=int(os.environ.get("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    timeout = httpx.Timeout(float(os.environ.get("HTTP_TIMEOUT", "10")))
+    http2 = _env_bool("HTTP2_ENABLED", True) and _http2_available()
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily if the lifespan has not run.
+
+    Lazy creation keeps the tools usable from scripts and benchmarks that do
+    not go through FastAPI.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and release its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
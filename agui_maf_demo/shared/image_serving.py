@@ -0,0 +1,119 @@
+"""HTTP responses for ``GET /images/{image_id}``.
+
+Chart IDs are never reused, so responses are marked immutable and carry a
+strong content-hash ETag; a browser re-rendering ``RichContent`` either uses
+its cache or gets a bodiless ``304`` for ``If-None-Match``. Single byte ranges
+are honoured with ``206``.
+
+In-memory images are sent as the stored ``bytes`` object (no base64 decode or
+copy); spilled images are streamed from their file in chunks.
+"""
+
+import re
+from typing import BinaryIO, Iterator, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from shared.image_store import StoredImage
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+_RANGE_SPEC = re.compile(r"([0-9]*)-([0-9]*)")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive ``(start, end)``.
+
+    Returns ``None`` when the header should be ignored (unsupported unit,
+    multiple ranges or invalid syntax, per RFC 9110) and raises
+    ``ValueError`` only for a valid range that is unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    match = _RANGE_SPEC.fullmatch(spec.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+    elif last:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        start, end = max(size - suffix, 0), size - 1
+    else:
+        return None
+    end = min(end, size - 1)
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def _iter_file(f: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def image_response(image: Optional[StoredImage], request: Request) -> Response:
+    """Build the response for ``image`` (``None`` means unknown or expired -> 404)."""
+    if image is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    headers = {
+        "ETag": image.etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, image.etag):
+        return Response(status_code=304, headers=headers)
+
+    start, end = 0, image.size - 1
+    status_code = 200
+    range_header = request.headers.get("range")
+    if range_header and image.size:
+        try:
+            byte_range = _parse_range(range_header, image.size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{image.size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{image.size}"
+
+    if image.data is not None:
+        body = image.data if status_code == 200 else image.data[start:end + 1]
+        return Response(content=body, status_code=status_code, media_type=image.media_type, headers=headers)
+
+    # Open before answering: an eviction or TTL sweep may unlink the file at any
+    # time, and once the headers are sent the client would get a truncated 200.
+    # The open file stays readable after an unlink.
+    try:
+        f = open(image.path, "rb")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found") from None
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+    return StreamingResponse(
+        _iter_file(f, start, end),
+        status_code=status_code,
+        media_type=image.media_type,
+        headers=headers,
+    )
@@ -0,0 +1,365 @@
+"""Bounded store for charts generated by ``execute_python_code``.
+
+The servers used to keep every chart forever in a module-level dict as a
+base64 string (33% larger than the PNG), so replicas crept toward their memory
+limit. :class:`LocalImageStore` keeps raw bytes instead and bounds them:
+
+- a byte-size cap on memory with LRU eviction,
+- TTL expiry,
+- optional spill of evicted images to a local directory (itself size-capped);
+  spilled images are streamed from their file when served.
+
+:class:`ImageStore` is the interface the servers use, so a Redis or blob-store
+backend can be added later without touching the tools or the endpoint.
+
+When ``SHARED_STATE_DIR`` is set (several worker processes, see ``serve.py``),
+:class:`SharedImageStore` is used instead: one file per image in
+``$SHARED_STATE_DIR/images`` (normally tmpfs, i.e. shared memory), so any
+worker can serve a chart another worker generated. It applies the same byte
+cap and TTL across all workers.
+
+Configuration is read from environment variables:
+
+- ``IMAGE_STORE_MAX_BYTES`` memory cap (default 256 MiB)
+- ``IMAGE_STORE_TTL`` seconds (default 3600)
+- ``IMAGE_STORE_SPILL_DIR`` directory for spilled images (unset disables spill)
+- ``IMAGE_STORE_SPILL_MAX_BYTES`` disk cap for spilled images (default 1 GiB)
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class StoredImage:
+    """One stored image; exactly one of ``data`` and ``path`` is set.
+
+    ``etag`` is a strong validator derived from the content hash, so it stays
+    the same when an image moves from memory to disk.
+    """
+
+    image_id: str
+    media_type: str
+    size: int
+    created_at: float
+    etag: str
+    data: Optional[bytes] = None
+    path: Optional[Path] = None
+
+
+def content_etag(data: bytes) -> str:
+    """Strong HTTP ETag (quoted) for ``data``."""
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+class ImageStore(ABC):
+    """Interface for image storage backends."""
+
+    @abstractmethod
+    def put(self, data: bytes, media_type: str = "image/png") -> str:
+        """Store ``data`` and return its new image ID.
+
+        May write files (spill, shared directory); async callers run it in a
+        worker thread.
+        """
+
+    @abstractmethod
+    def get(self, image_id: str) -> Optional[StoredImage]:
+        """Return the stored image, or ``None`` if it is unknown or expired."""
+
+    @abstractmethod
+    def delete(self, image_id: str) -> None:
+        """Forget an image if present."""
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Size and eviction counters for monitoring."""
+
+
+class LocalImageStore(ImageStore):
+    """In-process store with a memory cap, TTL and optional disk spill."""
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 3600.0,
+        spill_dir: Optional[str] = None,
+        spill_max_bytes: int = 1024 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_max_bytes = spill_max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, StoredImage] = OrderedDict()
+        self._disk: OrderedDict[str, StoredImage] = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.spills = 0
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def put(self, data: bytes, media_type: str = "image/png") -> str:
+        image_id = str(uuid.uuid4())
+        data = bytes(data)
+        image = StoredImage(image_id, media_type, len(data), self._clock(), content_etag(data), data=data)
+        with self._lock:
+            self._expire()
+            self._memory[image_id] = image
+            self.memory_bytes += image.size
+            # Never evict the image we just stored, even if it alone exceeds the cap
+            while self.memory_bytes > self.max_bytes and len(self._memory) > 1:
+                _, oldest = self._memory.popitem(last=False)
+                self.memory_bytes -= oldest.size
+                self._spill_or_drop(oldest)
+        return image_id
+
+    def get(self, image_id: str) -> Optional[StoredImage]:
+        with self._lock:
+            for tier in (self._memory, self._disk):
+                image = tier.get(image_id)
+                if image is None:
+                    continue
+                if self._clock() - image.created_at > self.ttl:
+                    self._remove(image_id)
+                    self.expirations += 1
+                    return None
+                tier.move_to_end(image_id)
+                return image
+        return None
+
+    def delete(self, image_id: str) -> None:
+        with self._lock:
+            self._remove(image_id)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "items": len(self._memory) + len(self._disk),
+                "memory_items": len(self._memory),
+                "memory_bytes": self.memory_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_items": len(self._disk),
+                "disk_bytes": self.disk_bytes,
+                "spill_max_bytes": self.spill_max_bytes if self.spill_dir else 0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "spills": self.spills,
+            }
+
+    # Internal helpers below expect ``self._lock`` to be held.
+
+    def _spill_or_drop(self, image: StoredImage) -> None:
+        if self.spill_dir is None or image.size > self.spill_max_bytes:
+            self.evictions += 1
+            return
+        path = self.spill_dir / image.image_id
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(image.data)
+        os.replace(tmp_path, path)
+        self._disk[image.image_id] = StoredImage(
+            image.image_id, image.media_type, image.size, image.created_at, image.etag, path=path
+        )
+        self.disk_bytes += image.size
+        self.spills += 1
+        while self.disk_bytes > self.spill_max_bytes:
+            _, oldest = self._disk.popitem(last=False)
+            self._unlink(oldest)
+            self.evictions += 1
+
+    def _remove(self, image_id: str) -> None:
+        image = self._memory.pop(image_id, None)
+        if image is not None:
+            self.memory_bytes -= image.size
+            return
+        image = self._disk.pop(image_id, None)
+        if image is not None:
+            self._unlink(image)
+
+    def _unlink(self, image: StoredImage) -> None:
+        self.disk_bytes -= image.size
+        try:
+            image.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self.ttl
+        for tier in (self._memory, self._disk):
+            expired = [image_id for image_id, image in tier.items() if image.created_at < cutoff]
+            for image_id in expired:
+                self._remove(image_id)
+                self.expirations += 1
+
+
+_EXTENSIONS = {"image/png": "png", "image/webp": "webp", "image/svg+xml": "svg", "image/jpeg": "jpg"}
+_MEDIA_TYPES = {ext: media_type for media_type, ext in _EXTENSIONS.items()}
+_IMAGE_ID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+class SharedImageStore(ImageStore):
+    """Directory-backed store shared by every worker process on the host.
+
+    The content-hash ETag (the same one :class:`LocalImageStore` uses) is
+    computed once in :meth:`put` and kept in a ``.{image_id}.etag`` sidecar,
+    written before the image so the image never exists without it; dot files
+    are ignored by the sweep and removed together with their image.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock_path = self.directory / ".lock"
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, data: bytes, media_type: str = "image/png") -> str:
+        image_id = str(uuid.uuid4())
+        path = self.directory / f"{image_id}.{_EXTENSIONS.get(media_type, 'png')}"
+        tmp_path = self.directory / f".{image_id}.tmp"
+        self._etag_path(path).write_text(content_etag(data))
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._locked():
+            self._sweep(keep=path)
+        return image_id
+
+    def get(self, image_id: str) -> Optional[StoredImage]:
+        if not _IMAGE_ID_RE.match(image_id):
+            return None
+        for ext, media_type in _MEDIA_TYPES.items():
+            path = self.directory / f"{image_id}.{ext}"
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self._clock() - stat.st_mtime > self.ttl:
+                self._unlink(path)
+                self.expirations += 1
+                return None
+            try:
+                etag = self._etag_path(path).read_text()
+            except FileNotFoundError:
+                # Written by an older version; hash the file once more
+                try:
+                    etag = content_etag(path.read_bytes())
+                except FileNotFoundError:
+                    return None
+            return StoredImage(image_id, media_type, stat.st_size, stat.st_mtime, etag, path=path)
+        return None
+
+    def delete(self, image_id: str) -> None:
+        if _IMAGE_ID_RE.match(image_id):
+            for ext in _MEDIA_TYPES:
+                self._unlink(self.directory / f"{image_id}.{ext}")
+
+    def stats(self) -> dict[str, Any]:
+        files = self._files()
+        return {
+            "items": len(files),
+            "bytes": sum(stat.st_size for _, stat in files),
+            "max_bytes": self.max_bytes,
+            "directory": str(self.directory),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock across worker processes while sweeping."""
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _files(self) -> list[tuple[Path, os.stat_result]]:
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    files.append((Path(entry.path), entry.stat()))
+                except FileNotFoundError:
+                    pass  # Removed by another worker
+        return files
+
+    def _sweep(self, keep: Path) -> None:
+        """Drop expired images, then the oldest ones while over the byte cap."""
+        cutoff = self._clock() - self.ttl
+        files = []
+        for path, stat in self._files():
+            if stat.st_mtime < cutoff and path != keep:
+                self._unlink(path)
+                self.expirations += 1
+            else:
+                files.append((path, stat))
+        total = sum(stat.st_size for _, stat in files)
+        for path, stat in sorted(files, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._unlink(path)
+            total -= stat.st_size
+            self.evictions += 1
+
+    @staticmethod
+    def _etag_path(path: Path) -> Path:
+        return path.with_name(f".{path.name.split('.', 1)[0]}.etag")
+
+    @classmethod
+    def _unlink(cls, path: Path) -> None:
+        for victim in (path, cls._etag_path(path)):
+            try:
+                victim.unlink()
+            except FileNotFoundError:
+                pass
+
+
+_store: Optional[ImageStore] = None
+
+
+def get_image_store() -> ImageStore:
+    """Return the process-wide image store configured from the environment."""
+    global _store
+    if _store is None and os.environ.get("SHARED_STATE_DIR"):
+        _store = SharedImageStore(
+            os.path.join(os.environ["SHARED_STATE_DIR"], "images"),
+            max_bytes=int(os.environ.get("IMAGE_STORE_MAX_BYTES", str(256 * 1024 * 1024))),
+            ttl=float(os.environ.get("IMAGE_STORE_TTL", "3600")),
+        )
+    elif _store is None:
+        _store = LocalImageStore(
+            max_bytes=int(os.environ.get("IMAGE_STORE_MAX_BYTES", str(256 * 1024 * 1024))),
+            ttl=float(os.environ.get("IMAGE_STORE_TTL", "3600")),
+            spill_dir=os.environ.get("IMAGE_STORE_SPILL_DIR") or None,
+            spill_max_bytes=int(os.environ.get("IMAGE_STORE_SPILL_MAX_BYTES", str(1024 * 1024 * 1024))),
+        )
+    return _store
@@ -0,0 +1,51 @@
+"""FastAPI lifespan shared by the demo servers.
+
+Creates process-wide resources on startup and releases them on shutdown, so
+no tool call pays for connection, client or worker setup on the request path.
+Slow steps (the code-interpreter pool) run as a background warmup tracked by
+``shared.warmup`` and surfaced through ``GET /ready``.
+
+Resources are imported only when enabled, so a server without HTTP-backed
+tools never imports httpx.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from shared.warmup import start_warmup
+
+
+def create_lifespan(sandbox: bool = False, http: bool = True, restaurants: bool = False, timezones: bool = False):
+    """Build a lifespan.
+
+    ``http=True`` opens the shared HTTP client (weather, web search);
+    ``sandbox=True`` also warms up the code-interpreter pool,
+    ``restaurants=True`` loads the restaurant catalog and ``timezones=True``
+    builds the timezone index.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app):
+        if http:
+            from shared.http_clients import get_http_client
+            from shared.search import get_search_client
+
+            get_http_client()
+            get_search_client()
+        warmup_task = start_warmup(sandbox=sandbox, restaurants=restaurants, timezones=timezones)
+        try:
+            yield
+        finally:
+            if not warmup_task.done():
+                warmup_task.cancel()
+                await asyncio.gather(warmup_task, return_exceptions=True)
+            if sandbox:
+                from shared.sandbox import shutdown_sandbox_pool
+
+                await shutdown_sandbox_pool()
+            if http:
+                from shared.http_clients import close_http_client
+
+                await close_http_client()
+
+    return lifespan
@@ -0,0 +1,355 @@
+"""Server profiles: which agents, instructions and tools each server exposes.
+
+A profile replaces one of the former ``server_*.py`` module bodies. Tools are
+referenced as ``(name, "module:attribute")`` pairs and imported only when the
+profile (and ``AGUI_TOOLS``, if set) enables them, see ``shared.tools``.
+
+- ``basic``: plain assistant, no tools (``server.py``, ``server_azure_ai.py``,
+  ``server_multi_provider.py``)
+- ``tools``: backend tools with plain-text results (``server_with_tools.py``)
+- ``multi_agent``: specialist agents behind a router, with the all-tools
+  orchestrator as fallback for mixed or unclear requests
+  (``server_multi_agent.py``, see ``shared.routing``)
+- ``magentic``: Magentic-style orchestrator (``server_magentic.py``)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    name: str
+    instructions: str
+    tools: tuple[tuple[str, str], ...] = ()
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RouteSpec:
+    """How ``shared.routing.AgentRouter`` recognises requests for one specialist."""
+
+    agent: str
+    description: str
+    keywords: tuple[str, ...] = ()  # regular expressions, matched case-insensitively on word boundaries
+    examples: tuple[str, ...] = ()  # typical requests, for similarity matching
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    title: str
+    agent: AgentSpec
+    specialists: tuple[AgentSpec, ...] = ()
+    routes: tuple[RouteSpec, ...] = ()  # when set, requests are routed to specialists
+    banner: tuple[str, ...] = ()
+
+    @property
+    def tool_names(self) -> set[str]:
+        names = {name for name, _ in self.agent.tools}
+        for specialist in self.specialists:
+            names.update(name for name, _ in specialist.tools)
+        return names
+
+
+# Plain results, for API clients and the console demos
+PLAIN_TOOLS = {
+    "get_weather": "shared.tools.weather:get_weather",
+    "search_restaurants": "shared.tools.restaurants:search_restaurants",
+    "calculate": "shared.tools.calculator:calculate",
+    "get_current_time": "shared.tools.clock:get_current_time",
+    "web_search": "shared.tools.web_search:web_search",
+}
+
+# Variants that send structured results to the web UI as ``tool_result`` events
+# (see shared.rich_results) and give the model a short summary
+UI_TOOLS = {
+    "get_weather": "shared.tools.weather:get_weather_card",
+    "web_search": "shared.tools.web_search:web_search_markdown",
+    "calculate": "shared.tools.calculator:calculate_card",
+    "execute_python_code": "shared.tools.python_code:execute_python_code",
+}
+
+
+def _tools(catalog: dict[str, str], *names: str) -> tuple[tuple[str, str], ...]:
+    return tuple((name, catalog[name]) for name in names)
+
+
+ASSISTANT_INSTRUCTIONS = "You are a helpful assistant."
+
+# Appended to the prompts of agents with UI_TOOLS: their structured results
+# reach the web UI directly (shared.rich_results), so the model must not
+# repeat them
+RICH_RESULT_RULE = """
+
+Weather cards, source links, calculation results and charts from tools are
+shown to the user automatically. Refer to them in your reply, but do not repeat
+URLs, image ids or the card contents verbatim."""
+
+TOOL_ASSISTANT_INSTRUCTIONS = """You are a helpful assistant with access to several tools.
+    
+Use the available tools when appropriate:
+- get_weather: For real-time weather information from OpenWeatherMap
+- search_restaurants: For finding dining options
+- calculate: For mathematical operations
+- get_current_time: For time information in any timezone
+- web_search: For current events, news, and up-to-date information from the web
+
+Always use tools when the user asks about these topics. Provide natural,
+conversational responses that incorporate the tool results. When using web_search,
+summarize the key findings and cite sources."""
+
+RESEARCH_INSTRUCTIONS = """You are a research specialist with expertise in finding and analyzing current information.
+
+Your capabilities:
+- Search the web for latest news, trends, and information
+- Provide well-sourced, up-to-date answers
+- Cite your sources and explain findings clearly
+
+When you receive a query:
+1. Use web_search to find current information
+2. Analyze and synthesize the results
+3. Provide a comprehensive answer with sources
+
+Be thorough, accurate, and always cite where information comes from."""
+
+WEATHER_INSTRUCTIONS = """You are a weather and location specialist.
+
+Your capabilities:
+- Provide current weather conditions for any location
+- Explain weather patterns and forecasts
+- Give location-specific advice based on weather
+
+When you receive a weather query:
+1. Use get_weather to fetch current conditions
+2. Provide a clear, conversational explanation
+3. Add helpful context (e.g., "Great weather for outdoor activities!")
+
+Be friendly and helpful with weather information."""
+
+DATA_INSTRUCTIONS = """You are a data science specialist with expertise in analytics and visualization.
+
+Your capabilities:
+- Perform mathematical calculations
+- Execute Python code for data analysis
+- Create visualizations with matplotlib, seaborn, plotly
+- Statistical analysis with pandas and numpy
+- Generate insights from data
+
+When you receive a data query:
+1. Use calculate for simple math operations
+2. Use execute_python_code for:
+   - Complex data analysis
+   - Creating charts and visualizations
+   - Statistical computations
+   - Data transformations
+3. Write clean, well-commented Python code
+4. Explain findings clearly with visualizations
+
+Be thorough, create helpful visualizations, and explain insights clearly."""
+
+ORCHESTRATOR_INSTRUCTIONS = """You are an intelligent orchestrator that routes user requests to specialized agents.
+
+You have access to all tools and should handle requests intelligently:
+
+For RESEARCH queries (news, current events, "search for", "what's happening"):
+- Use web_search tool directly
+- Cite sources clearly
+
+For WEATHER queries:
+- Use get_weather tool directly
+
+For CALCULATIONS:
+- Use calculate tool for simple math
+
+For DATA ANALYSIS and VISUALIZATION:
+- Use execute_python_code for:
+  * Data analytics with pandas/numpy
+  * Creating charts with matplotlib/seaborn
+  * Statistical analysis
+  * Machine learning tasks
+- Write clean Python code that generates visualizations
+- Explain what the code does and interpret the results
+
+For COMPLEX queries spanning multiple domains:
+- Use multiple tools as needed
+- Coordinate information from different sources"""
+
+MAGENTIC_INSTRUCTIONS = """You are an intelligent orchestrator that coordinates different specialized capabilities:
+
+**Your Capabilities**:
+
+1. **Weather Information** (via get_weather)
+   - Real-time weather data for any location
+   - Temperature, conditions, humidity, wind, etc.
+
+2. **Web Research** (via web_search)  
+   - Current information, news, trends
+   - Up-to-date facts from the web
+
+3. **Mathematical Calculations** (via calculate)
+   - Evaluate mathematical expressions
+   - Quick computations
+
+4. **Data Analysis & Visualization** (via execute_python_code)
+   - Create charts, plots, visualizations with matplotlib
+   - Data analytics with numpy, pandas, seaborn
+   - Complex data processing
+
+**Multi-Step Coordination**:
+
+When queries require multiple capabilities, coordinate them intelligently:
+
+Example: "Research weather in Paris and London, then compare them in a chart"
+1. get_weather("Paris")
+2. get_weather("London")
+3. execute_python_code to create comparison visualization
+
+Example: "Find latest AI trends and visualize adoption rates"
+1. web_search for AI trends
+2. execute_python_code to create charts from data
+
+Example: "What's the weather in Tokyo and can you plot the temperature trend?"
+1. get_weather("Tokyo")
+2. execute_python_code to visualize temperature
+
+**Personality**:
+- Be conversational and friendly
+- Explain what you're doing as you work
+- Show your coordination process
+- Present results clearly with rich formatting
+
+Remember: You're demonstrating Magentic-style orchestration - dynamically coordinating
+specialized capabilities to solve complex, multi-step queries!"""
+
+
+PROFILES: dict[str, Profile] = {
+    "basic": Profile(
+        name="basic",
+        title="AG-UI Server Demo",
+        agent=AgentSpec(name="AGUIAssistant", instructions=ASSISTANT_INSTRUCTIONS),
+    ),
+    "tools": Profile(
+        name="tools",
+        title="AG-UI Server with Backend Tools",
+        agent=AgentSpec(
+            name="ToolAssistant",
+            instructions=TOOL_ASSISTANT_INSTRUCTIONS,
+            tools=_tools(PLAIN_TOOLS, "get_weather", "search_restaurants", "calculate", "get_current_time", "web_search"),
+        ),
+    ),
+    "multi_agent": Profile(
+        name="multi_agent",
+        title="AG-UI Multi-Agent Server",
+        agent=AgentSpec(
+            name="OrchestratorAgent",
+            instructions=ORCHESTRATOR_INSTRUCTIONS + RICH_RESULT_RULE,
+            tools=_tools(UI_TOOLS, "get_weather", "web_search", "calculate", "execute_python_code"),
+        ),
+        specialists=(
+            AgentSpec(
+                name="ResearchAgent",
+                instructions=RESEARCH_INSTRUCTIONS + RICH_RESULT_RULE,
+                tools=_tools(UI_TOOLS, "web_search"),
+            ),
+            AgentSpec(
+                name="WeatherAgent",
+                instructions=WEATHER_INSTRUCTIONS + RICH_RESULT_RULE,
+                tools=_tools(UI_TOOLS, "get_weather"),
+            ),
+            AgentSpec(
+                name="DataAgent",
+                instructions=DATA_INSTRUCTIONS + RICH_RESULT_RULE,
+                tools=_tools(UI_TOOLS, "calculate", "execute_python_code"),
+            ),
+        ),
+        routes=(
+            RouteSpec(
+                agent="WeatherAgent",
+                description="current weather, temperature or conditions for a place",
+                keywords=(
+                    r"weather", r"temperatures?", r"forecast", r"rain(?:ing|y)?", r"snow(?:ing|y)?", r"sunny",
+                    r"humid(?:ity)?", r"wind(?:y)?", r"degrees", r"celsius", r"fahrenheit", r"umbrella",
+                ),
+                examples=(
+                    "what's the weather in Seattle",
+                    "is it going to rain in London today",
+                    "how hot is it in Tokyo right now",
+                    "should I bring a jacket in Paris",
+                ),
+            ),
+            RouteSpec(
+                agent="ResearchAgent",
+                description="news, current events or facts that need a web search",
+                keywords=(
+                    r"news", r"latest", r"current events", r"search(?: for)?", r"look up", r"headlines?",
+                    r"what(?:'s| is) happening", r"trends?", r"trending", r"research", r"recent(?:ly)?",
+                ),
+                examples=(
+                    "find the latest news about electric cars",
+                    "who won the match yesterday",
+                    "what happened at the conference this week",
+                    "tell me about recent developments in quantum computing",
+                ),
+            ),
+            RouteSpec(
+                agent="DataAgent",
+                description="math, calculations, data analysis, charts or Python code",
+                keywords=(
+                    r"calculate", r"compute", r"plot", r"charts?", r"graphs?", r"visuali[sz]e", r"histogram",
+                    r"regression", r"median", r"pandas", r"numpy", r"matplotlib", r"python", r"dataset", r"csv",
+                    r"sqrt", r"\d+(?:\.\d+)?\s*[-+*/^%]\s*\d+",
+                    # Only in analysis phrases: bare "mean", "average", "code" and
+                    # "statistics" also occur in "what do you mean", "zip code", ...
+                    r"(?:arithmetic |geometric )?mean (?:of|and (?:median|variance|standard deviation))",
+                    r"(?:moving |weighted )?average of", r"(?:moving|rolling|weighted) average",
+                    r"(?:descriptive|summary|basic) statistics", r"statistical analysis", r"standard deviation",
+                    r"(?:write|run|execute) (?:some |the |this |a )?(?:snippet of )?code",
+                ),
+                examples=(
+                    "what is 15 percent of 240",
+                    "draw a bar chart of these sales numbers",
+                    "analyze this data and show a trend line",
+                    "simulate rolling two dice 1000 times",
+                ),
+            ),
+        ),
+        banner=(
+            "👥 Routed specialists (rules, similarity, then LLM fallback):",
+            "   - ResearchAgent: web_search for research & news",
+            "   - WeatherAgent: get_weather for weather queries",
+            "   - DataAgent: calculate & execute_python_code for math/data",
+            "   - OrchestratorAgent: all tools, for mixed or unclear requests",
+        ),
+    ),
+    "magentic": Profile(
+        name="magentic",
+        title="AG-UI Magentic Orchestration Server",
+        agent=AgentSpec(
+            name="OrchestratorAgent",
+            instructions=MAGENTIC_INSTRUCTIONS + RICH_RESULT_RULE,
+            tools=_tools(UI_TOOLS, "get_weather", "web_search", "calculate", "execute_python_code"),
+            options={
+                "model": "gpt-4.1-mini",
+                "description": "Intelligent orchestrator coordinating specialized capabilities for weather, research, and data analysis",
+            },
+        ),
+        banner=(
+            "🧠 Orchestrator coordinates:",
+            "   - Weather queries (OpenWeatherMap API)",
+            "   - Web research (Tavily API)",
+            "   - Mathematical calculations",
+            "   - Data analysis & visualizations (matplotlib, pandas, numpy)",
+            "💡 Try multi-step queries like:",
+            "   'Research weather in Paris and London, then create a comparison chart'",
+            "   'Find latest AI trends and visualize adoption rates'",
+        ),
+    ),
+}
+
+
+def get_profile(name: str) -> Profile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown profile: {name}. Use one of: {', '.join(PROFILES)}") from None
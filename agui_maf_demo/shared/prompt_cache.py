@@ -0,0 +1,147 @@
+"""Prompt-prefix reuse: keep the static prompt byte-identical and measure cache hits.
+
+Azure OpenAI (like OpenAI) caches the longest previously seen prompt prefix
+once a prompt exceeds 1024 tokens, which cuts time-to-first-token and bills
+the cached part at a discount. A request reuses the cache only if everything
+before the new content is byte-identical to an earlier request, in order:
+tool schemas, the agent's instructions (sent as the first system message),
+then the conversation.
+
+This codebase keeps that prefix stable:
+
+- instructions are static module constants (``shared.profiles``) with nothing
+  per-request (dates, user names, state) interpolated into them;
+- each agent's tool list is built once at startup in profile order, so the
+  schemas serialize identically on every call;
+- history compaction drops old turns in blocks (``HISTORY_DROP_BLOCK``), so
+  the start of the conversation changes every few turns rather than on every
+  turn once the history is over budget.
+
+:func:`track_prompt_cache` is chat middleware (one instance per agent) that
+checks the first two hold at runtime, counting any change of an agent's
+instructions/tool-schema fingerprint as ``prefix_changes``, and reads the
+provider's usage on every model call: ``prompt/cached_tokens`` over input
+tokens is the cached-prefix ratio. Each call's ratio is sent to the UI as a
+``prompt_cache.usage`` CUSTOM event when an event stream is attached, and
+totals are available from :func:`prompt_cache_stats`. Providers that do not
+report cached tokens (e.g. the Azure AI inference endpoint) are counted under
+``calls_without_cache_info``.
+"""
+
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from shared.agui_events import emit_custom_event
+from shared.history import count_tokens
+
+CACHED_TOKEN_KEYS = ("prompt/cached_tokens", "cached_tokens")
+
+_totals = {
+    "calls": 0,
+    "calls_without_cache_info": 0,
+    "input_tokens": 0,
+    "cached_tokens": 0,
+    "prefix_changes": 0,
+}
+_agents: dict[str, dict[str, Any]] = {}
+
+
+def _cached_tokens(usage: Any) -> Optional[int]:
+    counts = getattr(usage, "additional_counts", None) or {}
+    for key in CACHED_TOKEN_KEYS:
+        if key in counts:
+            return counts[key] or 0
+    return None
+
+
+def static_prefix(chat_options: Any) -> tuple[str, int]:
+    """Fingerprint and token estimate of the instructions plus tool schemas."""
+    instructions = getattr(chat_options, "instructions", None) or ""
+    schemas = [
+        tool.to_json_schema_spec() if hasattr(tool, "to_json_schema_spec") else tool
+        for tool in (getattr(chat_options, "tools", None) or [])
+    ]
+    serialized = json.dumps(schemas, sort_keys=True, default=str)
+    fingerprint = hashlib.sha256((instructions + "\0" + serialized).encode()).hexdigest()[:16]
+    return fingerprint, count_tokens(instructions) + count_tokens(serialized)
+
+
+def _record(agent: str, usage: Any) -> None:
+    if usage is None:
+        return
+    input_tokens = getattr(usage, "input_token_count", None) or 0
+    cached = _cached_tokens(usage)
+    stats = _agents[agent]
+    _totals["calls"] += 1
+    stats["calls"] += 1
+    if cached is None:
+        _totals["calls_without_cache_info"] += 1
+        return
+    _totals["input_tokens"] += input_tokens
+    _totals["cached_tokens"] += cached
+    stats["input_tokens"] += input_tokens
+    stats["cached_tokens"] += cached
+    ratio = cached / input_tokens if input_tokens else 0.0
+    emit_custom_event(
+        "prompt_cache.usage",
+        {"agent": agent, "input_tokens": input_tokens, "cached_tokens": cached, "cached_ratio": round(ratio, 4)},
+    )
+
+
+def track_prompt_cache(agent: str) -> Callable[[Any, Callable[[Any], Awaitable[None]]], Awaitable[None]]:
+    """Build chat middleware that checks prefix stability and records cache usage for ``agent``."""
+    _agents.setdefault(
+        agent,
+        {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "static_prefix_tokens": 0, "fingerprint": None},
+    )
+    memo: dict[tuple, tuple[str, int]] = {}
+
+    async def middleware(context: Any, next: Callable[[Any], Awaitable[None]]) -> None:
+        options = context.chat_options
+        tools = getattr(options, "tools", None) or []
+        # Tool objects are built once, so identity is a cheap key for the fingerprint
+        key = (getattr(options, "instructions", None), tuple(id(tool) for tool in tools))
+        if key not in memo:
+            memo[key] = static_prefix(options)
+        fingerprint, prefix_tokens = memo[key]
+        stats = _agents[agent]
+        if stats["fingerprint"] not in (None, fingerprint):
+            _totals["prefix_changes"] += 1
+        stats["fingerprint"] = fingerprint
+        stats["static_prefix_tokens"] = prefix_tokens
+
+        await next(context)
+
+        if not context.is_streaming:
+            _record(agent, getattr(context.result, "usage_details", None))
+            return
+
+        stream = context.result
+
+        async def observe():
+            async for update in stream:
+                for content in getattr(update, "contents", None) or []:
+                    if getattr(content, "type", None) == "usage":
+                        _record(agent, content.details)
+                yield update
+
+        context.result = observe()
+
+    return middleware
+
+
+def prompt_cache_stats() -> dict:
+    """Cumulative prompt-cache counters for this process, overall and per agent."""
+    input_tokens = _totals["input_tokens"]
+    return {
+        **_totals,
+        "cached_ratio": round(_totals["cached_tokens"] / input_tokens, 4) if input_tokens else 0.0,
+        "agents": {
+            name: {
+                **stats,
+                "cached_ratio": round(stats["cached_tokens"] / stats["input_tokens"], 4) if stats["input_tokens"] else 0.0,
+            }
+            for name, stats in _agents.items()
+        },
+    }
@@ -0,0 +1,67 @@
+"""Chat client construction per provider.
+
+Provider SDKs are imported inside :func:`build_chat_client`, so only the
+selected provider's packages (and credential modules) are loaded.
+"""
+
+import os
+from typing import Any
+
+from shared.config import ServerConfig
+
+
+def _azure_credential(kind: str) -> Any:
+    from shared.credentials import cached_credential, get_azure_credential
+
+    if kind == "auto":
+        return get_azure_credential()
+    if kind == "default":
+        from azure.identity import DefaultAzureCredential
+
+        return cached_credential(DefaultAzureCredential())
+    if kind == "cli":
+        from azure.identity import AzureCliCredential
+
+        return cached_credential(AzureCliCredential())
+    raise ValueError(f"Unknown credential: {kind}. Use 'cli', 'default' or 'auto'")
+
+
+def build_chat_client(config: ServerConfig) -> tuple[Any, str]:
+    """Return ``(chat_client, description)`` for ``config.provider``."""
+    if config.provider == "azure-openai":
+        from agent_framework.azure import AzureOpenAIChatClient
+
+        endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+        deployment_name = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME")
+        if not endpoint or not deployment_name:
+            raise ValueError("For Azure OpenAI, set: AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT_NAME")
+
+        chat_client = AzureOpenAIChatClient(
+            credential=_azure_credential(config.credential),
+            endpoint=endpoint,
+            deployment_name=deployment_name,
+        )
+        return chat_client, f"Azure OpenAI - {deployment_name} ({endpoint})"
+
+    if config.provider == "azure-ai":
+        from agent_framework.azure import AzureAIChatClient
+        from azure.ai.inference import ChatCompletionsClient
+
+        endpoint = os.environ.get("AZURE_AI_ENDPOINT")
+        api_key = os.environ.get("AZURE_AI_API_KEY")
+        if not endpoint:
+            raise ValueError("For Azure AI, set: AZURE_AI_ENDPOINT")
+
+        # Use API key or managed identity
+        if api_key:
+            from azure.core.credentials import AzureKeyCredential
+
+            credential, auth_method = AzureKeyCredential(api_key), "API Key"
+        else:
+            credential = _azure_credential("default" if config.credential == "cli" else config.credential)
+            auth_method = "Managed Identity"
+
+        inference_client = ChatCompletionsClient(endpoint=endpoint, credential=credential)
+        return AzureAIChatClient(client=inference_client), f"Azure AI Foundry ({auth_method}) - {endpoint}"
+
+    raise ValueError(f"Unknown provider: {config.provider}. Use 'azure-openai' or 'azure-ai'")
@@ -0,0 +1,214 @@
+"""Restaurant catalog behind ``search_restaurants``.
+
+The catalog is a directory of columnar files, loaded once per process and
+memory-mapped so a catalog of millions of venues costs little resident
+memory and no parse time:
+
+- ``rows.npy``: NumPy structured array, one record per venue, with ``city``
+  and ``cuisine`` codes, ``price`` (number of ``$``), ``rating`` and the
+  offset/length of the name in ``names.bin``;
+- ``names.bin``: UTF-8 names, back to back;
+- ``vocab.json``: the city and cuisine strings the codes refer to.
+
+Loading builds an inverted index from ``(city, cuisine)`` to the row ids of
+that pair, sorted by rating (one ``lexsort`` over the columns; the postings
+are slices of a single array, not copies). A search picks the postings of
+every cuisine matching the request (substring match, ``"any"`` for all) and
+merges them with a heap, stopping after ``max_results`` rows; only those
+rows are read from the columns and turned into dicts.
+
+``RESTAURANT_CATALOG`` points at a catalog directory written by
+:func:`save_catalog` (see ``benchmarks/restaurant_catalog.py`` for a
+synthetic one). Without it, a small built-in sample answers for every city.
+"""
+
+import heapq
+import itertools
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+ROW_DTYPE = np.dtype(
+    [
+        ("city", "<u4"),
+        ("cuisine", "<u2"),
+        ("price", "u1"),
+        ("rating", "<f4"),
+        ("name_offset", "<u8"),
+        ("name_length", "<u2"),
+    ]
+)
+
+# Rows of this city match every location (the built-in sample)
+ANY_CITY = "*"
+
+SAMPLE = [
+    ("The Golden Fork", ANY_CITY, "Italian", 4.5, 2),
+    ("Bella Italia", ANY_CITY, "Italian", 4.2, 3),
+    ("Sushi Master", ANY_CITY, "Japanese", 4.7, 3),
+    ("Taco Fiesta", ANY_CITY, "Mexican", 4.3, 1),
+    ("Spice Garden", ANY_CITY, "Indian", 4.6, 2),
+    ("Green Leaf", ANY_CITY, "Vegetarian", 4.4, 2),
+]
+
+
+def normalize_city(location: str) -> str:
+    """``" Paris, France "`` -> ``"paris"``."""
+    return location.split(",")[0].strip().lower()
+
+
+def save_catalog(path: str | Path, venues: Iterable[tuple[str, str, str, float, int]]) -> int:
+    """Write ``(name, city, cuisine, rating, price)`` tuples as a catalog directory."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    cities: dict[str, int] = {}
+    cuisines: dict[str, int] = {}
+    records = []
+    offset = 0
+    with open(path / "names.bin", "wb") as names:
+        for name, city, cuisine, rating, price in venues:
+            encoded = name.encode()[:65535]
+            names.write(encoded)
+            records.append((
+                cities.setdefault(city, len(cities)),
+                cuisines.setdefault(cuisine, len(cuisines)),
+                price,
+                rating,
+                offset,
+                len(encoded),
+            ))
+            offset += len(encoded)
+    np.save(path / "rows.npy", np.array(records, dtype=ROW_DTYPE))
+    (path / "vocab.json").write_text(json.dumps({"cities": list(cities), "cuisines": list(cuisines)}))
+    return len(records)
+
+
+class RestaurantCatalog:
+    """Memory-mapped venues with a ``(city, cuisine)`` index sorted by rating."""
+
+    def __init__(self, rows: np.ndarray, names: Any, cities: list[str], cuisines: list[str]):
+        self.rows = rows
+        self.names = names
+        self.cities = cities
+        self.cuisines = cuisines
+        self._city_codes = {normalize_city(city): code for code, city in enumerate(cities)}
+        self._cuisine_names = [cuisine.lower() for cuisine in cuisines]
+        # Columns are views into the mapped file; reading one does not load the others
+        self._rating = np.asarray(rows["rating"])
+        self._index = self._build_index()
+
+    @classmethod
+    def load(cls, path: str | Path) -> "RestaurantCatalog":
+        path = Path(path)
+        vocab = json.loads((path / "vocab.json").read_text())
+        rows = np.load(path / "rows.npy", mmap_mode="r")
+        with open(path / "names.bin", "rb") as names_file:
+            # Slicing an mmap returns bytes without going through numpy
+            names = mmap.mmap(names_file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(names_file.fileno()).st_size else b""
+        return cls(rows, names, vocab["cities"], vocab["cuisines"])
+
+    @classmethod
+    def sample(cls) -> "RestaurantCatalog":
+        names = "".join(name for name, *_ in SAMPLE).encode()
+        offsets = itertools.accumulate((len(name.encode()) for name, *_ in SAMPLE), initial=0)
+        cuisines = list(dict.fromkeys(cuisine for _, _, cuisine, _, _ in SAMPLE))
+        rows = np.array(
+            [
+                (0, cuisines.index(cuisine), price, rating, offset, len(name.encode()))
+                for (name, _, cuisine, rating, price), offset in zip(SAMPLE, offsets)
+            ],
+            dtype=ROW_DTYPE,
+        )
+        return cls(rows, names, [ANY_CITY], cuisines)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _build_index(self) -> dict[tuple[int, int], np.ndarray]:
+        if not len(self.rows):
+            return {}
+        city = np.asarray(self.rows["city"])
+        cuisine = np.asarray(self.rows["cuisine"])
+        # Sort by city, then cuisine, then rating descending
+        order = np.lexsort((-self._rating, cuisine, city)).astype(np.uint32)
+        keys = city[order].astype(np.uint64) << np.uint64(16) | cuisine[order].astype(np.uint64)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        group_keys = keys[starts]
+        return {
+            (city_code, cuisine_code): order[start:end]
+            for city_code, cuisine_code, start, end in zip(
+                (group_keys >> np.uint64(16)).tolist(),
+                (group_keys & np.uint64(0xFFFF)).tolist(),
+                starts.tolist(),
+                ends.tolist(),
+            )
+        }
+
+    def _postings(self, location: str, cuisine: str) -> list[np.ndarray]:
+        city_codes = [self._city_codes[key] for key in (normalize_city(location), ANY_CITY) if key in self._city_codes]
+        wanted = cuisine.strip().lower()
+        if wanted in ("", "any"):
+            cuisine_codes = range(len(self.cuisines))
+        else:
+            cuisine_codes = [code for code, name in enumerate(self._cuisine_names) if wanted in name]
+        return [
+            self._index[key]
+            for key in ((city, code) for city in city_codes for code in cuisine_codes)
+            if key in self._index
+        ]
+
+    def top_rows(self, location: str, cuisine: str = "any", k: int = 3) -> list[int]:
+        """Row ids of the ``k`` best-rated venues for ``location`` and ``cuisine``."""
+        postings = self._postings(location, cuisine)
+        if k <= 0 or not postings:
+            return []
+        if len(postings) == 1:
+            return postings[0][:k].tolist()
+        # Each posting list is sorted by rating: keep the head of every list on a
+        # heap and pop k times, so at most k + len(postings) rows are looked at
+        rating = self._rating
+        heap = [(-float(rating[posting[0]]), int(posting[0]), i, 0) for i, posting in enumerate(postings)]
+        heapq.heapify(heap)
+        rows = []
+        while heap and len(rows) < k:
+            _, row, i, position = heapq.heappop(heap)
+            rows.append(row)
+            position += 1
+            if position < len(postings[i]):
+                following = int(postings[i][position])
+                heapq.heappush(heap, (-float(rating[following]), following, i, position))
+        return rows
+
+    def venues(self, rows: list[int]) -> list[dict[str, Any]]:
+        """Read just ``rows`` from the mapped columns."""
+        if not rows:
+            return []
+        results = []
+        for city, cuisine, price, rating, offset, length in self.rows[rows].tolist():
+            results.append({
+                "name": self.names[offset:offset + length].decode(errors="replace"),
+                "cuisine": self.cuisines[cuisine],
+                "rating": round(rating, 1),
+                "price": "$" * price,
+            })
+        return results
+
+    def search(self, location: str, cuisine: str = "any", k: int = 3) -> list[dict[str, Any]]:
+        return self.venues(self.top_rows(location, cuisine, k))
+
+
+_catalog: Optional[RestaurantCatalog] = None
+
+
+def get_catalog() -> RestaurantCatalog:
+    """Return the process-wide catalog, loading ``RESTAURANT_CATALOG`` on first use."""
+    global _catalog
+    if _catalog is None:
+        path = os.environ.get("RESTAURANT_CATALOG")
+        _catalog = RestaurantCatalog.load(path) if path else RestaurantCatalog.sample()
+    return _catalog
@@ -0,0 +1,56 @@
+"""Structured tool results sent straight to the web UI.
+
+The web UI tools used to return markdown with ``[WEATHER_ICON]``,
+``[LINK]``, ``[CALC_RESULT]`` and ``[IMAGE_ID]`` markers, and the prompts
+asked the model to copy every marker into its reply: the UI only saw what
+the model echoed, token by token (URLs and UUIDs included), and a marker the
+model dropped or mangled was lost. Now a tool hands its typed payload to
+:func:`deliver`, which sends it as an AG-UI ``CUSTOM`` event on the run's
+SSE stream (see ``shared.agui_events``) and returns a compact plain-text
+summary, the only thing the model sees:
+
+- ``tool_result``: ``{"kind", ...payload}`` where ``kind`` is one of
+  ``weather`` (``location``, ``temperature``, ``feels_like``,
+  ``description``, ``humidity``, ``wind_speed``, ``icon_url``), ``links``
+  (``query``, ``results``: ``title``/``url``), ``calculation``
+  (``expression``, ``result``) or ``code`` (``image_ids``).
+
+Without a stream attached (scripts, non-SSE callers) nothing is sent and the
+model gets the summary, or the tool's ``fallback`` text when the summary
+alone would lose something (search result URLs, chart locations).
+:func:`rich_result_stats` reports how many payload bytes went to the UI
+instead of through the model.
+"""
+
+import json
+from collections import Counter
+from typing import Any, Optional
+
+from shared.agui_events import emit_custom_event
+
+EVENT_NAME = "tool_result"
+
+_totals: dict[str, Any] = {"delivered": 0, "undelivered": 0, "payload_bytes": 0, "summary_chars": 0, "by_kind": Counter()}
+
+
+def deliver(kind: str, payload: dict[str, Any], summary: str, shown: str, fallback: Optional[str] = None) -> str:
+    """Send ``payload`` to the UI and return what the model gets.
+
+    ``shown`` tells the model what the user already sees (e.g. "A weather
+    card is shown to the user."); it is appended only when the event was sent.
+    """
+    if emit_custom_event(EVENT_NAME, {"kind": kind, **payload}):
+        _totals["delivered"] += 1
+        _totals["by_kind"][kind] += 1
+        _totals["payload_bytes"] += len(json.dumps(payload, separators=(",", ":")))
+        text = f"{summary}\n{shown}"
+    else:
+        _totals["undelivered"] += 1
+        text = summary if fallback is None else fallback
+    _totals["summary_chars"] += len(text)
+    return text
+
+
+def rich_result_stats() -> dict[str, Any]:
+    """Structured results sent to the UI, by kind, and payload vs. summary size."""
+    return {**_totals, "by_kind": dict(_totals["by_kind"])}
@@ -0,0 +1,267 @@
+"""Route each request to one specialist agent instead of an all-tools orchestrator.
+
+The ``multi_agent`` profile used to send every turn to ``OrchestratorAgent``,
+which carries every tool schema and a long instruction prompt on every model
+call. :class:`RoutingAgent` is mounted on the AG-UI endpoint instead and,
+per run, hands the conversation to the specialist that owns the request, so
+each model call only carries that specialist's prompt and tools.
+
+:class:`AgentRouter` decides on the latest user message, cheapest signal
+first:
+
+1. ``rules``: keyword patterns of each :class:`~shared.profiles.RouteSpec`.
+   One matching specialist wins; matches for several specialists (e.g.
+   "weather in Paris, then chart it") go to the orchestrator.
+2. ``similarity``: cosine similarity of a bag-of-words vector against each
+   route's example requests.
+3. ``sticky``: follow-ups without a signal ("and in London?") stay with the
+   agent that handled the thread's previous turn.
+4. ``llm``: a one-word classification call with no tools.
+5. ``default``: the orchestrator.
+
+Decisions are counted in :func:`routing_stats` (per method and agent,
+decision latency, prompt overhead avoided) and sent to the UI as a
+``routing.decision`` CUSTOM event when an event stream is attached.
+
+Configuration is read from environment variables:
+
+- ``ROUTER_SIMILARITY_THRESHOLD`` minimum cosine similarity (default 0.45)
+- ``ROUTER_LLM_FALLBACK`` ask the model when nothing else matched (default true)
+- ``ROUTER_LLM_TIMEOUT`` seconds to wait for that call (default 5)
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from agent_framework import BaseAgent, ChatMessage, Role
+
+from shared.agui_events import emit_custom_event
+from shared.history import count_tokens
+from shared.profiles import RouteSpec
+
+SIMILARITY_THRESHOLD = float(os.environ.get("ROUTER_SIMILARITY_THRESHOLD", "0.45"))
+SIMILARITY_MARGIN = 0.1
+LLM_FALLBACK = os.environ.get("ROUTER_LLM_FALLBACK", "true").lower() in ("1", "true", "yes")
+LLM_TIMEOUT = float(os.environ.get("ROUTER_LLM_TIMEOUT", "5"))
+STICKY_THREADS = 10_000
+
+_STOP_WORDS = frozenset(
+    "a an and are as at be can could do does for from how i in is it me my of on or please show "
+    "some tell that the this to what whats which with you your".split()
+)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_totals = {
+    "requests": 0,
+    "by_method": Counter(),
+    "by_agent": Counter(),
+    "llm_calls": 0,
+    "llm_failures": 0,
+    "decision_seconds": 0.0,
+    "overhead_tokens_avoided": 0,
+}
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    agent: str
+    method: str
+    score: float = 0.0
+    seconds: float = 0.0
+
+
+def _vector(text: str) -> Counter:
+    words = []
+    for word in _WORD_RE.findall(text.lower().replace("'", "")):
+        if word in _STOP_WORDS:
+            continue
+        # Crude stemming so "charts"/"charting" meet "chart"
+        for suffix in ("ing", "ed", "es", "s"):
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                word = word[: -len(suffix)]
+                break
+        words.append(word)
+    return Counter(words)
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[word] for word, count in a.items())
+    return dot / (math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values())))
+
+
+class AgentRouter:
+    """Picks the agent for a request; ``default`` handles mixed or unclear ones."""
+
+    def __init__(
+        self,
+        routes: Sequence[RouteSpec],
+        default: str,
+        chat_client: Any = None,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+        llm_fallback: bool = LLM_FALLBACK,
+    ):
+        self.routes = list(routes)
+        self.default = default
+        self.chat_client = chat_client
+        self.similarity_threshold = similarity_threshold
+        self.llm_fallback = llm_fallback and chat_client is not None
+        self._patterns = {
+            route.agent: re.compile(r"\b(?:" + "|".join(route.keywords) + r")\b", re.IGNORECASE)
+            for route in self.routes
+            if route.keywords
+        }
+        self._examples = {route.agent: [_vector(example) for example in route.examples] for route in self.routes}
+        self._last_agent: OrderedDict[str, str] = OrderedDict()
+
+    def match_rules(self, text: str) -> list[str]:
+        return [agent for agent, pattern in self._patterns.items() if pattern.search(text)]
+
+    def match_similarity(self, text: str) -> tuple[Optional[str], float]:
+        vector = _vector(text)
+        scores = sorted(
+            ((max((_cosine(vector, example) for example in examples), default=0.0), agent)
+             for agent, examples in self._examples.items()),
+            reverse=True,
+        )
+        if not scores:
+            return None, 0.0
+        best_score, best_agent = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else 0.0
+        if best_score >= self.similarity_threshold and best_score - runner_up >= SIMILARITY_MARGIN:
+            return best_agent, best_score
+        return None, best_score
+
+    async def classify_with_llm(self, text: str) -> Optional[str]:
+        labels = [route.agent for route in self.routes] + [self.default]
+        prompt = "Route the user's request to one agent. Reply with the agent name only.\n" + "\n".join(
+            f"- {route.agent}: {route.description}" for route in self.routes
+        )
+        prompt += f"\n- {self.default}: requests needing several of the above, or anything else"
+        _totals["llm_calls"] += 1
+        try:
+            response = await asyncio.wait_for(
+                self.chat_client.get_response(
+                    [ChatMessage(role=Role.SYSTEM, text=prompt), ChatMessage(role=Role.USER, text=text[:1000])],
+                    max_tokens=8,
+                    temperature=0,
+                ),
+                timeout=LLM_TIMEOUT,
+            )
+        except Exception as e:
+            _totals["llm_failures"] += 1
+            print(f"⚠️  Routing fallback failed: {e}")
+            return None
+        answer = (response.text or "").lower()
+        return next((label for label in labels if label.lower() in answer), None)
+
+    async def route(self, text: str, thread_id: Optional[str] = None) -> RoutingDecision:
+        start = time.perf_counter()
+        decision = await self._decide(text, thread_id)
+        decision = RoutingDecision(decision.agent, decision.method, decision.score, time.perf_counter() - start)
+        if thread_id:
+            self._last_agent[thread_id] = decision.agent
+            self._last_agent.move_to_end(thread_id)
+            while len(self._last_agent) > STICKY_THREADS:
+                self._last_agent.popitem(last=False)
+        return decision
+
+    async def _decide(self, text: str, thread_id: Optional[str]) -> RoutingDecision:
+        matched = self.match_rules(text)
+        if len(matched) == 1:
+            return RoutingDecision(matched[0], "rules", 1.0)
+        if matched:
+            return RoutingDecision(self.default, "rules", 1.0)
+
+        agent, score = self.match_similarity(text)
+        if agent:
+            return RoutingDecision(agent, "similarity", score)
+
+        if thread_id and thread_id in self._last_agent:
+            return RoutingDecision(self._last_agent[thread_id], "sticky", score)
+
+        if self.llm_fallback:
+            agent = await self.classify_with_llm(text)
+            if agent:
+                return RoutingDecision(agent, "llm", score)
+
+        return RoutingDecision(self.default, "default", score)
+
+
+def prompt_overhead_tokens(agent: Any) -> int:
+    """Tokens an agent adds to every model call: instructions plus tool schemas."""
+    options = getattr(agent, "chat_options", None)
+    instructions = getattr(options, "instructions", None) or ""
+    schemas = [tool.to_json_schema_spec() for tool in (getattr(options, "tools", None) or []) if hasattr(tool, "to_json_schema_spec")]
+    return count_tokens(instructions) + count_tokens(json.dumps(schemas))
+
+
+def _last_user_text(messages: Any) -> str:
+    if messages is None:
+        return ""
+    if isinstance(messages, (str, ChatMessage)):
+        messages = [messages]
+    for message in reversed(list(messages)):
+        if isinstance(message, str):
+            return message
+        if message.role == Role.USER and message.text:
+            return message.text
+    return ""
+
+
+def routing_stats() -> dict:
+    """Cumulative routing counters for this process."""
+    requests = _totals["requests"]
+    return {
+        "requests": requests,
+        "by_method": dict(_totals["by_method"]),
+        "by_agent": dict(_totals["by_agent"]),
+        "llm_calls": _totals["llm_calls"],
+        "llm_failures": _totals["llm_failures"],
+        "avg_decision_ms": round(_totals["decision_seconds"] / requests * 1000, 3) if requests else 0.0,
+        "overhead_tokens_avoided": _totals["overhead_tokens_avoided"],
+    }
+
+
+class RoutingAgent(BaseAgent):
+    """Agent that delegates each run to the agent chosen by an :class:`AgentRouter`."""
+
+    def __init__(self, router: AgentRouter, agents: dict[str, Any], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.router = router
+        self.agents = agents
+        # Shared client, so the AG-UI adapter can register client-side tools
+        self.chat_client = agents[router.default].chat_client
+        self._overhead = {name: prompt_overhead_tokens(agent) for name, agent in agents.items()}
+
+    async def _select(self, messages: Any, thread: Any) -> Any:
+        metadata = getattr(thread, "metadata", None) or {}
+        decision = await self.router.route(_last_user_text(messages), metadata.get("ag_ui_thread_id"))
+
+        _totals["requests"] += 1
+        _totals["by_method"][decision.method] += 1
+        _totals["by_agent"][decision.agent] += 1
+        _totals["decision_seconds"] += decision.seconds
+        _totals["overhead_tokens_avoided"] += self._overhead[self.router.default] - self._overhead[decision.agent]
+        emit_custom_event(
+            "routing.decision",
+            {"agent": decision.agent, "method": decision.method, "score": round(decision.score, 3)},
+        )
+        return self.agents[decision.agent]
+
+    async def run(self, messages: Any = None, *, thread: Any = None, **kwargs: Any) -> Any:
+        agent = await self._select(messages, thread)
+        return await agent.run(messages, thread=thread, **kwargs)
+
+    async def run_stream(self, messages: Any = None, *, thread: Any = None, **kwargs: Any):
+        agent = await self._select(messages, thread)
+        async for update in agent.run_stream(messages, thread=thread, **kwargs):
+            yield update
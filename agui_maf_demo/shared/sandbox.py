@@ -0,0 +1,348 @@
+"""Out-of-process worker pool for ``execute_python_code``.
+
+Running ``exec`` inside the FastAPI process blocks the event loop for every
+conversation and swaps the process-global ``sys.stdout``/``sys.stderr``, so
+concurrent executions mix their output. Instead, jobs are dispatched to a pool
+of pre-started worker processes (see ``shared.sandbox_worker``) that already
+have numpy/pandas/matplotlib/seaborn imported.
+
+Each job gets its own stdout/stderr capture, a wall-clock timeout and a memory
+cap (resident set size, sampled while the job runs; Linux only, backed by a
+hard ``RLIMIT_AS`` set inside the worker). A worker that exceeds either limit,
+or dies, is killed and replaced in the background.
+
+Configuration is read from environment variables:
+
+- ``SANDBOX_WORKERS`` pool size (default 2)
+- ``SANDBOX_TIMEOUT`` seconds per job (default 30)
+- ``SANDBOX_START_TIMEOUT`` seconds a new worker may take to import the stack
+  and report ready (default 60)
+- ``SANDBOX_MEMORY_MB`` RSS cap per worker (default 1024, 0 disables)
+- ``SANDBOX_MAX_OUTPUT_CHARS`` captured stdout/stderr per job (default 100000)
+
+Jobs can also run in streaming mode, forwarding stdout/stderr chunks and
+finished figures while the code is still running (see ``execute``).
+"""
+
+import asyncio
+import os
+import select
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from shared.chart_render import RenderedImage
+from shared.sandbox_worker import read_frame, write_frame
+
+_PACKAGE_ROOT = str(Path(__file__).resolve().parent.parent)
+_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of one ``execute_python_code`` job."""
+
+    stdout: str = ""
+    stderr: str = ""
+    images: list[RenderedImage] = field(default_factory=list)
+    error: Optional[str] = None
+    timed_out: bool = False
+    memory_exceeded: bool = False
+    duration: float = 0.0
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _SandboxWorker:
+    """One worker process plus the blocking I/O used to drive it.
+
+    All methods block and are called from a thread via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+
+    @classmethod
+    def spawn(cls, memory_limit: int = 0, start_timeout: float = 60.0) -> "_SandboxWorker":
+        env = dict(os.environ)
+        # The worker turns this into its RLIMIT_AS headroom
+        env["SANDBOX_MEMORY_MB"] = str(memory_limit // (1024 * 1024))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PACKAGE_ROOT, env.get("PYTHONPATH")]))
+        # One BLAS thread per worker: the pool provides the parallelism.
+        env.setdefault("OPENBLAS_NUM_THREADS", "1")
+        env.setdefault("OMP_NUM_THREADS", "1")
+        env.setdefault("MPLBACKEND", "Agg")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "shared.sandbox_worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            bufsize=0,
+        )
+        worker = cls(process)
+        # A worker stuck in an import or the warmup must not block start()/_replace()
+        deadline = time.perf_counter() + start_timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                worker.kill()
+                raise RuntimeError(f"sandbox worker did not start within {start_timeout:g}s")
+            readable, _, _ = select.select([process.stdout], [], [], remaining)
+            if readable:
+                break
+        try:
+            ready = read_frame(process.stdout)
+        except (EOFError, OSError):
+            ready = None
+        if not ready or not ready.get("ready"):
+            worker.kill()
+            raise RuntimeError("sandbox worker failed to start")
+        return worker
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def run(
+        self,
+        code: str,
+        timeout: float,
+        memory_limit: int,
+        on_event: Optional[Callable[[dict], None]] = None,
+    ) -> tuple[SandboxResult, bool]:
+        """Execute one job; return the result and whether the worker is still usable.
+
+        With ``on_event`` the job runs in streaming mode and the callback
+        receives each output/figure frame (from this thread) as it arrives.
+        """
+        start = time.perf_counter()
+        try:
+            write_frame(self.process.stdin, {"code": code, "stream": on_event is not None})
+        except (BrokenPipeError, OSError) as e:
+            return SandboxResult(error=f"Sandbox worker unavailable: {e}"), False
+
+        deadline = start + timeout
+        next_sample = start
+        streamed_images: list[RenderedImage] = []
+        while True:
+            now = time.perf_counter()
+            remaining = deadline - now
+            if remaining <= 0:
+                self.kill()
+                return SandboxResult(
+                    images=streamed_images,
+                    error=f"Execution timed out after {timeout:g}s",
+                    timed_out=True,
+                    duration=time.perf_counter() - start,
+                ), False
+
+            # Sampled on every pass, not only when select times out: a job that
+            # streams output continuously would otherwise never be checked
+            if memory_limit and now >= next_sample:
+                next_sample = now + _POLL_INTERVAL
+                rss = _rss_bytes(self.pid)
+                if rss is not None and rss > memory_limit:
+                    self.kill()
+                    return SandboxResult(
+                        images=streamed_images,
+                        error=f"Execution exceeded the memory limit of {memory_limit // (1024 * 1024)} MB",
+                        memory_exceeded=True,
+                        duration=time.perf_counter() - start,
+                    ), False
+
+            readable, _, _ = select.select([self.process.stdout], [], [], min(_POLL_INTERVAL, remaining))
+            if readable:
+                try:
+                    frame = read_frame(self.process.stdout)
+                except (EOFError, OSError):
+                    frame = None
+                if frame is None:
+                    self.kill()
+                    return SandboxResult(
+                        images=streamed_images,
+                        error="Sandbox worker exited unexpectedly",
+                        duration=time.perf_counter() - start,
+                    ), False
+                if "event" in frame:
+                    if frame["event"] == "figure":
+                        streamed_images.append(frame["image"])
+                    if on_event is not None:
+                        on_event(frame)
+                    continue
+                payload = frame["result"]
+                break
+
+        result = SandboxResult(duration=time.perf_counter() - start, **payload)
+        result.images = streamed_images + result.images
+        # A MemoryError inside the worker can leave it fragmented; replace it.
+        healthy = not (result.error or "").startswith("MemoryError")
+        if not healthy:
+            result.memory_exceeded = True
+        return result, healthy
+
+    def stop(self, timeout: float = 2.0) -> None:
+        try:
+            write_frame(self.process.stdin, None)
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream is not None:
+                stream.close()
+
+
+class SandboxPool:
+    """Fixed-size pool of sandbox workers with an async dispatch API."""
+
+    def __init__(self, size: int = 2, timeout: float = 30.0, memory_mb: int = 1024, start_timeout: float = 60.0):
+        self.size = size
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.memory_limit = memory_mb * 1024 * 1024
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: set[_SandboxWorker] = set()
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._waiting = 0
+        self._busy = 0
+        self.jobs = 0
+        self.timeouts = 0
+        self.memory_kills = 0
+        self.restarts = 0
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Spawn all workers (in parallel threads, since each imports the stack)."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.started:
+                return
+            idle: asyncio.Queue = asyncio.Queue()
+            workers = await asyncio.gather(
+                *(asyncio.to_thread(_SandboxWorker.spawn, self.memory_limit, self.start_timeout)
+                  for _ in range(self.size))
+            )
+            for worker in workers:
+                self._workers.add(worker)
+                idle.put_nowait(worker)
+            self._idle = idle
+
+    async def execute(self, code: str, on_event: Optional[Callable[[dict], None]] = None) -> SandboxResult:
+        """Run ``code`` on the next free worker without blocking the event loop.
+
+        ``on_event`` enables streaming: it is called on the event loop for every
+        ``stdout``/``stderr``/``figure`` frame while the job runs. The result
+        still contains the full (capped) output and every figure.
+        """
+        if not self.started:
+            await self.start()
+
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+
+        self._busy += 1
+        healthy = False
+        try:
+            forward = None
+            if on_event is not None:
+                loop = asyncio.get_running_loop()
+
+                def forward(frame: dict) -> None:
+                    loop.call_soon_threadsafe(on_event, frame)
+
+            result, healthy = await asyncio.to_thread(
+                worker.run, code, self.timeout, self.memory_limit, forward
+            )
+        finally:
+            self._busy -= 1
+            self.jobs += 1
+            if healthy and not self.started:
+                # The pool was shut down while the job ran
+                await asyncio.to_thread(worker.stop)
+            elif healthy:
+                self._idle.put_nowait(worker)
+            else:
+                asyncio.get_running_loop().create_task(self._replace(worker))
+
+        if result.timed_out:
+            self.timeouts += 1
+        if result.memory_exceeded:
+            self.memory_kills += 1
+        return result
+
+    async def _replace(self, worker: _SandboxWorker) -> None:
+        self._workers.discard(worker)
+        await asyncio.to_thread(worker.kill)
+        try:
+            replacement = await asyncio.to_thread(_SandboxWorker.spawn, self.memory_limit, self.start_timeout)
+        except Exception as e:
+            print(f"❌ Failed to respawn sandbox worker: {e}")
+            return
+        if not self.started:
+            # shutdown() ran while the replacement was starting; do not orphan it
+            await asyncio.to_thread(replacement.stop)
+            return
+        self.restarts += 1
+        self._workers.add(replacement)
+        self._idle.put_nowait(replacement)
+
+    async def shutdown(self) -> None:
+        workers, self._workers = list(self._workers), set()
+        self._idle = None
+        await asyncio.gather(*(asyncio.to_thread(w.stop) for w in workers))
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "alive": len(self._workers),
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "busy": self._busy,
+            "queue_depth": self._waiting,
+            "jobs": self.jobs,
+            "timeouts": self.timeouts,
+            "memory_kills": self.memory_kills,
+            "restarts": self.restarts,
+        }
+
+
+_pool: Optional[SandboxPool] = None
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Return the process-wide pool configured from the environment."""
+    global _pool
+    if _pool is None:
+        _pool = SandboxPool(
+            size=int(os.environ.get("SANDBOX_WORKERS", "2")),
+            timeout=float(os.environ.get("SANDBOX_TIMEOUT", "30")),
+            memory_mb=int(os.environ.get("SANDBOX_MEMORY_MB", "1024")),
+            start_timeout=float(os.environ.get("SANDBOX_START_TIMEOUT", "60")),
+        )
+    return _pool
+
+
+async def shutdown_sandbox_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.shutdown()
+        _pool = None
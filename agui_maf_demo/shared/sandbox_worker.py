@@ -0,0 +1,312 @@
+"""Code-interpreter worker process.
+
+Started by ``shared.sandbox`` as ``python -m shared.sandbox_worker``. The
+worker imports the scientific stack once and renders a warmup figure (priming
+the matplotlib font cache) before reporting ready, then executes jobs one at
+a time.
+
+Protocol: length-prefixed pickle frames. The parent's pipes are moved off
+fd 0/1 at startup so that user code (or C extensions) writing to stdout cannot
+corrupt the frame stream; fd 1 is pointed at stderr instead.
+
+- parent -> worker: ``{"code": str, "stream": bool}`` per job, ``None`` to exit
+- worker -> parent: ``{"ready": True}`` once, then per job any number of
+  ``{"event": "stdout" | "stderr", "text": str}`` and
+  ``{"event": "figure", "image": RenderedImage}`` frames (streaming jobs
+  only) followed by ``{"result": {...}}``
+
+Captured output is capped at ``SANDBOX_MAX_OUTPUT_CHARS`` per stream (default
+100000) so huge prints are never fully materialized.
+
+``SANDBOX_MEMORY_MB`` (set by the pool) also becomes a hard ``RLIMIT_AS``
+limit where the platform supports it, so an allocation too large for the cap
+fails with ``MemoryError`` inside the worker even when it happens between two
+of the parent's RSS samples.
+"""
+
+import builtins
+import io
+import os
+import pickle
+import struct
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, BinaryIO, Callable, Optional
+
+from shared.chart_render import RenderedImage, RenderSettings, render_figure
+
+_HEADER = struct.Struct("!I")
+
+
+def read_frame(stream: BinaryIO) -> Any:
+    header = _read_exactly(stream, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    payload = _read_exactly(stream, length)
+    if payload is None:
+        raise EOFError("truncated frame")
+    return pickle.loads(payload)
+
+
+def write_frame(stream: BinaryIO, obj: Any) -> None:
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _claim_protocol_streams() -> tuple[BinaryIO, BinaryIO]:
+    """Move the parent pipes to private fds and detach fd 0/1 from them."""
+    proto_in = os.fdopen(os.dup(0), "rb", buffering=0)
+    proto_out = os.fdopen(os.dup(1), "wb", buffering=0)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    return proto_in, proto_out
+
+
+def preload_namespace() -> dict[str, Any]:
+    """Import the data-science stack once and return the names exposed to user code."""
+    namespace: dict[str, Any] = {}
+    try:
+        import numpy as np
+        import pandas as pd
+        import matplotlib
+        matplotlib.use("Agg")  # Non-interactive backend
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        namespace.update({
+            "np": np, "numpy": np,
+            "pd": pd, "pandas": pd,
+            "plt": plt, "matplotlib": matplotlib,
+            "sns": sns, "seaborn": sns,
+        })
+    except ImportError:
+        pass
+    return namespace
+
+
+def warm_up(namespace: dict[str, Any]) -> None:
+    """Render a throwaway figure so fonts and the Agg renderer are loaded before the first job."""
+    plt = namespace.get("plt")
+    if plt is None:
+        return
+    fig, ax = plt.subplots(figsize=(2, 2))
+    ax.plot([0, 1], [0, 1], label="warmup")
+    ax.set_title("warmup")
+    ax.legend()
+    fig.savefig(io.BytesIO(), format="png", dpi=50)
+    plt.close("all")
+    pd = namespace.get("pd")
+    if pd is not None:
+        pd.DataFrame({"x": [1, 2, 3]}).describe()
+
+
+def limit_address_space(limit: int) -> None:
+    """Cap the address space at its current size plus ``limit`` bytes.
+
+    Called once the stack is imported and warmed up: shared libraries, arenas
+    and thread stacks are mapped but mostly not resident, so an absolute
+    ``RLIMIT_AS`` equal to the RSS cap would fail at import time. No-op
+    without ``resource.RLIMIT_AS`` or ``/proc``.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    if limit <= 0 or not hasattr(resource, "RLIMIT_AS"):
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            mapped = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = mapped + limit if hard == resource.RLIM_INFINITY else min(mapped + limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+class CappedOutput(io.TextIOBase):
+    """Text stream that keeps at most ``limit`` characters.
+
+    With ``emit`` set, newly written text is also queued for incremental
+    delivery; :meth:`flush_pending` (called by :class:`_Flusher`) sends it.
+    """
+
+    def __init__(self, name: str, limit: int, emit: Optional[Callable[[dict], None]] = None):
+        self.name = name
+        self.limit = limit
+        self._emit = emit
+        self._parts: list[str] = []
+        self._pending: list[str] = []
+        self._size = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            room = self.limit - self._size
+            kept = text[:room] if room > 0 else ""
+            if kept:
+                self._parts.append(kept)
+                self._size += len(kept)
+                if self._emit is not None:
+                    self._pending.append(kept)
+            self.dropped += len(text) - len(kept)
+        return len(text)
+
+    def flush_pending(self) -> None:
+        with self._lock:
+            text = "".join(self._pending)
+            self._pending.clear()
+        if text:
+            self._emit({"event": self.name, "text": text})
+
+    def getvalue(self) -> str:
+        with self._lock:
+            text = "".join(self._parts)
+            if self.dropped:
+                text += f"\n... [{self.dropped} characters truncated]"
+            return text
+
+
+class _Flusher(threading.Thread):
+    """Periodically forwards pending output while a streaming job runs."""
+
+    def __init__(self, outputs: list[CappedOutput], interval: float):
+        super().__init__(daemon=True)
+        self.outputs = outputs
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            for output in self.outputs:
+                output.flush_pending()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+        for output in self.outputs:
+            output.flush_pending()
+
+
+def _capture_figures(plt, settings: RenderSettings) -> list[RenderedImage]:
+    images = [render_figure(plt.figure(fig_num), settings) for fig_num in plt.get_fignums()]
+    plt.close("all")
+    return images
+
+
+def run_job(
+    code: str,
+    namespace: dict[str, Any],
+    settings: Optional[RenderSettings] = None,
+    emit: Optional[Callable[[dict], None]] = None,
+    max_output: int = 100_000,
+    flush_interval: float = 0.1,
+) -> dict[str, Any]:
+    """Execute ``code`` with its own capped stdout/stderr buffers and collect figures.
+
+    With ``emit`` set (streaming mode), output is forwarded every
+    ``flush_interval`` seconds and each figure is emitted as soon as it is
+    finished, either by ``plt.show()`` or at the end of the job. The returned
+    result then only lists figures that were not emitted.
+    """
+    settings = settings or RenderSettings()
+    stdout = CappedOutput("stdout", max_output, emit)
+    stderr = CappedOutput("stderr", max_output, emit)
+    exec_globals = {"__builtins__": builtins, **namespace}
+    error = None
+    images: list[RenderedImage] = []
+    plt = namespace.get("plt")
+
+    flusher = None
+    original_show = None
+    if emit is not None:
+        flusher = _Flusher([stdout, stderr], flush_interval)
+        flusher.start()
+        if plt is not None:
+            original_show = plt.show
+
+            def show(*args, **kwargs):
+                for image in _capture_figures(plt, settings):
+                    emit({"event": "figure", "image": image})
+
+            plt.show = show
+
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            exec(code, exec_globals)
+        except MemoryError:
+            error = "MemoryError: the code exceeded the sandbox memory limit"
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+
+    if original_show is not None:
+        plt.show = original_show
+
+    if plt is not None:
+        try:
+            images = _capture_figures(plt, settings)
+        except Exception as e:
+            stderr.write(f"\nError capturing plot: {e}")
+
+    if flusher is not None:
+        flusher.stop()
+        for image in images:
+            emit({"event": "figure", "image": image})
+        images = []
+
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "images": images,
+        "error": error,
+    }
+
+
+def main() -> None:
+    proto_in, proto_out = _claim_protocol_streams()
+    namespace = preload_namespace()
+    settings = RenderSettings.from_env()
+    max_output = int(os.environ.get("SANDBOX_MAX_OUTPUT_CHARS", "100000"))
+    warm_up(namespace)
+    limit_address_space(int(os.environ.get("SANDBOX_MEMORY_MB", "1024")) * 1024 * 1024)
+    write_lock = threading.Lock()
+
+    def send(frame: dict) -> None:
+        with write_lock:
+            write_frame(proto_out, frame)
+
+    send({"ready": True})
+
+    while True:
+        job = read_frame(proto_in)
+        if job is None:
+            break
+        emit = send if job.get("stream") else None
+        send({"result": run_job(job["code"], namespace, settings, emit=emit, max_output=max_output)})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
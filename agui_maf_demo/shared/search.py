@@ -0,0 +1,79 @@
+"""Tavily web search over the shared async HTTP client.
+
+The tools used to build a new ``TavilyClient`` per call and make a blocking
+request from inside the agent loop. Here a single :class:`TavilySearchClient`
+is created at startup and talks to the Tavily REST API through the pooled
+``httpx.AsyncClient`` from ``shared.http_clients``.
+
+Results are cached on ``(normalized query, max_results)``, and concurrent
+identical searches (e.g. the orchestrator and a retry in the same turn) share
+one upstream request. Cache sizing is read from the environment:
+
+- ``SEARCH_CACHE_TTL`` seconds (default 300)
+- ``SEARCH_CACHE_SIZE`` entries (default 512)
+
+``TAVILY_BASE_URL`` overrides the API URL for local fakes.
+"""
+
+import os
+from typing import Any, Optional
+
+from shared.http_clients import get_http_client
+from shared.ttl_cache import AsyncTTLCache, get_shared_tier
+
+DEFAULT_TAVILY_URL = "https://api.tavily.com"
+
+search_cache = AsyncTTLCache(
+    "web_search",
+    maxsize=int(os.environ.get("SEARCH_CACHE_SIZE", "512")),
+    ttl=float(os.environ.get("SEARCH_CACHE_TTL", "300")),
+    shared=get_shared_tier(),
+)
+
+
+class TavilySearchClient:
+    """Minimal async Tavily client bound to one API key."""
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = (base_url or os.environ.get("TAVILY_BASE_URL", DEFAULT_TAVILY_URL)).rstrip("/")
+
+    async def search(self, query: str, max_results: int = 5) -> dict[str, Any]:
+        response = await get_http_client().post(
+            f"{self.base_url}/search",
+            json={"query": query, "max_results": max_results},
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+_client: Optional[TavilySearchClient] = None
+
+
+def get_search_client() -> Optional[TavilySearchClient]:
+    """Return the process-wide search client, or ``None`` without ``TAVILY_API_KEY``."""
+    global _client
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        return None
+    if _client is None or _client.api_key != api_key:
+        _client = TavilySearchClient(api_key)
+    return _client
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+async def search_web(query: str, max_results: int = 5) -> dict[str, Any]:
+    """Run a cached, deduplicated Tavily search.
+
+    Raises ``RuntimeError`` when no API key is configured and
+    ``httpx.HTTPStatusError`` on upstream errors; errors are not cached.
+    """
+    client = get_search_client()
+    if client is None:
+        raise RuntimeError("TAVILY_API_KEY is not configured")
+    key = (normalize_query(query), max_results)
+    return await search_cache.get_or_load(key, lambda: client.search(query, max_results))
@@ -0,0 +1,92 @@
+"""Incremental decoder for AG-UI server-sent event streams.
+
+Network reads cut the stream anywhere: inside an event, inside a line, in
+the middle of a multi-byte UTF-8 character. :class:`SSEDecoder` takes raw
+chunks in arrival order and returns the complete events they finish:
+
+- bytes are appended to one ``bytearray``, and the end of the last complete
+  event (a blank line) is looked for only in the bytes added since the last
+  scan, so an event that spans many chunks is scanned once, not once per
+  chunk;
+- all complete events are cut off the buffer together, so it never holds
+  more than the unfinished event, and are split with ``bytes.split``;
+- bytes are decoded only as complete JSON payloads (a newline byte never
+  occurs inside a UTF-8 sequence), with ``json.loads`` straight from bytes;
+  a single ``data:`` line (every AG-UI event) needs no further splitting.
+
+``\n`` and ``\r\n`` line endings are accepted; comment, ``event:``,
+``id:`` and ``retry:`` lines are skipped (AG-UI only uses ``data:``), as are
+payloads that are not JSON (``[DONE]``).
+
+The web UI has the same decoder in ``agui_web_ui/app/agui-sse.ts``.
+``benchmarks/sse_decode.py`` replays a recorded stream through both this and
+the naive split-per-chunk approach.
+"""
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+
+class SSEDecoder:
+    """Turn SSE byte chunks into AG-UI event dicts."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # Where the next search for the end of an event starts
+        self._scanned = 0
+        # A chunk ended with "\r": the "\n" may arrive with the next one
+        self._carriage_return = False
+        self.events = 0
+        self.invalid = 0
+
+    def feed(self, chunk: bytes) -> list[dict[str, Any]]:
+        """Add one chunk; return the events it completes, in order."""
+        if self._carriage_return:
+            chunk = b"\r" + chunk
+            self._carriage_return = False
+        if b"\r" in chunk:
+            if chunk.endswith(b"\r"):
+                chunk = chunk[:-1]
+                self._carriage_return = True
+            chunk = chunk.replace(b"\r\n", b"\n")
+        buffer = self._buffer
+        buffer += chunk
+        end = buffer.rfind(b"\n\n", self._scanned)
+        if end == -1:
+            self._scanned = max(len(buffer) - 1, 0)
+            return []
+        block = buffer[:end]
+        del buffer[: end + 2]
+        self._scanned = max(len(buffer) - 1, 0)
+
+        events: list[dict[str, Any]] = []
+        for frame in block.split(b"\n\n"):
+            if frame.startswith(b"data:") and b"\n" not in frame:
+                payload = frame[5:]
+            else:
+                payload = b"\n".join(line[5:] for line in frame.split(b"\n") if line.startswith(b"data:"))
+                if not payload:
+                    continue
+            try:
+                event = json.loads(payload)
+            except ValueError:
+                self.invalid += 1
+                continue
+            if isinstance(event, dict):
+                events.append(event)
+        self.events += len(events)
+        return events
+
+    def reset(self) -> None:
+        """Drop any partial event (e.g. before reusing the decoder for a new stream)."""
+        self._buffer.clear()
+        self._scanned = 0
+        self._carriage_return = False
+
+
+async def aiter_events(chunks: AsyncIterable[bytes]) -> AsyncIterator[dict[str, Any]]:
+    """Yield AG-UI events from an async iterable of byte chunks (e.g. ``response.aiter_raw()``)."""
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for event in decoder.feed(chunk):
+            yield event
@@ -0,0 +1,283 @@
+"""Coalesced, bounded SSE writes with disconnect-driven cancellation.
+
+The AG-UI endpoint yields one ``TEXT_MESSAGE_CONTENT`` event per model delta
+and each becomes its own write, so a long answer is thousands of tiny
+JSON-encoded frames and flushes. A slow client also lets server buffers
+grow. :class:`SSEStreamMiddleware` wraps the endpoint:
+
+- events go into a bounded per-connection queue (``SSE_SEND_QUEUE`` frames);
+  when the client reads slowly the queue fills and the endpoint waits, so
+  the model stream is read no faster than the client consumes it;
+- a writer task drains the queue and merges consecutive text deltas of the
+  same message into one event. While a delta is pending it waits up to
+  ``SSE_COALESCE_MS`` for more, or until ``SSE_COALESCE_BYTES`` are pending,
+  then sends everything in one write. Other events (tool calls, run
+  finished) are written as soon as they arrive;
+- once the request body is read, it watches for ``http.disconnect`` (and
+  failed writes) and cancels the endpoint, which closes the upstream model
+  stream instead of generating tokens nobody will read.
+
+Configuration is read from environment variables when the middleware is
+built (constructor arguments override them):
+
+- ``SSE_COALESCE_MS`` coalescing window in milliseconds (default 20, 0 only
+  merges deltas that are already queued)
+- ``SSE_COALESCE_BYTES`` flush once this many bytes are pending (default 4096)
+- ``SSE_SEND_QUEUE`` pending frames per connection (default 256)
+
+Counters are available from :func:`sse_stats`.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Optional
+
+from shared.agui_events import encode_sse
+
+# The encoder writes the type field first, so deltas are recognized without parsing
+_TEXT_PREFIX = b'data: {"type":"TEXT_MESSAGE_CONTENT"'
+_END = object()
+
+_totals = {
+    "streams": 0,
+    "events_in": 0,
+    "events_out": 0,
+    "writes": 0,
+    "bytes_out": 0,
+    "deltas_merged": 0,
+    "max_queue_depth": 0,
+    "backpressure_seconds": 0.0,
+    "disconnects": 0,
+    "cancelled_runs": 0,
+}
+# Settings of the most recently built middleware, reported by sse_stats()
+_settings: dict[str, Any] = {}
+
+
+class FrameSplitter:
+    """Split SSE body chunks into ``data: ...\\n\\n`` frames.
+
+    A chunk may end partway through an event; that tail is kept until a later
+    chunk completes it (see ``shared.sse_decoder`` for the same approach).
+    """
+
+    def __init__(self):
+        self._tail = b""
+
+    def feed(self, body: bytes) -> list[bytes]:
+        """Return the frames ``body`` completes, in order."""
+        data = self._tail + body if self._tail else body
+        end = data.rfind(b"\n\n")
+        if end == -1:
+            self._tail = data
+            return []
+        self._tail = data[end + 2:]
+        return [frame + b"\n\n" for frame in data[:end].split(b"\n\n") if frame.strip()]
+
+    def flush(self) -> list[bytes]:
+        """Whatever is left at the end of the stream, unchanged."""
+        tail, self._tail = self._tail, b""
+        return [tail] if tail.strip() else []
+
+
+def coalesce_frames(frames: list[bytes]) -> list[bytes]:
+    """Merge runs of text deltas for the same message into one frame each."""
+    out: list[bytes] = []
+    pending: Optional[dict[str, Any]] = None
+    pending_raw: Optional[bytes] = None
+
+    def flush():
+        nonlocal pending, pending_raw
+        if pending is not None:
+            out.append(encode_sse(pending))
+        elif pending_raw is not None:
+            out.append(pending_raw)
+        pending = pending_raw = None
+
+    for frame in frames:
+        if not frame.startswith(_TEXT_PREFIX):
+            flush()
+            out.append(frame)
+            continue
+        if pending_raw is None and pending is None:
+            # Only decode once there is a second delta to merge with
+            pending_raw = frame
+            continue
+        event = json.loads(frame[6:])
+        if pending is None:
+            pending = json.loads(pending_raw[6:])
+        if pending.get("messageId") == event.get("messageId"):
+            pending["delta"] = pending.get("delta", "") + event.get("delta", "")
+            _totals["deltas_merged"] += 1
+            continue
+        flush()
+        pending = event
+    flush()
+    return out
+
+
+class SSEStreamMiddleware:
+    """ASGI middleware coalescing and bounding AG-UI SSE responses."""
+
+    def __init__(
+        self,
+        app,
+        path: str = "/",
+        coalesce_seconds: Optional[float] = None,
+        coalesce_bytes: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.app = app
+        self.path = path
+        self.coalesce_seconds = (
+            coalesce_seconds if coalesce_seconds is not None else float(os.environ.get("SSE_COALESCE_MS", "20")) / 1000
+        )
+        self.coalesce_bytes = coalesce_bytes if coalesce_bytes is not None else int(os.environ.get("SSE_COALESCE_BYTES", "4096"))
+        self.max_queue = max_queue if max_queue is not None else int(os.environ.get("SSE_SEND_QUEUE", "256"))
+        _settings.update(
+            coalesce_ms=self.coalesce_seconds * 1000, coalesce_bytes=self.coalesce_bytes, send_queue=self.max_queue
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        disconnected = asyncio.Event()
+        state = {"streaming": False, "body_read": False, "complete": False}
+        tasks: dict[str, asyncio.Task] = {}
+
+        def on_disconnect():
+            # Servers also report http.disconnect once the response is complete
+            if disconnected.is_set() or state["complete"]:
+                return
+            disconnected.set()
+            _totals["disconnects"] += 1
+            endpoint = tasks.get("endpoint")
+            if endpoint is not None and not endpoint.done():
+                _totals["cancelled_runs"] += 1
+                endpoint.cancel()
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    on_disconnect()
+                    return
+
+        async def watched_receive():
+            if state["body_read"]:
+                # The watcher owns receive() now; report the disconnect it sees
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                on_disconnect()
+            elif message["type"] == "http.request" and not message.get("more_body", False):
+                state["body_read"] = True
+                tasks["watcher"] = loop.create_task(watch_disconnect())
+            return message
+
+        async def write(frames: list[bytes], more_body: bool = True) -> None:
+            frames = coalesce_frames(frames)
+            body = b"".join(frames)
+            if not body and more_body:
+                return
+            try:
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+            except OSError:
+                on_disconnect()
+                return
+            state["complete"] = not more_body
+            _totals["events_out"] += len(frames)
+            _totals["writes"] += 1
+            _totals["bytes_out"] += len(body)
+
+        async def writer():
+            splitter = FrameSplitter()
+            while not disconnected.is_set():
+                item = await queue.get()
+                frames: list[bytes] = []
+                size = 0
+                deadline = None
+                while True:
+                    if item is _END:
+                        await write(frames + splitter.flush(), more_body=False)
+                        return
+                    frames.extend(splitter.feed(item))
+                    size += len(item)
+                    if not queue.empty():
+                        item = queue.get_nowait()
+                        continue
+                    # Only wait for more while a text delta is pending
+                    waiting_on_delta = bool(frames) and frames[-1].startswith(_TEXT_PREFIX)
+                    if size >= self.coalesce_bytes or self.coalesce_seconds <= 0 or not waiting_on_delta:
+                        break
+                    deadline = deadline or loop.time() + self.coalesce_seconds
+                    try:
+                        item = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                    except asyncio.TimeoutError:
+                        break
+                await write(frames)
+
+        async def queued_send(message):
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                state["streaming"] = headers.get(b"content-type", b"").startswith(b"text/event-stream")
+                await send(message)
+                if state["streaming"]:
+                    _totals["streams"] += 1
+                    tasks["writer"] = loop.create_task(writer())
+                return
+            if message["type"] != "http.response.body" or not state["streaming"]:
+                await send(message)
+                return
+            if disconnected.is_set():
+                return
+            body = message.get("body", b"")
+            _totals["events_in"] += body.count(b"\n\n")
+            item = body if message.get("more_body", False) else _END
+            if item is _END and body:
+                await self._put(queue, body)
+            await self._put(queue, item)
+            if item is _END:
+                # Return once the last frame is written, like a direct send would
+                await asyncio.gather(tasks["writer"], return_exceptions=True)
+
+        tasks["endpoint"] = loop.create_task(self.app(scope, watched_receive, queued_send))
+        try:
+            await tasks["endpoint"]
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
+        finally:
+            for name in ("endpoint", "watcher", "writer"):
+                task = tasks.get(name)
+                if task is not None and not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def _put(self, queue: asyncio.Queue, item: Any) -> None:
+        if queue.full():
+            # The client reads slower than we produce: wait instead of buffering
+            start = time.perf_counter()
+            await queue.put(item)
+            _totals["backpressure_seconds"] += time.perf_counter() - start
+        else:
+            queue.put_nowait(item)
+        _totals["max_queue_depth"] = max(_totals["max_queue_depth"], queue.qsize())
+
+
+def sse_stats() -> dict:
+    """Cumulative SSE write counters for this process."""
+    writes = _totals["writes"]
+    return {
+        **_totals,
+        "backpressure_seconds": round(_totals["backpressure_seconds"], 3),
+        "events_per_write": round(_totals["events_in"] / writes, 2) if writes else 0.0,
+        **_settings,
+    }
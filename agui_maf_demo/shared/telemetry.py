@@ -0,0 +1,421 @@
+"""Latency instrumentation: OpenTelemetry spans and Prometheus metrics.
+
+Three hooks cover a run end to end:
+
+- :class:`TelemetryMiddleware` (ASGI, around the AG-UI endpoint): request
+  receive time, time to the first ``TEXT_MESSAGE_CONTENT`` frame, total run
+  time and the time each SSE chunk spends in ``send()`` (flush/backpressure).
+  It opens the ``agui.run`` span; the spans below become its children.
+- :func:`instrument_model_calls` (chat middleware, one per agent): model
+  time-to-first-token, call duration and streaming output tokens per second
+  (``agui.model_call`` span).
+- :func:`instrument_tool_call` (function middleware): duration and status of
+  every tool call (``agui.tool`` span). At the end of a run each tool's share
+  of the run time is recorded, so a single ``web_search`` eating 70% of a
+  turn shows up in ``agui_run_tool_share_ratio``.
+
+Metrics live in a small in-process registry rendered in the Prometheus text
+format at ``GET /metrics`` (per worker process); no collector is needed.
+
+Spans use the OpenTelemetry API, which the agent framework depends on, and
+nest with the framework's own spans. They are only exported when an exporter
+is configured (``TELEMETRY_EXPORTERS``, comma-separated):
+
+- ``memory``: keep the last ``TELEMETRY_RECENT_SPANS`` spans (default 200)
+  in-process, served at ``GET /traces/recent``
+- ``console``: print spans to stdout
+- ``otlp``: send to ``OTLP_ENDPOINT`` (e.g. ``http://localhost:4317``)
+
+Custom span exporters can be passed to :func:`configure_tracing`. Set
+``ENABLE_OTEL=true`` to also export the agent framework's own spans.
+"""
+
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # pragma: no cover - the agent framework depends on it
+    _otel_trace = None
+
+from shared.history import count_tokens
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FLUSH_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+RATE_BUCKETS = (5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+_TEXT_CONTENT = b'"TEXT_MESSAGE_CONTENT"'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Iterable[tuple[str, Any]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            labels = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Any] = {}
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+RUNS = REGISTRY.counter("agui_runs_total", "AG-UI runs by outcome.", ("status",))
+RUN_DURATION = REGISTRY.histogram("agui_run_duration_seconds", "AG-UI run time, request start to last byte.")
+REQUEST_RECEIVE = REGISTRY.histogram("agui_request_receive_seconds", "Time to receive the AG-UI request body.")
+FIRST_TOKEN = REGISTRY.histogram(
+    "agui_first_token_seconds", "Request start to the first TEXT_MESSAGE_CONTENT event sent to the client."
+)
+SSE_FLUSH = REGISTRY.histogram(
+    "agui_sse_flush_seconds", "Time one SSE chunk spends in send() (flush/backpressure).", buckets=FLUSH_BUCKETS
+)
+MODEL_TTFT = REGISTRY.histogram(
+    "agui_model_ttft_seconds", "Model call start to the first streamed text update.", ("agent",)
+)
+MODEL_DURATION = REGISTRY.histogram("agui_model_call_duration_seconds", "Model call duration.", ("agent",))
+MODEL_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "agui_model_tokens_per_second", "Streaming output tokens per second after the first token.", ("agent",), RATE_BUCKETS
+)
+MODEL_OUTPUT_TOKENS = REGISTRY.counter("agui_model_output_tokens_total", "Model output tokens.", ("agent",))
+TOOL_DURATION = REGISTRY.histogram("agui_tool_duration_seconds", "Tool call duration.", ("tool", "status"))
+TOOL_SHARE = REGISTRY.histogram(
+    "agui_run_tool_share_ratio", "Share of the run time spent in each tool (summed over its calls).", ("tool",), RATIO_BUCKETS
+)
+
+
+class RunTimings:
+    """Per-run accumulator filled by the model and tool hooks."""
+
+    def __init__(self):
+        self.tool_seconds: dict[str, float] = {}
+        self.tool_calls = 0
+        self.model_calls = 0
+
+
+_current_run: ContextVar[Optional[RunTimings]] = ContextVar("agui_run_timings", default=None)
+
+_tracing_configured = False
+_recent_spans: deque = deque(maxlen=int(os.environ.get("TELEMETRY_RECENT_SPANS", "200")))
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Start an OpenTelemetry span as the current span (no-op without OpenTelemetry)."""
+    if _otel_trace is None:
+        yield None
+        return
+    with _otel_trace.get_tracer(__name__).start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def start_span(name: str, **attributes: Any) -> Any:
+    """Start a span without making it current; the caller must ``end()`` it.
+
+    Used around async generators, which may be finalized outside the context
+    they started in.
+    """
+    if _otel_trace is None:
+        return None
+    return _otel_trace.get_tracer(__name__).start_span(name, attributes=attributes)
+
+
+def configure_tracing(exporters: Optional[list] = None) -> list[str]:
+    """Install a tracer provider with the ``TELEMETRY_EXPORTERS`` exporters plus ``exporters``.
+
+    Only tracing is configured (no log or metric exporters). The agent
+    framework's own chat/tool spans use the same provider when ``ENABLE_OTEL``
+    is set. Returns the configured exporter names.
+    """
+    global _tracing_configured
+    names = [n.strip() for n in os.environ.get("TELEMETRY_EXPORTERS", "").split(",") if n.strip() and n.strip() != "none"]
+    exporters = list(exporters or [])
+    if _tracing_configured or _otel_trace is None or (not names and not exporters):
+        return []
+    _tracing_configured = True
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SimpleSpanProcessor,
+        SpanExporter,
+        SpanExportResult,
+    )
+
+    class RecentSpanExporter(SpanExporter):
+        def export(self, spans):
+            for finished in spans:
+                _recent_spans.append(
+                    {
+                        "name": finished.name,
+                        "trace_id": format(finished.context.trace_id, "032x"),
+                        "span_id": format(finished.context.span_id, "016x"),
+                        "parent_id": format(finished.parent.span_id, "016x") if finished.parent else None,
+                        "duration_ms": round((finished.end_time - finished.start_time) / 1e6, 3),
+                        "attributes": dict(finished.attributes or {}),
+                    }
+                )
+            return SpanExportResult.SUCCESS
+
+    provider = TracerProvider(resource=Resource.create({"service.name": os.environ.get("OTEL_SERVICE_NAME", "agui-maf-demo")}))
+    if "memory" in names:
+        provider.add_span_processor(SimpleSpanProcessor(RecentSpanExporter()))
+    if "console" in names:
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    if "otlp" in names:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        endpoint = os.environ.get("OTLP_ENDPOINT", "http://localhost:4317")
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    for exporter in exporters:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        names.append(type(exporter).__name__)
+    _otel_trace.set_tracer_provider(provider)
+    print(f"📈 Span exporters: {', '.join(names)}")
+    return names
+
+
+def recent_spans() -> list[dict]:
+    """Spans kept by the ``memory`` exporter, oldest first."""
+    return list(_recent_spans)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def instrument_model_calls(agent: str) -> Callable[[Any, Callable[[Any], Awaitable[None]]], Awaitable[None]]:
+    """Build chat middleware timing each model call of ``agent``."""
+
+    async def middleware(context: Any, next: Callable[[Any], Awaitable[None]]) -> None:
+        run = _current_run.get()
+        if run is not None:
+            run.model_calls += 1
+        start = time.perf_counter()
+
+        if not context.is_streaming:
+            with span("agui.model_call", agent=agent, streaming=False):
+                await next(context)
+            MODEL_DURATION.observe(time.perf_counter() - start, agent=agent)
+            usage = getattr(context.result, "usage_details", None)
+            if usage is not None and usage.output_token_count:
+                MODEL_OUTPUT_TOKENS.inc(usage.output_token_count, agent=agent)
+            return
+
+        await next(context)
+        stream = context.result
+
+        async def observe():
+            first_token_at = None
+            text_parts = []
+            output_tokens = None
+            current = start_span("agui.model_call", agent=agent, streaming=True)
+            try:
+                async for update in stream:
+                    text = getattr(update, "text", None)
+                    if text:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        text_parts.append(text)
+                    for content in getattr(update, "contents", None) or []:
+                        if getattr(content, "type", None) == "usage" and content.details.output_token_count:
+                            output_tokens = content.details.output_token_count
+                    yield update
+            finally:
+                end = time.perf_counter()
+                MODEL_DURATION.observe(end - start, agent=agent)
+                if output_tokens is None and text_parts:
+                    output_tokens = count_tokens("".join(text_parts))
+                if output_tokens:
+                    MODEL_OUTPUT_TOKENS.inc(output_tokens, agent=agent)
+                attributes = {"agui.output_tokens": output_tokens or 0}
+                if first_token_at is not None:
+                    MODEL_TTFT.observe(first_token_at - start, agent=agent)
+                    attributes["agui.ttft_ms"] = round((first_token_at - start) * 1000, 1)
+                    if output_tokens and end > first_token_at:
+                        rate = output_tokens / (end - first_token_at)
+                        MODEL_TOKENS_PER_SECOND.observe(rate, agent=agent)
+                        attributes["agui.tokens_per_second"] = round(rate, 1)
+                if current is not None:
+                    current.set_attributes(attributes)
+                    current.end()
+
+        context.result = observe()
+
+    return middleware
+
+
+async def instrument_tool_call(context: Any, next: Callable[[Any], Awaitable[None]]) -> None:
+    """Function middleware timing one tool call."""
+    name = getattr(context.function, "name", "unknown")
+    status = "ok"
+    start = time.perf_counter()
+    with span("agui.tool", tool=name) as current:
+        try:
+            await next(context)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            TOOL_DURATION.observe(elapsed, tool=name, status=status)
+            if current is not None:
+                current.set_attribute("agui.tool_status", status)
+            run = _current_run.get()
+            if run is not None:
+                run.tool_calls += 1
+                run.tool_seconds[name] = run.tool_seconds.get(name, 0.0) + elapsed
+
+
+class TelemetryMiddleware:
+    """ASGI middleware timing AG-UI runs (receive, first token, SSE flushes, total)."""
+
+    def __init__(self, app, path: str = "/"):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        run = RunTimings()
+        token = _current_run.set(run)
+        state = {"status": 500, "first_token": None, "flush_seconds": 0.0, "flushes": 0, "bytes": 0}
+
+        async def timed_receive():
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                REQUEST_RECEIVE.observe(time.perf_counter() - start)
+            return message
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            if state["first_token"] is None and _TEXT_CONTENT in body:
+                state["first_token"] = time.perf_counter() - start
+                FIRST_TOKEN.observe(state["first_token"])
+            flush_start = time.perf_counter()
+            await send(message)
+            elapsed = time.perf_counter() - flush_start
+            if body:
+                SSE_FLUSH.observe(elapsed)
+                state["flush_seconds"] += elapsed
+                state["flushes"] += 1
+                state["bytes"] += len(body)
+
+        outcome = "error"
+        try:
+            with span("agui.run", path=self.path) as current:
+                await self.app(scope, timed_receive, timed_send)
+                outcome = "ok" if state["status"] < 400 else "error"
+                if current is not None:
+                    attributes = {
+                        "http.status_code": state["status"],
+                        "agui.sse_flushes": state["flushes"],
+                        "agui.sse_flush_ms": round(state["flush_seconds"] * 1000, 3),
+                        "agui.response_bytes": state["bytes"],
+                        "agui.model_calls": run.model_calls,
+                        "agui.tool_calls": run.tool_calls,
+                    }
+                    if state["first_token"] is not None:
+                        attributes["agui.first_token_ms"] = round(state["first_token"] * 1000, 1)
+                    current.set_attributes(attributes)
+        finally:
+            _current_run.reset(token)
+            elapsed = time.perf_counter() - start
+            RUNS.inc(status=outcome)
+            RUN_DURATION.observe(elapsed)
+            if elapsed > 0:
+                for tool, seconds in run.tool_seconds.items():
+                    TOOL_SHARE.observe(min(1.0, seconds / elapsed), tool=tool)
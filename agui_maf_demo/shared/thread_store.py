@@ -0,0 +1,568 @@
+"""Server-side conversation history keyed by AG-UI thread ID and access token.
+
+Without it, the web client re-uploads (and the server re-parses) the whole
+``messages`` array on every turn, so payload size grows with the session.
+With it, the client sends only the new messages plus the thread ID:
+
+1. The client posts the full history once, with a ``threadId``.
+2. After a successful run :class:`ThreadStoreMiddleware` stores the history
+   plus the run's messages rebuilt from the stream (assistant text, tool
+   calls and tool results, as separate AG-UI messages) and emits a
+   ``CUSTOM`` ``thread_store.saved`` event (``{"threadId", "messages",
+   "token"}``: the stored count and the thread's access token) on the SSE
+   stream. Runs that end with a tool call still waiting for its result
+   (frontend tools) are not stored.
+3. Next turn the client posts only the messages after that point, with
+   ``X-AGUI-History-Base: <messages>`` and ``X-AGUI-Thread-Token: <token>``
+   headers. The middleware prepends the stored history before the request
+   reaches the AG-UI endpoint.
+4. If the thread was evicted, the count does not match or the token is
+   missing or wrong, the server answers ``409`` and the client falls back
+   to posting the full history.
+
+Thread IDs are not secret (they are chosen by the client and appear in
+events and logs), so they do not key the store on their own: every
+full-history run gets a fresh random token, returned only on its own SSE
+stream, and the history is stored under a hash of token and thread ID.
+Knowing a thread ID without its token neither reads nor extends that
+history; a full-history post for the same ID starts a separate one.
+
+Servers without this middleware never emit the event, so clients keep
+sending full history to them.
+
+Backends (:class:`ThreadStore`):
+
+- :class:`MemoryThreadStore` (default): LRU, evicts by idle time and total bytes.
+- :class:`SQLiteThreadStore`: same limits, survives restarts, shared by the
+  worker processes of one host.
+- :class:`RedisThreadStore`: a local Redis; idle expiry uses key TTLs, byte
+  limits are left to Redis' ``maxmemory`` policy. Requires the ``redis`` package.
+
+Configuration is read from environment variables:
+
+- ``THREAD_STORE`` ``memory``, ``sqlite``, ``redis`` or ``none`` (default
+  ``memory``, or ``sqlite`` when ``SHARED_STATE_DIR`` is set)
+- ``THREAD_STORE_MAX_BYTES`` total history size (default 64 MiB)
+- ``THREAD_STORE_IDLE_TTL`` seconds a thread survives without activity (default 3600)
+- ``THREAD_STORE_SQLITE_PATH`` database file (default
+  ``$SHARED_STATE_DIR/threads.db`` or ``/tmp/agui-threads.db``)
+- ``THREAD_STORE_REDIS_URL`` (default ``redis://localhost:6379/0``)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from shared.agui_events import encode_sse
+from shared.sse_decoder import SSEDecoder
+
+HISTORY_BASE_HEADER = b"x-agui-history-base"
+THREAD_TOKEN_HEADER = b"x-agui-thread-token"
+
+
+def _store_key(thread_id: str, token: str) -> str:
+    return hashlib.sha256(f"{token}:{thread_id}".encode()).hexdigest()
+
+
+def _encode(message: dict[str, Any]) -> str:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class ThreadStore(ABC):
+    """Interface for conversation history backends."""
+
+    @abstractmethod
+    def load(self, thread_id: str) -> Optional[list[dict[str, Any]]]:
+        """Return the stored messages, or ``None`` if the thread is unknown or expired."""
+
+    @abstractmethod
+    def save(self, thread_id: str, messages: list[dict[str, Any]], start: int = 0) -> None:
+        """Store ``messages`` as the thread history.
+
+        ``messages[:start]`` are already stored unchanged, so backends only
+        need to write the tail.
+        """
+
+    @abstractmethod
+    def delete(self, thread_id: str) -> None:
+        """Forget a thread if present."""
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring."""
+
+
+@dataclass
+class _Thread:
+    messages: list[dict[str, Any]]
+    sizes: list[int] = field(default_factory=list)
+    last_access: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return sum(self.sizes)
+
+
+class MemoryThreadStore(ThreadStore):
+    """In-process LRU of thread histories bounded by idle time and total bytes."""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._threads: OrderedDict[str, _Thread] = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def load(self, thread_id: str) -> Optional[list[dict[str, Any]]]:
+        with self._lock:
+            self._expire()
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                return None
+            thread.last_access = self._clock()
+            self._threads.move_to_end(thread_id)
+            return list(thread.messages)
+
+    def save(self, thread_id: str, messages: list[dict[str, Any]], start: int = 0) -> None:
+        with self._lock:
+            old = self._threads.pop(thread_id, None)
+            sizes = old.sizes[:start] if old is not None else []
+            if old is not None:
+                self._bytes -= old.size
+            sizes += [len(_encode(m)) for m in messages[len(sizes):]]
+            thread = _Thread(list(messages), sizes, self._clock())
+            self._threads[thread_id] = thread
+            self._bytes += thread.size
+            self._expire()
+            while self._bytes > self.max_bytes and len(self._threads) > 1:
+                _, evicted = self._threads.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            thread = self._threads.pop(thread_id, None)
+            if thread is not None:
+                self._bytes -= thread.size
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self.idle_ttl
+        while self._threads:
+            thread_id, thread = next(iter(self._threads.items()))
+            if thread.last_access > cutoff:
+                break
+            self._threads.popitem(last=False)
+            self._bytes -= thread.size
+            self.expirations += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "threads": len(self._threads),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_seconds": self.idle_ttl,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteThreadStore(ThreadStore):
+    """Thread histories in a local SQLite file, one row per message."""
+
+    def __init__(
+        self,
+        path: str = "/tmp/agui-threads.db",
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY, bytes INTEGER NOT NULL, last_access REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS threads_last_access ON threads (last_access);
+            CREATE TABLE IF NOT EXISTS messages (
+                thread_id TEXT NOT NULL, seq INTEGER NOT NULL, body TEXT NOT NULL,
+                PRIMARY KEY (thread_id, seq));
+            """
+        )
+        self.evictions = 0
+        self.expirations = 0
+
+    def load(self, thread_id: str) -> Optional[list[dict[str, Any]]]:
+        with self._lock:
+            self._expire()
+            now = self._clock()
+            if self._db.execute("UPDATE threads SET last_access = ? WHERE thread_id = ?", (now, thread_id)).rowcount == 0:
+                return None
+            rows = self._db.execute("SELECT body FROM messages WHERE thread_id = ? ORDER BY seq", (thread_id,))
+            return [json.loads(body) for (body,) in rows]
+
+    def save(self, thread_id: str, messages: list[dict[str, Any]], start: int = 0) -> None:
+        bodies = [_encode(m) for m in messages[start:]]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM messages WHERE thread_id = ? AND seq >= ?", (thread_id, start))
+                self._db.executemany(
+                    "INSERT INTO messages (thread_id, seq, body) VALUES (?, ?, ?)",
+                    [(thread_id, start + i, body) for i, body in enumerate(bodies)],
+                )
+                (size,) = self._db.execute(
+                    "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM messages WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO threads (thread_id, bytes, last_access) VALUES (?, ?, ?)",
+                    (thread_id, size, self._clock()),
+                )
+                self._expire()
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop([thread_id])
+
+    def _drop(self, thread_ids: list[str]) -> None:
+        for thread_id in thread_ids:
+            self._db.execute("DELETE FROM messages WHERE thread_id = ?", (thread_id,))
+            self._db.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self.idle_ttl
+        expired = [r[0] for r in self._db.execute("SELECT thread_id FROM threads WHERE last_access <= ?", (cutoff,))]
+        self._drop(expired)
+        self.expirations += len(expired)
+
+    def _evict(self) -> None:
+        (total,) = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM threads").fetchone()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        # Keep the most recently used thread even if it alone exceeds the cap
+        for thread_id, size in self._db.execute(
+            "SELECT thread_id, bytes FROM threads ORDER BY last_access"
+        ).fetchall()[:-1]:
+            if total <= self.max_bytes:
+                break
+            victims.append(thread_id)
+            total -= size
+        self._drop(victims)
+        self.evictions += len(victims)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            threads, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM threads").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "threads": threads,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "idle_ttl_seconds": self.idle_ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisThreadStore(ThreadStore):
+    """Thread histories in Redis lists that expire after ``idle_ttl``."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", idle_ttl: float = 3600.0, prefix: str = "agui:thread:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("THREAD_STORE=redis requires the 'redis' package") from e
+        self.url = url
+        self.idle_ttl = idle_ttl
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+
+    def load(self, thread_id: str) -> Optional[list[dict[str, Any]]]:
+        key = self.prefix + thread_id
+        with self._redis.pipeline() as pipe:
+            pipe.lrange(key, 0, -1)
+            pipe.expire(key, int(self.idle_ttl))
+            bodies, exists = pipe.execute()
+        if not exists:
+            return None
+        return [json.loads(body) for body in bodies]
+
+    def save(self, thread_id: str, messages: list[dict[str, Any]], start: int = 0) -> None:
+        key = self.prefix + thread_id
+        bodies = [_encode(m) for m in messages[start:]]
+        with self._redis.pipeline() as pipe:
+            if start:
+                pipe.ltrim(key, 0, start - 1)
+            else:
+                pipe.delete(key)
+            if bodies:
+                pipe.rpush(key, *bodies)
+            pipe.expire(key, int(self.idle_ttl))
+            pipe.execute()
+
+    def delete(self, thread_id: str) -> None:
+        self._redis.delete(self.prefix + thread_id)
+
+    def stats(self) -> dict[str, Any]:
+        memory = self._redis.info("memory")
+        return {
+            "backend": "redis",
+            "url": self.url,
+            "idle_ttl_seconds": self.idle_ttl,
+            "used_memory": memory.get("used_memory"),
+            "maxmemory": memory.get("maxmemory"),
+        }
+
+
+class _ReplyCollector:
+    """Rebuilds the run's messages from the AG-UI SSE stream.
+
+    Produces what an AG-UI client keeping the full message list would post
+    back: one assistant message per text segment, tool calls (with their
+    streamed arguments) on the assistant message that made them, and a
+    ``tool`` message per result, in stream order.
+    """
+
+    def __init__(self):
+        self._decoder = SSEDecoder()
+        self._messages: list[dict[str, Any]] = []
+        self._calls: dict[str, dict[str, Any]] = {}
+        self._results: set[str] = set()
+        self.failed = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> None:
+        for data in self._decoder.feed(chunk):
+            kind = data.get("type")
+            if kind == "TEXT_MESSAGE_CONTENT":
+                self._text(data.get("messageId"), data.get("delta") or "")
+            elif kind == "TOOL_CALL_START":
+                self._tool_call(data)
+            elif kind == "TOOL_CALL_ARGS":
+                call = self._calls.get(data.get("toolCallId"))
+                if call is not None:
+                    call["arguments"].append(data.get("delta") or "")
+            elif kind == "TOOL_CALL_RESULT":
+                self._results.add(data.get("toolCallId"))
+                self._messages.append({
+                    "id": data.get("messageId"),
+                    "role": "tool",
+                    "toolCallId": data.get("toolCallId"),
+                    "content": data.get("content") or "",
+                })
+            elif kind == "RUN_ERROR":
+                self.failed = True
+            elif kind == "RUN_FINISHED":
+                self.finished = True
+
+    def _text(self, message_id: Optional[str], delta: str) -> None:
+        last = self._messages[-1] if self._messages else None
+        # Text after a tool call or result starts a new assistant message
+        if last is None or last["role"] != "assistant" or last["id"] != message_id or last["toolCalls"]:
+            last = {"id": message_id, "role": "assistant", "content": [], "toolCalls": []}
+            self._messages.append(last)
+        last["content"].append(delta)
+
+    def _tool_call(self, data: dict[str, Any]) -> None:
+        last = self._messages[-1] if self._messages else None
+        if last is None or last["role"] != "assistant":
+            last = {"id": data.get("parentMessageId") or data.get("toolCallId"), "role": "assistant", "content": [], "toolCalls": []}
+            self._messages.append(last)
+        call = {"id": data.get("toolCallId"), "name": data.get("toolCallName"), "arguments": []}
+        last["toolCalls"].append(call)
+        self._calls[call["id"]] = call
+
+    @property
+    def complete(self) -> bool:
+        """Every tool call got its result (frontend tools finish the run without one)."""
+        return self._results >= self._calls.keys()
+
+    def messages(self) -> list[dict[str, Any]]:
+        result = []
+        for message in self._messages:
+            if message["role"] != "assistant":
+                result.append(message)
+                continue
+            built = {"id": message["id"], "role": "assistant", "content": "".join(message["content"])}
+            if message["toolCalls"]:
+                built["toolCalls"] = [
+                    {"id": call["id"], "type": "function", "function": {"name": call["name"], "arguments": "".join(call["arguments"])}}
+                    for call in message["toolCalls"]
+                ]
+            result.append(built)
+        return result
+
+
+class ThreadStoreMiddleware:
+    """ASGI middleware expanding delta requests and persisting thread history.
+
+    Store calls run in a worker thread: the SQLite and Redis backends block
+    (up to the SQLite busy timeout on a locked database).
+    """
+
+    def __init__(self, app, path: str = "/", store: Optional[ThreadStore] = None):
+        self.app = app
+        self.path = path
+        self._store = store
+
+    @property
+    def store(self) -> Optional[ThreadStore]:
+        return self._store if self._store is not None else get_thread_store()
+
+    async def __call__(self, scope, receive, send):
+        store = self.store
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path or store is None:
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            payload = None
+        thread_id = payload.get("threadId") if isinstance(payload, dict) else None
+        if not thread_id or not isinstance(thread_id, str) or not isinstance(payload.get("messages"), list):
+            await self.app(scope, _replay(body, receive), send)
+            return
+
+        headers = dict(scope["headers"])
+        base = headers.get(HISTORY_BASE_HEADER)
+        if base is not None:
+            token = headers.get(THREAD_TOKEN_HEADER, b"").decode("latin-1")
+            key = _store_key(thread_id, token)
+            history = await asyncio.to_thread(store.load, key) if token else None
+            if history is None or not base.isdigit() or len(history) != int(base):
+                await _send_json(send, 409, {
+                    "detail": "Unknown or out-of-date thread history; resend the full conversation",
+                    "threadId": thread_id,
+                })
+                return
+            messages = history + payload["messages"]
+            payload["messages"] = messages
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            start = len(history)
+        else:
+            messages = payload["messages"]
+            start = 0
+            token = secrets.token_urlsafe(32)
+            key = _store_key(thread_id, token)
+
+        collector = _ReplyCollector()
+        state = {"streaming": False}
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                state["streaming"] = message.get("status", 200) == 200 and headers.get(
+                    b"content-type", b""
+                ).startswith(b"text/event-stream")
+            elif message["type"] == "http.response.body" and state["streaming"]:
+                collector.feed(message.get("body", b""))
+                if not message.get("more_body", False) and collector.finished and not collector.failed and collector.complete:
+                    saved = messages + collector.messages()
+                    await asyncio.to_thread(store.save, key, saved, start)
+                    event = {
+                        "type": "CUSTOM",
+                        "name": "thread_store.saved",
+                        "value": {"threadId": thread_id, "messages": len(saved), "token": token},
+                    }
+                    await send({"type": "http.response.body", "body": encode_sse(event), "more_body": True})
+            await send(message)
+
+        await self.app(scope, _replay(body, receive), recording_send)
+
+
+def _replay(body: bytes, receive):
+    replayed = False
+
+    async def replay_receive():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay_receive
+
+
+async def _send_json(send, status: int, content: dict[str, Any]) -> None:
+    body = json.dumps(content).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+_store: Optional[ThreadStore] = None
+_store_loaded = False
+
+
+def get_thread_store() -> Optional[ThreadStore]:
+    """Return the process-wide thread store, or ``None`` when ``THREAD_STORE=none``."""
+    global _store, _store_loaded
+    if not _store_loaded:
+        shared_dir = os.environ.get("SHARED_STATE_DIR")
+        # Worker processes need a store they can all see
+        backend = os.environ.get("THREAD_STORE", "sqlite" if shared_dir else "memory").lower()
+        max_bytes = int(os.environ.get("THREAD_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+        idle_ttl = float(os.environ.get("THREAD_STORE_IDLE_TTL", "3600"))
+        if backend == "sqlite":
+            _store = SQLiteThreadStore(
+                path=os.environ.get(
+                    "THREAD_STORE_SQLITE_PATH",
+                    os.path.join(shared_dir, "threads.db") if shared_dir else "/tmp/agui-threads.db",
+                ),
+                max_bytes=max_bytes,
+                idle_ttl=idle_ttl,
+            )
+        elif backend == "redis":
+            _store = RedisThreadStore(
+                url=os.environ.get("THREAD_STORE_REDIS_URL", "redis://localhost:6379/0"),
+                idle_ttl=idle_ttl,
+            )
+        elif backend != "none":
+            _store = MemoryThreadStore(max_bytes=max_bytes, idle_ttl=idle_ttl)
+        _store_loaded = True
+    return _store
@@ -0,0 +1,325 @@
+"""Timezone resolution for ``get_current_time``.
+
+``get_current_time`` used to import ``pytz`` inside the tool and call
+``pytz.timezone(name)`` on every call, which only accepts exact IANA names:
+"Tokyo", "EST" or "new york" came back as errors the model had to retry.
+:class:`TimezoneIndex` is built once (at startup, from the warmup) over the
+``zoneinfo`` database and maps normalized keys to IANA zones:
+
+- every zone name (``"america/new york"`` -> ``America/New_York``);
+- the city part of every regional zone (``"tokyo"`` -> ``Asia/Tokyo``);
+- ``ALIASES``: abbreviations as people use them (``"EST"`` is US Eastern
+  time, daylight saving included), countries with one main zone and
+  well-known cities that are not zone names (``"san francisco"``);
+- UTC/GMT offsets (``"UTC+5:30"``) as fixed-offset zones.
+
+Near misses (``"Amsterdm"``, ``"Sao Paolo"``) fall back to ``difflib`` over
+the same keys. Each input string is resolved once and memoized
+(``CACHE_SIZE`` entries), misses included, and ``ZoneInfo`` objects are
+kept per zone, so a repeated lookup is a dict hit. :meth:`TimezoneIndex.now`
+resolves a batch of names against a single instant.
+"""
+
+import difflib
+import re
+import zoneinfo
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Iterable, Optional, Union
+
+CACHE_SIZE = 4096
+FUZZY_CUTOFF = 0.8
+SUGGESTION_CUTOFF = 0.6
+
+# Keys are normalized (see _normalize); targets missing from the local tz
+# database are skipped when the index is built
+ALIASES = {
+    # Abbreviations and region names
+    "z": "UTC",
+    "et": "America/New_York",
+    "est": "America/New_York",
+    "edt": "America/New_York",
+    "eastern": "America/New_York",
+    "ct": "America/Chicago",
+    "cst": "America/Chicago",
+    "cdt": "America/Chicago",
+    "central": "America/Chicago",
+    "mt": "America/Denver",
+    "mst": "America/Denver",
+    "mdt": "America/Denver",
+    "mountain": "America/Denver",
+    "pt": "America/Los_Angeles",
+    "pst": "America/Los_Angeles",
+    "pdt": "America/Los_Angeles",
+    "pacific": "America/Los_Angeles",
+    "akst": "America/Anchorage",
+    "akdt": "America/Anchorage",
+    "alaska": "America/Anchorage",
+    "hst": "Pacific/Honolulu",
+    "hawaii": "Pacific/Honolulu",
+    "brt": "America/Sao_Paulo",
+    "art": "America/Argentina/Buenos_Aires",
+    "bst": "Europe/London",
+    "wet": "Europe/Lisbon",
+    "west": "Europe/Lisbon",
+    "cet": "Europe/Paris",
+    "cest": "Europe/Paris",
+    "eet": "Europe/Athens",
+    "eest": "Europe/Athens",
+    "msk": "Europe/Moscow",
+    "wat": "Africa/Lagos",
+    "cat": "Africa/Maputo",
+    "eat": "Africa/Nairobi",
+    "sast": "Africa/Johannesburg",
+    "gst": "Asia/Dubai",
+    "pkt": "Asia/Karachi",
+    "ist": "Asia/Kolkata",
+    "ict": "Asia/Bangkok",
+    "wib": "Asia/Jakarta",
+    "sgt": "Asia/Singapore",
+    "hkt": "Asia/Hong_Kong",
+    "pht": "Asia/Manila",
+    "kst": "Asia/Seoul",
+    "jst": "Asia/Tokyo",
+    "awst": "Australia/Perth",
+    "acst": "Australia/Adelaide",
+    "acdt": "Australia/Adelaide",
+    "aest": "Australia/Sydney",
+    "aedt": "Australia/Sydney",
+    "nzst": "Pacific/Auckland",
+    "nzdt": "Pacific/Auckland",
+    # Countries with one main zone
+    "uk": "Europe/London",
+    "united kingdom": "Europe/London",
+    "britain": "Europe/London",
+    "england": "Europe/London",
+    "ireland": "Europe/Dublin",
+    "france": "Europe/Paris",
+    "germany": "Europe/Berlin",
+    "italy": "Europe/Rome",
+    "spain": "Europe/Madrid",
+    "netherlands": "Europe/Amsterdam",
+    "belgium": "Europe/Brussels",
+    "switzerland": "Europe/Zurich",
+    "austria": "Europe/Vienna",
+    "sweden": "Europe/Stockholm",
+    "norway": "Europe/Oslo",
+    "denmark": "Europe/Copenhagen",
+    "finland": "Europe/Helsinki",
+    "greece": "Europe/Athens",
+    "ukraine": "Europe/Kyiv",
+    "india": "Asia/Kolkata",
+    "china": "Asia/Shanghai",
+    "korea": "Asia/Seoul",
+    "south korea": "Asia/Seoul",
+    "taiwan": "Asia/Taipei",
+    "thailand": "Asia/Bangkok",
+    "vietnam": "Asia/Ho_Chi_Minh",
+    "philippines": "Asia/Manila",
+    "pakistan": "Asia/Karachi",
+    "uae": "Asia/Dubai",
+    "united arab emirates": "Asia/Dubai",
+    "saudi arabia": "Asia/Riyadh",
+    "new zealand": "Pacific/Auckland",
+    "south africa": "Africa/Johannesburg",
+    "kenya": "Africa/Nairobi",
+    "nigeria": "Africa/Lagos",
+    "argentina": "America/Argentina/Buenos_Aires",
+    "colombia": "America/Bogota",
+    "peru": "America/Lima",
+    # Cities that are not zone names
+    "nyc": "America/New_York",
+    "new york city": "America/New_York",
+    "washington": "America/New_York",
+    "washington dc": "America/New_York",
+    "boston": "America/New_York",
+    "philadelphia": "America/New_York",
+    "atlanta": "America/New_York",
+    "miami": "America/New_York",
+    "ottawa": "America/Toronto",
+    "montreal": "America/Toronto",
+    "chicago": "America/Chicago",
+    "houston": "America/Chicago",
+    "dallas": "America/Chicago",
+    "austin": "America/Chicago",
+    "new orleans": "America/Chicago",
+    "minneapolis": "America/Chicago",
+    "salt lake city": "America/Denver",
+    "calgary": "America/Edmonton",
+    "san francisco": "America/Los_Angeles",
+    "sf": "America/Los_Angeles",
+    "la": "America/Los_Angeles",
+    "seattle": "America/Los_Angeles",
+    "san diego": "America/Los_Angeles",
+    "las vegas": "America/Los_Angeles",
+    "portland": "America/Los_Angeles",
+    "rio de janeiro": "America/Sao_Paulo",
+    "edinburgh": "Europe/London",
+    "manchester": "Europe/London",
+    "munich": "Europe/Berlin",
+    "frankfurt": "Europe/Berlin",
+    "hamburg": "Europe/Berlin",
+    "barcelona": "Europe/Madrid",
+    "milan": "Europe/Rome",
+    "florence": "Europe/Rome",
+    "venice": "Europe/Rome",
+    "geneva": "Europe/Zurich",
+    "st petersburg": "Europe/Moscow",
+    "saint petersburg": "Europe/Moscow",
+    "tel aviv": "Asia/Jerusalem",
+    "abu dhabi": "Asia/Dubai",
+    "mumbai": "Asia/Kolkata",
+    "delhi": "Asia/Kolkata",
+    "new delhi": "Asia/Kolkata",
+    "bangalore": "Asia/Kolkata",
+    "bengaluru": "Asia/Kolkata",
+    "chennai": "Asia/Kolkata",
+    "hyderabad": "Asia/Kolkata",
+    "beijing": "Asia/Shanghai",
+    "shenzhen": "Asia/Shanghai",
+    "guangzhou": "Asia/Shanghai",
+    "hanoi": "Asia/Ho_Chi_Minh",
+    "osaka": "Asia/Tokyo",
+    "kyoto": "Asia/Tokyo",
+    "canberra": "Australia/Sydney",
+    "wellington": "Pacific/Auckland",
+    "cape town": "Africa/Johannesburg",
+}
+
+# Zone families whose city part is not a city (or duplicates a modern zone)
+_NO_CITY_PREFIXES = ("Etc/", "SystemV/", "US/", "Canada/", "Mexico/", "Brazil/", "Chile/", "posix/", "right/")
+
+_SEPARATORS = re.compile(r"[\s_\-.]+")
+_OFFSET = re.compile(r"^(?:utc|gmt)?\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$")
+
+
+def _normalize(name: str) -> str:
+    """``" America/New_York "`` -> ``"america/new york"``."""
+    return _SEPARATORS.sub(" ", name.strip().lower()).strip()
+
+
+class TimezoneError(ValueError):
+    """Raised for names that match no zone, with the closest keys as suggestions."""
+
+    def __init__(self, name: str, suggestions: list[str]):
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        super().__init__(f"Unknown timezone '{name}'.{hint}")
+        self.name = name
+        self.suggestions = suggestions
+
+
+@dataclass(frozen=True)
+class ResolvedZone:
+    query: str
+    zone: str
+    tz: tzinfo
+    # exact | alias | city | offset | fuzzy
+    match: str
+
+    @property
+    def label(self) -> str:
+        """``"Tokyo (Asia/Tokyo)"``, or just the zone when that is what was asked for."""
+        return self.zone if self.match == "exact" else f"{self.query.strip()} ({self.zone})"
+
+
+@dataclass(frozen=True)
+class _Unknown:
+    """Memoized miss; a fresh :class:`TimezoneError` is built from it per call."""
+
+    name: str
+    suggestions: tuple[str, ...]
+
+    def error(self) -> TimezoneError:
+        return TimezoneError(self.name, list(self.suggestions))
+
+
+class TimezoneIndex:
+    """Normalized name -> IANA zone over the local ``zoneinfo`` database."""
+
+    def __init__(self, zones: Iterable[str], aliases: Optional[dict[str, str]] = None):
+        zones = sorted(zones)
+        available = set(zones)
+        self._keys: dict[str, tuple[str, str]] = {_normalize(zone): (zone, "exact") for zone in zones}
+        # Aliases win over the legacy fixed-offset zones of the same name ("EST", "MST")
+        for key, zone in (ALIASES if aliases is None else aliases).items():
+            if zone in available:
+                self._keys[_normalize(key)] = (zone, "alias")
+        # Shallowest zone first, so "indianapolis" is America/Indianapolis
+        for zone in sorted(zones, key=lambda zone: (zone.count("/"), zone)):
+            if "/" in zone and not zone.startswith(_NO_CITY_PREFIXES):
+                self._keys.setdefault(_normalize(zone.rsplit("/", 1)[1]), (zone, "city"))
+        self._candidates = list(self._keys)
+        self._zones: dict[str, tzinfo] = {}
+        self._lookup = lru_cache(maxsize=CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def from_system(cls) -> "TimezoneIndex":
+        return cls(zoneinfo.available_timezones())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _zone(self, zone: str) -> tzinfo:
+        tz = self._zones.get(zone)
+        if tz is None:
+            tz = self._zones[zone] = timezone.utc if zone == "UTC" else zoneinfo.ZoneInfo(zone)
+        return tz
+
+    def _resolve(self, name: str) -> Union[ResolvedZone, _Unknown]:
+        key = _normalize(name)
+        hit = self._keys.get(key)
+        if hit is None and "," in key:
+            # "Paris, France" -> "paris"
+            hit = self._keys.get(key.split(",", 1)[0].strip())
+        if hit is not None:
+            zone, match = hit
+            return ResolvedZone(name, zone, self._zone(zone), match)
+        # On the raw name: "-" is a separator for the keys
+        offset = _OFFSET.match(re.sub(r"\s+", "", name.lower()))
+        if offset:
+            sign, hours, minutes = offset.groups()
+            delta = timedelta(hours=int(hours), minutes=int(minutes or 0))
+            if delta <= timedelta(hours=14) and int(minutes or 0) < 60:
+                tz = timezone(-delta if sign == "-" else delta)
+                return ResolvedZone(name, str(tz), tz, "offset")
+        close = difflib.get_close_matches(key, self._candidates, n=3, cutoff=SUGGESTION_CUTOFF)
+        if close and difflib.SequenceMatcher(None, key, close[0]).ratio() >= FUZZY_CUTOFF:
+            zone, _ = self._keys[close[0]]
+            return ResolvedZone(name, zone, self._zone(zone), "fuzzy")
+        return _Unknown(name, tuple(dict.fromkeys(self._keys[match][0] for match in close)))
+
+    def resolve(self, name: str) -> ResolvedZone:
+        """Resolve one name (memoized); raises :class:`TimezoneError` when nothing matches."""
+        result = self._lookup(name)
+        if isinstance(result, _Unknown):
+            # Never raise the cached object: its traceback would grow and stay alive
+            raise result.error()
+        return result
+
+    def resolve_many(self, names: Iterable[str]) -> list[Union[ResolvedZone, TimezoneError]]:
+        """Resolve a batch; unknown names come back as errors instead of raising."""
+        lookup = self._lookup
+        return [result.error() if isinstance(result, _Unknown) else result for result in map(lookup, names)]
+
+    def now(self, names: Iterable[str]) -> list[tuple[Union[ResolvedZone, TimezoneError], Optional[datetime]]]:
+        """The current time in each of ``names``, all taken from the same instant."""
+        instant = datetime.now(timezone.utc)
+        return [
+            (result, None if isinstance(result, TimezoneError) else instant.astimezone(result.tz))
+            for result in self.resolve_many(names)
+        ]
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+
+_index: Optional[TimezoneIndex] = None
+
+
+def get_timezone_index() -> TimezoneIndex:
+    """Return the process-wide index, building it on first use."""
+    global _index
+    if _index is None:
+        _index = TimezoneIndex.from_system()
+    return _index
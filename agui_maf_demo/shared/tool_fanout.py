@@ -0,0 +1,140 @@
+"""Concurrent execution of the tool calls a model emits in one turn.
+
+When one model response asks for several tools (``get_weather`` for Paris and
+for London plus a ``web_search``), the agent framework gathers the calls, so
+the turn should take as long as the slowest call rather than the sum. Two
+things get in the way:
+
+- A synchronous tool runs on the event loop and blocks its siblings until it
+  returns. Wrap slow ones with :func:`run_in_thread`.
+- An unbounded batch can hit one upstream API with every call at once.
+  :class:`ToolFanOutMiddleware` gives each AG-UI run a :class:`TurnLimiter`,
+  and :func:`limit_tool_concurrency` (registered as agent-framework function
+  middleware) makes every tool call take a slot from it.
+
+Results keep the model's call order: the framework gathers in order and the
+limiter only delays when a call starts. :func:`fan_out` applies the same
+pattern to code issuing its own batch of calls (see
+``benchmarks/tool_fanout.py``). Counters are available from :func:`tool_stats`.
+
+Configuration is read from environment variables:
+
+- ``TOOL_MAX_CONCURRENCY`` concurrent tool calls per run (default 4)
+"""
+
+import asyncio
+import functools
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+MAX_CONCURRENCY = int(os.environ.get("TOOL_MAX_CONCURRENCY", "4"))
+
+_current_limiter: ContextVar[Optional["TurnLimiter"]] = ContextVar("tool_turn_limiter", default=None)
+
+_totals = {"runs": 0, "calls": 0, "errors": 0, "queued": 0, "peak_in_flight": 0, "busy_seconds": 0.0}
+
+
+class TurnLimiter:
+    """Caps how many tool calls of one run execute at the same time."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked():
+            _totals["queued"] += 1
+        async with self._semaphore:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            _totals["peak_in_flight"] = max(_totals["peak_in_flight"], self.in_flight)
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                _totals["calls"] += 1
+                _totals["busy_seconds"] += time.perf_counter() - start
+
+
+async def fan_out(
+    calls: Sequence[Callable[[], Awaitable[Any]]],
+    max_concurrency: Optional[int] = None,
+    return_exceptions: bool = False,
+) -> list[Any]:
+    """Run ``calls`` concurrently, at most ``max_concurrency`` at a time.
+
+    Results are returned in the order of ``calls`` regardless of which
+    finishes first.
+    """
+    limiter = TurnLimiter(max_concurrency or MAX_CONCURRENCY)
+
+    async def run(call):
+        async with limiter.slot():
+            return await call()
+
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=return_exceptions)
+
+
+def run_in_thread(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """Turn a blocking tool into a coroutine that runs it in a worker thread.
+
+    Apply below ``@ai_function``; the wrapper keeps the signature and
+    docstring the tool schema is generated from.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+async def limit_tool_concurrency(context: Any, next: Callable[[Any], Awaitable[None]]) -> None:
+    """Function middleware: hold a slot of the current run's limiter per tool call.
+
+    A no-op outside an AG-UI run (scripts, benchmarks).
+    """
+    limiter = _current_limiter.get()
+    if limiter is None:
+        await next(context)
+        return
+    async with limiter.slot():
+        try:
+            await next(context)
+        except Exception:
+            _totals["errors"] += 1
+            raise
+
+
+def tool_stats() -> dict:
+    """Cumulative tool execution counters for this process."""
+    return {**_totals, "busy_seconds": round(_totals["busy_seconds"], 3), "max_concurrency": MAX_CONCURRENCY}
+
+
+class ToolFanOutMiddleware:
+    """ASGI middleware giving each AG-UI run its own :class:`TurnLimiter`."""
+
+    def __init__(self, app, path: str = "/", max_concurrency: Optional[int] = None):
+        self.app = app
+        self.path = path
+        self.max_concurrency = max_concurrency or MAX_CONCURRENCY
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        _totals["runs"] += 1
+        # Inherited by the response streaming task, where the agent runs its tools
+        token = _current_limiter.set(TurnLimiter(self.max_concurrency))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_limiter.reset(token)
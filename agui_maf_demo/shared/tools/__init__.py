@@ -0,0 +1,16 @@
+"""Agent tools, one module per tool.
+
+Profiles (``shared.profiles``) reference tools as ``"module:attribute"`` specs
+and :func:`load_tool` imports them only when enabled, so a server without web
+search or weather never imports httpx, and one without the code interpreter
+never loads the sandbox or chart modules.
+"""
+
+import importlib
+from typing import Any
+
+
+def load_tool(spec: str) -> Any:
+    """Import and return the tool named by ``"module:attribute"``."""
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
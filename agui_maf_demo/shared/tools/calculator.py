@@ -0,0 +1,48 @@
+"""``calculate`` tool.
+
+``calculate`` answers in plain text; ``calculate_card`` is the same tool
+(same name for the model) that also sends the result to the web UI
+(``shared.rich_results``).
+"""
+
+from typing import Annotated
+
+from agent_framework import ai_function
+from pydantic import Field
+
+from shared.expressions import evaluate
+from shared.rich_results import deliver
+
+
+@ai_function
+def calculate(
+    expression: Annotated[str, Field(description="Mathematical expression to evaluate (e.g., '2 + 2', '10 * 5')")],
+) -> str:
+    """Perform mathematical calculations.
+    
+    Use this tool when the user asks for arithmetic operations, mathematical
+    computations, or needs to calculate numbers.
+    """
+    try:
+        # Whitelisted, size-limited and memoized evaluation (shared.expressions)
+        result = evaluate(expression)
+        return f"{expression} = {result}"
+    except Exception as e:
+        return f"Error calculating '{expression}': {str(e)}"
+
+
+@ai_function(name="calculate")
+def calculate_card(
+    expression: Annotated[str, Field(description="Mathematical expression to evaluate")],
+) -> str:
+    """Perform mathematical calculations."""
+    try:
+        result = evaluate(expression)
+        return deliver(
+            "calculation",
+            {"expression": expression, "result": str(result)},
+            f"{expression} = {result}",
+            "The result is shown to the user.",
+        )
+    except Exception as e:
+        return f"Error calculating '{expression}': {str(e)}"
@@ -0,0 +1,33 @@
+"""``get_current_time`` tool over the timezone index in ``shared.timezones``."""
+
+from typing import Annotated
+
+from agent_framework import ai_function
+from pydantic import Field
+
+from shared.timezones import TimezoneError, get_timezone_index
+
+
+@ai_function
+def get_current_time(
+    timezone: Annotated[
+        str | list[str],
+        Field(
+            description="Timezone, city or abbreviation (e.g., 'UTC', 'America/New_York', 'Tokyo', 'EST'), "
+            "or a list of them to get several times in one call"
+        ),
+    ] = "UTC",
+) -> str:
+    """Get the current time in a specific timezone.
+
+    Use this tool when the user asks about the current time, what time it is,
+    or needs to know the time in a specific location.
+    """
+    # Names are resolved once per process; every time is read from the same instant
+    lines = []
+    for result, current_time in get_timezone_index().now([timezone] if isinstance(timezone, str) else timezone):
+        if isinstance(result, TimezoneError):
+            lines.append(f"Error getting time for timezone '{result.name}': {result}")
+        else:
+            lines.append(f"Current time in {result.label}: {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+    return "\n".join(lines)
@@ -0,0 +1,69 @@
+"""``execute_python_code`` tool: runs code in the sandbox worker pool.
+
+Figures go to the web UI as structured results (``shared.rich_results``, and
+live while the code runs, see ``shared.code_interpreter``); the model gets
+the printed output and a count of the charts.
+"""
+
+from typing import Annotated
+
+from agent_framework import ai_function
+from pydantic import Field
+
+from shared.code_interpreter import run_code
+from shared.rich_results import deliver
+
+
+@ai_function
+async def execute_python_code(
+    code: Annotated[str, Field(description="Python code to execute for data analysis or visualization")],
+    description: Annotated[str, Field(description="Brief description of what the code does")] = "",
+) -> str:
+    """Execute Python code for data analytics and visualization.
+    
+    Supports:
+    - Data analysis with pandas, numpy
+    - Visualizations with matplotlib, seaborn, plotly
+    - Statistical computations
+    - Machine learning with scikit-learn
+    
+    The code can create charts which will be displayed as images in the UI.
+    Use print() to show text output.
+    """
+    # Run the code in a sandbox worker process (own stdout/stderr, timeout,
+    # memory cap); output and figures stream to the UI while it runs
+    result_data = await run_code(code)
+    if result_data.error:
+        return f"❌ **Execution Error**\n\n```\n{result_data.error}\n```"
+
+    output = result_data.stdout
+    errors = result_data.stderr
+    image_ids = result_data.image_ids
+
+    # Build result with rich formatting
+    result = f"📊 **Code Execution Result**\n\n"
+
+    if description:
+        result += f"**Task:** {description}\n\n"
+
+    if output:
+        result += f"**Output:**\n```\n{output}\n```\n\n"
+
+    if errors:
+        result += f"**Warnings:**\n```\n{errors}\n```\n\n"
+
+    if not output and not image_ids and not errors:
+        result += "Code executed successfully (no output).\n"
+
+    if not image_ids:
+        return result
+
+    # Charts go to the UI by image id; the model never has to copy the ids
+    charts = f"{len(image_ids)} chart{'s' if len(image_ids) > 1 else ''}"
+    return deliver(
+        "code",
+        {"image_ids": image_ids},
+        result.rstrip(),
+        f"The {charts} produced by this code {'are' if len(image_ids) > 1 else 'is'} shown to the user.",
+        fallback=f"{result}{charts} stored on the server: {', '.join(f'/images/{image_id}' for image_id in image_ids)}",
+    )
@@ -0,0 +1,34 @@
+"""``search_restaurants`` tool over the indexed catalog in ``shared.restaurants``."""
+
+from typing import Annotated, Any
+
+from agent_framework import ai_function
+from pydantic import Field
+
+from shared.restaurants import get_catalog
+from shared.tool_fanout import run_in_thread
+
+MAX_RESULTS = 20
+
+
+@ai_function
+@run_in_thread
+def search_restaurants(
+    location: Annotated[str, Field(description="The city to search in")],
+    cuisine: Annotated[str, Field(description="Type of cuisine (e.g., Italian, Japanese, Mexican)")] = "any",
+    max_results: Annotated[int, Field(ge=1, le=MAX_RESULTS, description="Maximum number of results to return")] = 3,
+) -> dict[str, Any]:
+    """Search for restaurants in a specific location.
+    
+    Use this tool when the user wants to find restaurants, dining options,
+    or food recommendations in a particular area.
+    """
+    # Best-rated matches from the (city, cuisine) index; only these rows are read
+    results = get_catalog().search(location, cuisine, max(1, min(max_results, MAX_RESULTS)))
+    
+    return {
+        "location": location,
+        "cuisine": cuisine,
+        "count": len(results),
+        "results": results,
+    }
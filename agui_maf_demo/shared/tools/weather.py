@@ -0,0 +1,86 @@
+"""``get_weather`` tool: current conditions from OpenWeatherMap.
+
+``get_weather`` answers in plain text; ``get_weather_card`` is the same tool
+(same name for the model) that also sends a weather card to the web UI
+(``shared.rich_results``).
+"""
+
+import os
+from typing import Annotated
+
+import httpx
+from agent_framework import ai_function
+from pydantic import Field
+
+from shared.rich_results import deliver
+from shared.weather import fetch_weather
+
+
+@ai_function
+async def get_weather(
+    location: Annotated[str, Field(description="The city name, e.g., 'Paris' or 'Toronto'")],
+) -> str:
+    """Get the current weather for a location.
+    
+    Use this tool when the user asks about weather conditions, temperature,
+    or climate in a specific location.
+    """
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    if not api_key:
+        return "Weather API key not configured. Please add OPENWEATHER_API_KEY to .env file."
+    
+    try:
+        # Call OpenWeatherMap API over the shared, connection-pooled client
+        data = await fetch_weather(location, api_key)
+        
+        temp = data["main"]["temp"]
+        feels_like = data["main"]["feels_like"]
+        description = data["weather"][0]["description"]
+        humidity = data["main"]["humidity"]
+        
+        return f"The weather in {location} is {description} with a temperature of {temp}°C (feels like {feels_like}°C). Humidity: {humidity}%."
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return f"City '{location}' not found. Please check the spelling."
+        return f"Error fetching weather: {str(e)}"
+    except Exception as e:
+        return f"Error getting weather data: {str(e)}"
+
+
+@ai_function(name="get_weather")
+async def get_weather_card(
+    location: Annotated[str, Field(description="The city name, e.g., 'Paris' or 'Toronto'")],
+) -> str:
+    """Get the current weather for a location."""
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    if not api_key:
+        return "Weather API key not configured."
+    
+    try:
+        data = await fetch_weather(location, api_key)
+        
+        temp = data["main"]["temp"]
+        feels_like = data["main"]["feels_like"]
+        description = data["weather"][0]["description"]
+        humidity = data["main"]["humidity"]
+        wind_speed = data["wind"]["speed"]
+        icon = data["weather"][0]["icon"]
+        
+        # The card goes to the UI directly; the model only gets the numbers
+        return deliver(
+            "weather",
+            {
+                "location": location,
+                "temperature": temp,
+                "feels_like": feels_like,
+                "description": description,
+                "humidity": humidity,
+                "wind_speed": wind_speed,
+                "icon_url": f"https://openweathermap.org/img/wn/{icon}@2x.png",
+            },
+            f"Weather in {location}: {description}, {temp}°C (feels like {feels_like}°C), "
+            f"humidity {humidity}%, wind {wind_speed} m/s.",
+            "A weather card with these details is shown to the user.",
+        )
+    except Exception as e:
+        return f"Error getting weather: {str(e)}"
@@ -0,0 +1,88 @@
+"""``web_search`` tool: Tavily search over the shared HTTP client.
+
+``web_search`` returns structured results; ``web_search_markdown`` is the same
+tool (same name for the model) that sends the source links to the web UI
+(``shared.rich_results``) and gives the model titles and snippets only.
+"""
+
+import os
+from typing import Annotated, Any
+
+from agent_framework import ai_function
+from pydantic import Field
+
+from shared.rich_results import deliver
+from shared.search import search_web
+
+
+@ai_function
+async def web_search(
+    query: Annotated[str, Field(description="The search query to look up on the web")],
+    max_results: Annotated[int, Field(description="Maximum number of results to return")] = 5,
+) -> dict[str, Any]:
+    """Search the web for current information.
+    
+    Use this tool when the user asks about:
+    - Current events, news, or recent developments
+    - Information that may have changed recently
+    - Topics that require up-to-date information
+    - General web searches
+    """
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        return {"error": "Tavily API key not configured. Please add TAVILY_API_KEY to .env file."}
+    
+    try:
+        response = await search_web(query, max_results)
+        
+        results = []
+        for result in response.get("results", []):
+            results.append({
+                "title": result.get("title"),
+                "url": result.get("url"),
+                "content": result.get("content"),
+                "score": result.get("score"),
+            })
+        
+        return {
+            "query": query,
+            "results_count": len(results),
+            "results": results,
+        }
+    except Exception as e:
+        return {"error": f"Error performing web search: {str(e)}"}
+
+
+@ai_function(name="web_search")
+async def web_search_markdown(
+    query: Annotated[str, Field(description="The search query")],
+    max_results: Annotated[int, Field(description="Maximum number of results")] = 5,
+) -> str:
+    """Search the web for current information."""
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        return "Tavily API key not configured."
+    
+    try:
+        response = await search_web(query, max_results)
+        
+        results = response.get("results", [])
+        
+        # Links go to the UI; the model reads titles and snippets, not URLs
+        summary = fallback = f"Web search results for: {query}\n\n"
+        for idx, result in enumerate(results, 1):
+            summary += f"{idx}. {result.get('title', '')}\n{result.get('content', '')}\n\n"
+            fallback += f"{idx}. {result.get('title', '')}\n{result.get('content', '')}\n{result.get('url', '')}\n\n"
+        
+        return deliver(
+            "links",
+            {
+                "query": query,
+                "results": [{"title": result.get("title", ""), "url": result.get("url", "")} for result in results],
+            },
+            summary.rstrip(),
+            "The source links are shown to the user; cite sources by title or number.",
+            fallback=fallback.rstrip(),
+        )
+    except Exception as e:
+        return f"Error performing web search: {str(e)}"
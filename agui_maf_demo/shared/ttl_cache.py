@@ -0,0 +1,216 @@
+"""Bounded in-memory TTL + LRU cache with single-flight loading.
+
+Used by tools whose upstream answers change slowly (weather, web search) so
+repeated calls from the orchestrator are served from memory.
+
+- Entries expire ``ttl`` seconds after they were stored.
+- When ``maxsize`` is reached, the least recently used entry is evicted.
+- Concurrent misses for the same key share one in-flight load.
+- Only successful loads are cached; exceptions propagate to every waiter.
+- A load is not cancelled with the request that started it; it finishes
+  for the other waiters (and the cache).
+
+Every cache registers itself by name so :func:`cache_stats` can report
+hit/miss/eviction counters for all of them.
+
+When the server runs several worker processes, a cache can be given a
+:class:`SharedCacheTier`: a SQLite file (under ``SHARED_STATE_DIR``, normally
+tmpfs) consulted after a local miss and filled after every successful load,
+so one worker's upstream call serves all of them. Values must be
+JSON-serializable.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+_registry: dict[str, "AsyncTTLCache"] = {}
+
+
+class SharedCacheTier:
+    """Cross-process second tier for :class:`AsyncTTLCache`, backed by SQLite."""
+
+    def __init__(self, path: str, maxsize: int = 10_000):
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "name TEXT NOT NULL, key TEXT NOT NULL, expires_at REAL NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (name, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+    def get(self, name: str, key: Hashable) -> tuple[bool, Any, float]:
+        """Return ``(found, value, seconds_left)`` for a fresh entry."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM cache WHERE name = ? AND key = ? AND expires_at > ?",
+                (name, repr(key), now),
+            ).fetchone()
+        if row is None:
+            return False, None, 0.0
+        return True, json.loads(row[1]), row[0] - now
+
+    def set(self, name: str, key: Hashable, value: Any, ttl: float) -> None:
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (name, key, expires_at, value) VALUES (?, ?, ?, ?)",
+                (name, repr(key), now + ttl, encoded),
+            )
+            self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            self._db.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+
+_shared_tier: Optional[SharedCacheTier] = None
+
+
+def get_shared_tier() -> Optional[SharedCacheTier]:
+    """The process's shared tier when ``SHARED_STATE_DIR`` is set, else ``None``."""
+    global _shared_tier
+    directory = os.environ.get("SHARED_STATE_DIR")
+    if _shared_tier is None and directory:
+        os.makedirs(directory, exist_ok=True)
+        _shared_tier = SharedCacheTier(os.path.join(directory, "cache.db"))
+    return _shared_tier
+
+
+class AsyncTTLCache:
+    """TTL + LRU cache for coroutine results."""
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional[SharedCacheTier] = None,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        _registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value (counting a hit) or ``default``."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` and evict least recently used entries over ``maxsize``."""
+        self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key`` or await ``loader()`` once to fill it."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        # The load runs in its own task that every caller shields, so a
+        # cancelled caller (e.g. a client that disconnected) does not cancel
+        # it for the others waiting on the same key.
+        task = asyncio.ensure_future(self._load(key, loader))
+        task.add_done_callback(_retrieve_exception)
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            # The shared tier is consulted inside the single-flight load, and
+            # off the event loop: SQLite can wait on another worker's lock
+            if self.shared is not None:
+                found, value, remaining = await asyncio.to_thread(self.shared.get, self.name, key)
+                if found:
+                    self.shared_hits += 1
+                    self.set(key, value, ttl=remaining)
+                    return value
+            self.misses += 1
+            value = await loader()
+        finally:
+            self._inflight.pop(key, None)
+        self.set(key, value)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.set, self.name, key, value, self.ttl)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.shared_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "shared": self.shared is not None,
+            "hit_ratio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    # Mark the exception as retrieved so asyncio does not log it when every
+    # caller waiting on this key was cancelled.
+    if not task.cancelled():
+        task.exception()
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Counters for every cache created in this process, keyed by name."""
+    return {name: cache.stats() for name, cache in _registry.items()}
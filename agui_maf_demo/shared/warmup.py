@@ -0,0 +1,82 @@
+"""Startup warmup and readiness state.
+
+Cold replicas used to pay for importing numpy/pandas/matplotlib/seaborn and
+building the matplotlib font cache on the first ``execute_python_code`` call,
+while a user was waiting. The warmup runs those steps as a background task
+started from the FastAPI lifespan; the server already answers liveness checks,
+but ``GET /ready`` returns 503 until warmup has finished so Container Apps
+only routes traffic to warm replicas.
+"""
+
+import asyncio
+import time
+from typing import Any
+
+_state: dict[str, Any] = {
+    "ready": False,
+    "started_at": None,
+    "ready_at": None,
+    "steps": {},
+    "error": None,
+}
+
+
+def readiness() -> tuple[bool, dict[str, Any]]:
+    """Return ``(is_ready, status)`` for the ``/ready`` probe."""
+    status = {
+        "status": "ready" if _state["ready"] else ("failed" if _state["error"] else "warming"),
+        "steps": dict(_state["steps"]),
+    }
+    if _state["ready_at"] is not None:
+        status["warmup_seconds"] = round(_state["ready_at"] - _state["started_at"], 3)
+    if _state["error"]:
+        status["error"] = _state["error"]
+    return _state["ready"], status
+
+
+async def _timed(name: str, coro) -> None:
+    start = time.perf_counter()
+    await coro
+    _state["steps"][name] = round(time.perf_counter() - start, 3)
+
+
+async def run_warmup(sandbox: bool = False, restaurants: bool = False, timezones: bool = False) -> None:
+    """Run all startup warmup steps and flip readiness when they succeed.
+
+    With ``sandbox=True`` this starts the code-interpreter pool; every worker
+    imports the scientific stack and renders a throwaway figure (priming the
+    font cache) before it reports ready. ``restaurants=True`` maps the
+    restaurant catalog and builds its index, ``timezones=True`` the
+    timezone index behind ``get_current_time``.
+    """
+    _state.update(ready=False, started_at=time.perf_counter(), ready_at=None, steps={}, error=None)
+    try:
+        if restaurants:
+            from shared.restaurants import get_catalog
+
+            await _timed("restaurant_catalog", asyncio.to_thread(get_catalog))
+        if timezones:
+            from shared.timezones import get_timezone_index
+
+            await _timed("timezone_index", asyncio.to_thread(get_timezone_index))
+        if sandbox:
+            from shared.sandbox import get_sandbox_pool
+
+            await _timed("sandbox_pool", get_sandbox_pool().start())
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _state["error"] = f"{type(e).__name__}: {e}"
+        print(f"❌ Warmup failed: {_state['error']}")
+        return
+
+    _state["ready"] = True
+    _state["ready_at"] = time.perf_counter()
+    print(f"✅ Warmup complete in {_state['ready_at'] - _state['started_at']:.2f}s")
+
+
+def start_warmup(sandbox: bool = False, restaurants: bool = False, timezones: bool = False) -> asyncio.Task:
+    """Schedule :func:`run_warmup` on the running loop and return its task."""
+    return asyncio.get_running_loop().create_task(
+        run_warmup(sandbox=sandbox, restaurants=restaurants, timezones=timezones)
+    )
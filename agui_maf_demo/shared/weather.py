@@ -0,0 +1,53 @@
+"""OpenWeatherMap lookups over the shared async HTTP client.
+
+Results are cached per normalized location (see ``shared.ttl_cache``), so the
+orchestrator asking for "Paris" and " paris " many times a minute makes one
+upstream call per TTL window. Cache sizing is read from the environment:
+
+- ``WEATHER_CACHE_TTL`` seconds (default 600)
+- ``WEATHER_CACHE_SIZE`` entries (default 1024)
+
+``OPENWEATHER_BASE_URL`` overrides the API URL, which is how the load test in
+``benchmarks/weather_load.py`` points the tool at a local fake server.
+"""
+
+import os
+from typing import Any
+
+from shared.http_clients import get_http_client
+from shared.ttl_cache import AsyncTTLCache, get_shared_tier
+
+DEFAULT_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+weather_cache = AsyncTTLCache(
+    "weather",
+    maxsize=int(os.environ.get("WEATHER_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("WEATHER_CACHE_TTL", "600")),
+    shared=get_shared_tier(),
+)
+
+
+def normalize_location(location: str) -> str:
+    """Case- and whitespace-insensitive cache key, e.g. ``"  New   York "`` -> ``"new york"``."""
+    return " ".join(location.split()).casefold()
+
+
+async def _request_weather(location: str, api_key: str) -> dict[str, Any]:
+    url = os.environ.get("OPENWEATHER_BASE_URL", DEFAULT_WEATHER_URL)
+    response = await get_http_client().get(
+        url,
+        params={"q": location, "appid": api_key, "units": "metric"},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_weather(location: str, api_key: str) -> dict[str, Any]:
+    """Fetch current conditions for ``location`` in metric units.
+
+    Raises ``httpx.HTTPStatusError`` for non-2xx responses so callers can keep
+    their own error messages (e.g. "city not found" on 404). Errors are not
+    cached.
+    """
+    key = normalize_location(location)
+    return await weather_cache.get_or_load(key, lambda: _request_weather(key, api_key))